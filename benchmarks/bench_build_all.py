@@ -0,0 +1,64 @@
+"""
+Per-layout latency of `build_all`: sequential vs concurrent output formats.
+
+    python benchmarks/bench_build_all.py [layouts/*.toml] [--runs N]
+"""
+
+import argparse
+import io
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from kalamine.build import build_all, preload
+from kalamine.layout import KeyboardLayout, load_layout
+
+LAYOUTS_DIR = Path(__file__).parent.parent / "layouts"
+
+MODES: Dict[str, Callable[[KeyboardLayout, Path], None]] = {
+    "sequential": lambda layout, path: build_all(layout, path),
+    "threads": lambda layout, path: build_all(layout, path, threads=4),
+    "threads+fork": lambda layout, path: build_all(
+        layout, path, threads=4, processes=True
+    ),
+}
+
+
+def timings(layout_file: Path, build: Callable, runs: int) -> List[float]:
+    """Latency of `runs` builds of a freshly parsed layout, in ms."""
+
+    descriptor = load_layout(layout_file)
+    result = []
+    with tempfile.TemporaryDirectory() as tmp, redirect_stdout(io.StringIO()):
+        for _ in range(runs):
+            layout = KeyboardLayout(descriptor)  # no memoized generator data
+            start = time.perf_counter()
+            build(layout, Path(tmp))
+            result.append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("layouts", nargs="*", type=Path)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    layout_files = args.layouts or sorted(LAYOUTS_DIR.glob("*.toml"))
+
+    preload()
+    print(f"{'layout':<12}" + "".join(f"{mode:>16}" for mode in MODES))
+    for layout_file in layout_files:
+        row = f"{layout_file.stem:<12}"
+        for build in MODES.values():
+            median = statistics.median(timings(layout_file, build, args.runs))
+            row += f"{median:>13.2f} ms"
+        print(row)
+    print(f"(median of {args.runs} runs, Python {sys.version.split()[0]})")
+
+
+if __name__ == "__main__":
+    main()
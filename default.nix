@@ -13,7 +13,6 @@ buildPythonPackage rec {
 
         # run-time dependencies
         click
-        livereload
         pyyaml
         tomli
         progress
@@ -1,6 +1,26 @@
 #!/usr/bin/env python3
-from .layout import KeyboardLayout
-from .xkb_manager import XKBManager
+from typing import TYPE_CHECKING, Any
 
-KeyboardLayout
-XKBManager
+if TYPE_CHECKING:
+    from .build import build_artifacts
+    from .layout import KeyboardLayout
+    from .xkb_manager import XKBManager
+
+__all__ = ["KeyboardLayout", "XKBManager", "build_artifacts"]
+
+
+def __getattr__(name: str) -> Any:
+    # imported on first use, so that `import kalamine.cli` stays cheap
+    if name == "KeyboardLayout":
+        from .layout import KeyboardLayout
+
+        return KeyboardLayout
+    if name == "XKBManager":
+        from .xkb_manager import XKBManager
+
+        return XKBManager
+    if name == "build_artifacts":
+        from .build import build_artifacts
+
+        return build_artifacts
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
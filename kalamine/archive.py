@@ -0,0 +1,153 @@
+"""
+Zip and tar.gz archives of output files, written without intermediate files.
+
+Zip entries are streamed: generators write straight into the compressed
+archive entry. Tar entries need their size beforehand, so they are rendered
+in memory first; identical outputs (e.g. the drivers that do not depend on a
+build flag, in a build matrix) are then stored once, and linked.
+
+The archive is written under a temporary name, and renamed once complete.
+"""
+
+import gzip
+import hashlib
+import io
+import os
+import tarfile
+import threading
+import time
+import zipfile
+from contextlib import ExitStack
+from pathlib import Path
+from types import TracebackType
+from typing import TYPE_CHECKING, BinaryIO, Callable, Dict, Optional, Type, cast
+
+from .utils import BuildStamp
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+ARCHIVE_SUFFIXES = [".zip", ".tar.gz", ".tgz"]
+
+ZIP_EPOCH = 315532800  # 1980-01-01: the oldest date a zip archive can store
+
+
+def archive_suffix(path: Path) -> Optional[str]:
+    """Archive type of a file name, or None if not supported."""
+
+    name = path.name.lower()
+    return next((suffix for suffix in ARCHIVE_SUFFIXES if name.endswith(suffix)), None)
+
+
+def archive_timestamp(stamp: Optional[BuildStamp] = None) -> int:
+    """Modification time of the archive entries: the SOURCE_DATE_EPOCH if set,
+    a constant one in reproducible builds, or the current time."""
+
+    stamp = stamp or BuildStamp.from_env()
+    if stamp.epoch is not None:
+        return max(stamp.epoch, ZIP_EPOCH)
+    return ZIP_EPOCH if stamp.reproducible else int(time.time())
+
+
+class Archive:
+    """Archive of output files, opened for writing."""
+
+    def __init__(self, path: Path, stamp: Optional[BuildStamp] = None) -> None:
+        suffix = archive_suffix(path)
+        if suffix is None:
+            raise ValueError(f"unsupported archive format: {path.name}")
+
+        self._path = path
+        tmp_name = f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._tmp_path = path.with_name(tmp_name)
+        self._timestamp = archive_timestamp(stamp)
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        self._digests: Dict[str, str] = {}  # tar entry digest -> entry name
+        self._files = ExitStack()  # closed in reverse order
+        try:
+            file = self._files.enter_context(self._tmp_path.open("wb"))
+            if suffix == ".zip":
+                self._zip = self._files.enter_context(
+                    zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED)
+                )
+            else:  # the gzip header holds a timestamp, and the name unless omitted
+                gzip_file = self._files.enter_context(
+                    gzip.GzipFile("", "wb", fileobj=file, mtime=self._timestamp)
+                )
+                self._tar = self._files.enter_context(
+                    tarfile.TarFile(fileobj=gzip_file, mode="w")
+                )
+        except BaseException:
+            self.discard()
+            raise
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def add(self, name: str, write: Callable[[BinaryIO], None]) -> None:
+        """Add an entry, whose contents are produced by `write`. If `write`
+        raises an exception, the entry is added anyway (empty or truncated,
+        as an output file would be) before the exception is propagated."""
+
+        if self._zip is not None:
+            date_time = time.gmtime(self._timestamp)[:6]
+            info = zipfile.ZipInfo(name, date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            with self._zip.open(info, "w") as entry:
+                write(cast(BinaryIO, entry))
+            return
+
+        assert self._tar is not None
+        buffer = io.BytesIO()
+        try:
+            write(buffer)
+        finally:
+            self._add_tar_entry(name, buffer.getvalue())
+
+    def _add_tar_entry(self, name: str, data: bytes) -> None:
+        assert self._tar is not None
+        info = tarfile.TarInfo(name)
+        info.mtime = self._timestamp
+        info.mode = 0o644
+        digest = hashlib.sha256(data).hexdigest()
+        if data and digest in self._digests:
+            info.type = tarfile.LNKTYPE
+            info.linkname = self._digests[digest]
+            self._tar.addfile(info)
+        else:
+            self._digests[digest] = name
+            info.size = len(data)
+            self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self) -> None:
+        """Complete the archive, and move it to its path."""
+
+        try:
+            self._files.close()
+        except BaseException:
+            self._tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(self._tmp_path, self._path)
+
+    def discard(self) -> None:
+        """Remove the incomplete archive."""
+
+        self._files.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "Self":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if exc is None:
+            self.close()
+        else:
+            self.discard()
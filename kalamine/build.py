@@ -0,0 +1,558 @@
+"""
+Build layout descriptors into keyboard drivers, possibly in parallel.
+"""
+
+import io
+import os
+import sys
+from contextlib import ExitStack, contextmanager, redirect_stderr, redirect_stdout
+from functools import partial
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import click
+
+from .manifest import Manifest
+from .outputs import OUTPUT_FORMATS, OutputWarning, output_bytes, save_output
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from .archive import Archive
+    from .layout import KeyboardLayout
+    from .utils import BuildStamp
+
+# `--out` shortcuts: reuse the input name and change the file extension
+QUICK_OUTPUTS = ["keylayout", "klc", "xkb_keymap", "xkb_symbols", "svg"]
+
+
+class BuildJob(NamedTuple):
+    """Build settings for one layout descriptor."""
+
+    input_file: Path
+    out: str = "all"
+    angle_mod: bool = False
+    qwerty_shortcuts: bool = False
+    cache: Optional[bool] = None
+    matrix: bool = False
+    svg_geometries: Tuple[str, ...] = ()
+    stamp: Optional["BuildStamp"] = None  # None: from the environment
+    dist_dir: Path = Path("dist")
+
+    @property
+    def output_dir(self) -> Path:
+        if self.out == "all":
+            return self.dist_dir
+        output_file = output_path(self.input_file, self.out)
+        assert output_file is not None, "unsupported output format"
+        return output_file.parent
+
+    @property
+    def manifest_dir(self) -> Optional[Path]:
+        """Directory of the build manifest, if any: single-file outputs are
+        not tracked, so that no manifest lands next to a hand-picked file."""
+        return self.output_dir if self.out == "all" else None
+
+    @property
+    def flags(self) -> Tuple[str, ...]:
+        """Build settings that change the output files. The date stamp of
+        non-reproducible builds is left out: it does not trigger rebuilds."""
+
+        from .utils import BuildStamp
+
+        stamp = self.stamp or BuildStamp.from_env()
+        return (
+            f"out={self.out}",
+            "angle_mod" if self.angle_mod else "",
+            "qwerty_shortcuts" if self.qwerty_shortcuts else "",
+            stamp.mark if stamp.reproducible else "",
+            "matrix" if self.matrix else "",
+            *self.svg_geometries,
+        )
+
+
+class Variant(NamedTuple):
+    """Build flags of a layout variant, see `KeyboardLayout.variant`."""
+
+    angle_mod: bool = False
+    qwerty_shortcuts: bool = False
+
+    @property
+    def name(self) -> str:
+        """Name of the variant subdirectory in a build matrix."""
+        flags = [flag for flag, enabled in self._asdict().items() if enabled]
+        return "+".join(flags) or "default"
+
+
+# all variants of a build matrix
+MATRIX = [
+    Variant(angle_mod, qwerty_shortcuts)
+    for angle_mod in [False, True]
+    for qwerty_shortcuts in [False, True]
+]
+
+
+class BuildOutputs(NamedTuple):
+    """Files generated from a layout descriptor, and its `extends` parent."""
+
+    files: List[Path]
+    extends: Optional[Path] = None
+
+
+class BuildResult(NamedTuple):
+    """What a build job has printed, and what it has generated (if anything)."""
+
+    stdout: str
+    stderr: str
+    outputs: Optional[BuildOutputs]
+
+
+def output_path(input_file: Path, out: str) -> Optional[Path]:
+    """Output file of a single-output build, or None if not supported."""
+
+    if out in QUICK_OUTPUTS:
+        output_file = input_file.with_suffix(f".{out}")
+    else:
+        output_file = Path(out)
+    return output_file if output_file.suffix in OUTPUT_FORMATS else None
+
+
+def write_output(layout: "KeyboardLayout", path: Path) -> Optional[str]:
+    """Write an output file, whose format depends on its extension.
+    Return the warning message, if any, instead of printing it."""
+
+    try:
+        save_output(layout, path)
+    except OutputWarning as warning:
+        return str(warning)
+    return None
+
+
+def echo_warning(warning: Optional[str]) -> None:
+    if warning:
+        click.echo(warning)
+
+
+def build_all(
+    layout: "KeyboardLayout",
+    output_dir_path: Path,
+    threads: int = 1,
+    processes: bool = False,
+) -> List[Path]:
+    """Generate all layout output files, and return their paths.
+
+    Parameters
+    ----------
+    layout : KeyboardLayout
+        The layout to process.
+    output_dir_path : Path
+        The output directory.
+    threads : int
+        Number of output files written concurrently (1: one after another).
+    processes : bool
+        Render the CPU-bound formats in forked processes (Linux only).
+    """
+
+    output_dir_path.mkdir(parents=True, exist_ok=True)  # safe with parallel jobs
+    paths = {
+        ext: output_dir_path / (layout.meta["fileName"] + ext) for ext in OUTPUT_FORMATS
+    }
+
+    if threads <= 1:
+        for ext, path in paths.items():
+            echo_warning(write_output(layout, path))
+            click.echo(f"... {path}")
+        return list(paths.values())
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    layout.resolved  # resolve the keymap once, before the threads share it
+    with ExitStack() as stack:
+        thread_pool = stack.enter_context(ThreadPoolExecutor(threads))
+        process_pool = None
+        if processes and _can_fork():
+            process_pool = stack.enter_context(_forked_pool(layout))
+        futures = []
+        for ext, path in paths.items():
+            if process_pool and ext in CPU_BOUND_FORMATS:
+                futures.append(process_pool.submit(_write_forked, path))
+            else:
+                futures.append(thread_pool.submit(write_output, layout, path))
+        # log in `OUTPUT_FORMATS` order, whatever the completion order
+        for path, future in zip(paths.values(), futures):
+            echo_warning(future.result())
+            click.echo(f"... {path}")
+    return list(paths.values())
+
+
+# formats that are worth rendering in another process, despite the fork
+CPU_BOUND_FORMATS = {".svg"}
+
+# layout inherited by the forked processes of `build_all`
+_forked_layout: Optional["KeyboardLayout"] = None
+
+
+def _can_fork() -> bool:
+    """Forking is Linux-only here, and not allowed in `--jobs` workers nor in
+    the threads of `kalamine daemon` (which share `_forked_layout`)."""
+
+    import multiprocessing
+    import threading
+
+    return (
+        sys.platform == "linux"
+        and not multiprocessing.current_process().daemon
+        and threading.current_thread() is threading.main_thread()
+    )
+
+
+@contextmanager
+def _forked_pool(layout: "KeyboardLayout") -> Iterator["Executor"]:
+    """Process pool whose workers inherit `layout` instead of unpickling it."""
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    global _forked_layout
+    _forked_layout = layout
+    context = multiprocessing.get_context("fork")
+    try:
+        with ProcessPoolExecutor(len(CPU_BOUND_FORMATS), context) as pool:
+            yield pool
+    finally:
+        _forked_layout = None
+
+
+def _write_forked(path: Path) -> Optional[str]:
+    assert _forked_layout is not None, "not in a `_forked_pool` worker"
+    return write_output(_forked_layout, path)
+
+
+def build_artifacts(
+    descriptor: Union[Dict, Path, str, bytes],
+    formats: Iterable[str] = tuple(OUTPUT_FORMATS),
+    flags: Iterable[str] = (),
+) -> Dict[str, bytes]:
+    """Generate output files in memory: file extension -> file contents.
+
+    Parameters
+    ----------
+    descriptor : Dict, Path, str or bytes
+        A layout descriptor file, its TOML text, or its data.
+    formats : Iterable[str]
+        Output file extensions, e.g. `[".klc", ".xkb_symbols"]` (default: all).
+    flags : Iterable[str]
+        Build flags: "angle_mod", "qwerty_shortcuts".
+
+    Apart from reading the descriptor file, nothing is written nor read: this
+    can be called from several threads at once. As with `build_all`, formats
+    that cannot be generated (e.g. a KLC driver with an invalid locale) are
+    empty. Raises ValueError if the descriptor cannot be parsed.
+    """
+
+    from .layout import KeyboardLayout, parse_descriptor
+
+    extensions = ["." + ext.lstrip(".") for ext in formats]
+    unknown = [ext for ext in extensions if ext not in OUTPUT_FORMATS]
+    if unknown:
+        raise ValueError(f"unsupported output format: {', '.join(unknown)}")
+    unknown = [flag for flag in flags if flag not in Variant._fields]
+    if unknown:
+        raise ValueError(f"unknown build flag: {', '.join(unknown)}")
+
+    layout_data = parse_descriptor(descriptor)
+    try:
+        layout = KeyboardLayout(layout_data, *Variant(**dict.fromkeys(flags, True)))
+    except ValueError:
+        raise
+    except Exception as exc:  # unknown geometry, malformed template, etc.
+        raise ValueError(f"invalid layout descriptor: {exc!r}") from exc
+
+    artifacts = {}
+    for ext in extensions:
+        try:
+            artifacts[ext] = output_bytes(layout, ext)
+        except OutputWarning:
+            artifacts[ext] = b""
+    return artifacts
+
+
+def matrix_variants(
+    layout: "KeyboardLayout",
+    variants: Sequence[Variant] = MATRIX,
+    svg_geometries: Sequence[str] = (),
+) -> Iterator[Tuple[Variant, "KeyboardLayout"]]:
+    """Variants of a parsed layout, skipping the Angle Mod ones if the layout
+    geometry does not support it. Also checks the SVG geometries."""
+
+    from .generators.web import GEOMETRY_CLASSMAP
+    from .layout import GEOMETRY
+
+    unknown = set(svg_geometries) - set(GEOMETRY_CLASSMAP)
+    if unknown:
+        raise ValueError(f"unknown SVG geometry: {', '.join(sorted(unknown))}")
+
+    supports_angle_mod = GEOMETRY[layout.meta["geometry"]].angle_mod_keys is not None
+    for variant in variants:
+        if variant.angle_mod and not supports_angle_mod:
+            continue
+        yield variant, layout.variant(*variant)
+
+
+def build_matrix(
+    layout: "KeyboardLayout",
+    output_dir_path: Path,
+    variants: Sequence[Variant] = MATRIX,
+    svg_geometries: Sequence[str] = (),
+    threads: int = 1,
+) -> List[Path]:
+    """Generate all output files of several variants of a layout, each in its
+    own subdirectory, and return their paths. The variants are derived from
+    the parsed layout, which is not parsed again. Angle Mod variants are
+    skipped if the layout geometry does not support it.
+
+    `svg_geometries` adds SVG drawings of each variant for other keyboard
+    geometries (see `web.GEOMETRY_CLASSMAP`): `{fileName}.{geometry}.svg`."""
+
+    from .outputs import write_svg
+
+    paths = []
+    for variant, variant_layout in matrix_variants(layout, variants, svg_geometries):
+        variant_dir = output_dir_path / variant.name
+        paths += build_all(variant_layout, variant_dir, threads)
+        for geometry in svg_geometries:
+            path = variant_dir / f"{layout.meta['fileName']}.{geometry}.svg"
+            with path.open("wb") as file:
+                write_svg(variant_layout, file, geometry)
+            click.echo(f"... {path}")
+            paths.append(path)
+    return paths
+
+
+def archive_layout(
+    archive: "Archive",
+    layout: "KeyboardLayout",
+    matrix: bool = False,
+    svg_geometries: Sequence[str] = (),
+) -> List[str]:
+    """Add all output files of a layout (or of all its variants, in their own
+    subdirectories) to an archive, and return the names of the entries."""
+
+    from .outputs import write_svg
+
+    if matrix:
+        variants = [
+            (f"{variant.name}/", variant_layout)
+            for variant, variant_layout in matrix_variants(
+                layout, svg_geometries=svg_geometries
+            )
+        ]
+    else:
+        variants = [("", layout)]
+
+    names = []
+    for prefix, variant_layout in variants:
+        entries: List[Tuple[str, Callable[[BinaryIO], None]]] = [
+            (ext, partial(write, variant_layout))
+            for ext, write in OUTPUT_FORMATS.items()
+        ]
+        for geometry in svg_geometries if matrix else ():
+            write_geometry = partial(write_svg, variant_layout, geometry=geometry)
+            entries.append((f".{geometry}.svg", write_geometry))
+
+        for ext, write in entries:
+            name = prefix + layout.meta["fileName"] + ext
+            try:
+                archive.add(name, write)
+            except OutputWarning as warning:
+                echo_warning(str(warning))
+            click.echo(f"... {archive.path}:{name}")
+            names.append(name)
+    return names
+
+
+def build_layout(
+    job: BuildJob, archive: Optional["Archive"] = None, threads: int = 1
+) -> BuildOutputs:
+    """Build one layout descriptor, into its output directory or into an
+    archive (raises SystemExit on parsing errors). With `threads` > 1, the
+    output files are written concurrently (see `build_all`)."""
+
+    from .cache import parse_layout
+
+    layout = parse_layout(
+        job.input_file, job.angle_mod, job.qwerty_shortcuts, job.cache
+    )
+    layout.stamp = job.stamp
+    parent = None
+    if "extends" in layout.meta:
+        parent = job.input_file.parent / layout.meta["extends"]
+
+    if archive is not None:
+        names = archive_layout(archive, layout, job.matrix, job.svg_geometries)
+        return BuildOutputs([Path(name) for name in names], parent)
+
+    if job.matrix:
+        files = build_matrix(
+            layout, job.output_dir, svg_geometries=job.svg_geometries, threads=threads
+        )
+        return BuildOutputs(files, parent)
+
+    # default: build all in the `dist` subdirectory
+    if job.out == "all":
+        files = build_all(layout, job.output_dir, threads, processes=True)
+        return BuildOutputs(files, parent)
+
+    output_file = output_path(job.input_file, job.out)
+    assert output_file is not None, "unsupported output format"
+    echo_warning(write_output(layout, output_file))
+
+    # successfully converted, display file name
+    click.echo(f"... {output_file}")
+    return BuildOutputs([output_file], parent)
+
+
+def try_build_layout(
+    job: BuildJob, archive: Optional["Archive"] = None, threads: int = 1
+) -> Optional[BuildOutputs]:
+    """Build one layout descriptor, reporting errors instead of raising them."""
+
+    try:
+        return build_layout(job, archive, threads)
+    except SystemExit:  # `load_layout` has already reported the error
+        return None
+    except Exception as exc:  # noqa: BLE001 -- the other layouts are still built
+        click.echo(f"Error: {exc}", err=True)
+        return None
+
+
+def run_build_job(job: BuildJob, threads: int = 1) -> BuildResult:
+    """Build one layout descriptor in a worker process, capturing its output."""
+
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        outputs = try_build_layout(job, threads=threads)
+    return BuildResult(stdout.getvalue(), stderr.getvalue(), outputs)
+
+
+def preload() -> None:
+    """Load all generators and templates, so that forked workers start warm."""
+
+    from .generators import ahk, keylayout, klc, web, xkb  # noqa: F401
+    from .template import get_template
+
+    for path in (Path(__file__).parent / "templates").iterdir():
+        get_template(path.name)
+
+
+def _build_jobs(
+    jobs: List[BuildJob], processes: int, threads: int = 1
+) -> Iterator[BuildResult]:
+    """Build results, in the job order. Without worker processes, the build
+    messages are printed right away instead of being captured."""
+
+    if processes <= 1:
+        for job in jobs:
+            yield BuildResult("", "", try_build_layout(job, threads=threads))
+        return
+
+    import multiprocessing
+
+    preload()
+    if sys.platform == "linux":  # fork after preloading: warm workers
+        context = multiprocessing.get_context("fork")
+    else:  # forking is unsafe or unavailable on macOS and Windows
+        context = multiprocessing.get_context("spawn")
+    with context.Pool(processes) as pool:
+        yield from pool.imap(partial(run_build_job, threads=threads), jobs)
+
+
+def build_layouts(
+    jobs: List[BuildJob], processes: int = 1, force: bool = False
+) -> List[Path]:
+    """Build several layout descriptors, with a pool of worker processes if
+    `processes` > 1 (0: one per CPU). When there are more processes than
+    layouts to build, the spare ones write the output files of each layout
+    concurrently (see `build_all`), and so do all of them when called from
+    another thread than the main one. The build messages are printed in the
+    descriptor order. Returns the descriptors that could not be built.
+
+    Descriptors whose outputs are up to date, according to the build manifest
+    of their `dist` directory, are skipped unless `force` is set. Single-file
+    outputs (`--out`) are always built."""
+
+    manifests: Dict[Path, Manifest] = {}
+    for job in jobs:
+        if job.manifest_dir and job.manifest_dir not in manifests:
+            manifests[job.manifest_dir] = Manifest(job.manifest_dir)
+    pending = [
+        job
+        for job in jobs
+        if force
+        or not job.manifest_dir
+        or not manifests[job.manifest_dir].is_up_to_date(job.input_file, job.flags)
+    ]
+
+    import threading
+
+    if processes == 0:
+        processes = os.cpu_count() or 1
+    if threading.current_thread() is threading.main_thread():
+        workers = max(min(processes, len(pending)), 1)
+    else:  # no fork from a multithreaded process, e.g. `kalamine daemon`
+        workers = 1
+    results = _build_jobs(pending, workers, processes // workers)
+
+    failed = []
+    for job in jobs:
+        manifest = manifests.get(job.manifest_dir) if job.manifest_dir else None
+        if job not in pending:
+            click.echo(f"... {job.input_file}: up to date")
+            continue
+        result = next(results)
+        click.echo(result.stdout, nl=False)
+        click.echo(result.stderr, nl=False, err=True)
+        if result.outputs is None:
+            failed.append(job.input_file)
+            if manifest:
+                manifest.remove(job.input_file)
+        elif manifest:
+            files, parent = result.outputs
+            manifest.update(job.input_file, job.flags, files, parent)
+
+    for manifest in manifests.values():
+        try:
+            manifest.save()
+        except OSError as exc:  # read-only output directory, etc.
+            click.echo(f"Warning: {exc}", err=True)
+    return failed
+
+
+def build_archive(
+    jobs: List[BuildJob], archive_path: Path, stamp: Optional["BuildStamp"] = None
+) -> List[Path]:
+    """Build several layout descriptors into a zip or tar.gz archive, one after
+    another. Returns the descriptors that could not be built."""
+
+    from .archive import Archive
+
+    failed = []
+    with Archive(archive_path, stamp) as archive:
+        for job in jobs:
+            if try_build_layout(job, archive) is None:
+                failed.append(job.input_file)
+    return failed
@@ -0,0 +1,165 @@
+"""
+Content-addressed cache of parsed layouts (opt-in).
+
+Entries are stored in `$XDG_CACHE_HOME/kalamine`, and keyed by a hash of the
+layout descriptor, the build flags and the kalamine sources (see
+`sources_digest`). Layouts that extend another descriptor also record the hash
+of their parent, which is checked on every lookup. The least recently used
+entries are evicted when the cache exceeds its size limit.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from os import environ
+from pathlib import Path
+from typing import Mapping, Optional
+
+from .layout import KeyboardLayout, load_layout
+from .sources import sources_digest
+
+
+def xdg_cache_home() -> Path:
+    xdg_cache = environ.get("XDG_CACHE_HOME")
+    if xdg_cache:
+        return Path(xdg_cache)
+    return Path.home() / ".cache"
+
+
+CACHE_HOME = xdg_cache_home() / "kalamine"
+CACHE_MAX_SIZE = 32 * 1024 * 1024  # bytes
+
+
+def cache_enabled(env: Mapping[str, str] = environ) -> bool:
+    """The cache is disabled unless the KALAMINE_CACHE variable is set."""
+    return env.get("KALAMINE_CACHE", "0").lower() not in ["", "0", "false", "no"]
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class LayoutCache:
+    """On-disk cache of parsed `KeyboardLayout` objects."""
+
+    def __init__(self, path: Path = CACHE_HOME, max_size: int = CACHE_MAX_SIZE):
+        self._path = path
+        self._max_size = max_size
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def key(
+        self, layout_path: Path, angle_mod: bool = False, qwerty_shortcuts: bool = False
+    ) -> str:
+        """Cache key of a layout descriptor, for the given build flags."""
+
+        digest = hashlib.sha256()
+        for item in [
+            sources_digest(),
+            layout_path.stem,  # default layout name
+            "angle_mod" if angle_mod else "",
+            "qwerty_shortcuts" if qwerty_shortcuts else "",
+        ]:
+            digest.update(item.encode("utf-8") + b"\0")
+        digest.update(layout_path.read_bytes())
+        return digest.hexdigest()
+
+    def get(
+        self, layout_path: Path, angle_mod: bool = False, qwerty_shortcuts: bool = False
+    ) -> Optional[KeyboardLayout]:
+        """Cached layout, or None if not found (or outdated)."""
+
+        entry_path = self._path / self.key(layout_path, angle_mod, qwerty_shortcuts)
+        try:
+            entry = json.loads(entry_path.read_bytes())
+            parent = entry["extends"]
+            if parent and _sha256(Path(parent[0]).read_bytes()) != parent[1]:
+                return None
+            layout = KeyboardLayout.from_snapshot(entry["layout"])
+            entry_path.touch()  # most recently used
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return layout
+
+    def put(
+        self,
+        layout_path: Path,
+        layout: KeyboardLayout,
+        angle_mod: bool = False,
+        qwerty_shortcuts: bool = False,
+    ) -> None:
+        """Store a parsed layout, and evict old entries if needed."""
+
+        parent = None
+        if "extends" in layout.meta:
+            parent_path = layout_path.parent / layout.meta["extends"]
+            parent = [str(parent_path), _sha256(parent_path.read_bytes())]
+
+        key = self.key(layout_path, angle_mod, qwerty_shortcuts)
+        try:
+            data = json.dumps(
+                {"extends": parent, "layout": layout.snapshot()},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        except (TypeError, ValueError):  # e.g. TOML dates in the metadata
+            return
+
+        self._path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_path.write_text(data, encoding="utf-8")
+        os.replace(tmp_path, self._path / key)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries above the cache size limit."""
+
+        entries = []
+        total_size = 0
+        for entry_path in self._path.iterdir():
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:  # evicted by a concurrent build
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+            total_size += stat.st_size
+
+        for _, size, entry_path in sorted(entries)[:-1]:  # keep the latest one
+            if total_size <= self._max_size:
+                break
+            entry_path.unlink(missing_ok=True)
+            total_size -= size
+
+    def layout(
+        self, layout_path: Path, angle_mod: bool = False, qwerty_shortcuts: bool = False
+    ) -> KeyboardLayout:
+        """Cached layout, or a freshly parsed one (which is then cached)."""
+
+        layout = self.get(layout_path, angle_mod, qwerty_shortcuts)
+        if layout is None:
+            descriptor = load_layout(layout_path)
+            layout = KeyboardLayout(descriptor, angle_mod, qwerty_shortcuts)
+            try:
+                self.put(layout_path, layout, angle_mod, qwerty_shortcuts)
+            except OSError:  # read-only cache directory, etc.
+                pass
+        return layout
+
+
+def parse_layout(
+    layout_path: Path,
+    angle_mod: bool = False,
+    qwerty_shortcuts: bool = False,
+    cache: Optional[bool] = None,
+) -> KeyboardLayout:
+    """Parse a layout descriptor, using the layout cache if it is enabled
+    (either explicitly, or with the KALAMINE_CACHE environment variable)."""
+
+    if cache is None:
+        cache = cache_enabled()
+    if cache:
+        return LayoutCache().layout(layout_path, angle_mod, qwerty_shortcuts)
+    return KeyboardLayout(load_layout(layout_path), angle_mod, qwerty_shortcuts)
@@ -1,84 +1,24 @@
 #!/usr/bin/env python3
 
+import os
 import sys
-from contextlib import contextmanager
 from importlib import metadata
 from pathlib import Path
-from typing import Iterator, List, Literal, Union
+from typing import List, Literal, Optional, Tuple, Union
 
 import click
 
-from .generators import ahk, keylayout, klc, web, xkb
-from .help import create_layout, user_guide
-from .layout import KeyboardLayout, load_layout
-from .server import keyboard_server
+from .build import BuildJob, build_archive, build_layouts, output_path
+
+# Modules that are only needed by some subcommands are imported by these
+# subcommands: `kalamine build` is often called from Makefiles, and its startup
+# time should not include the web server or unused generators.
 
 
 @click.group()
 def cli() -> None: ...
 
 
-def build_all(layout: KeyboardLayout, output_dir_path: Path) -> None:
-    """Generate all layout output files.
-
-    Parameters
-    ----------
-    layout : KeyboardLayout
-        The layout to process.
-    output_dir_path : Path
-        The output directory.
-    msklc_dir : Path
-        The MSKLC installation directory.
-    """
-
-    @contextmanager
-    def file_creation_context(ext: str = "") -> Iterator[Path]:
-        """Generate an output file path for extension EXT, return it and finally echo info."""
-        path = output_dir_path / (layout.meta["fileName"] + ext)
-        yield path
-        click.echo(f"... {path}")
-
-    if not output_dir_path.exists():
-        output_dir_path.mkdir(parents=True)
-
-    # AHK driver
-    with file_creation_context(".ahk") as ahk_path:
-        with ahk_path.open("w", encoding="utf-8", newline="\n") as file:
-            file.write("\ufeff")  # AHK scripts require a BOM
-            file.write(ahk.ahk(layout))
-
-    # Windows driver
-    with file_creation_context(".klc") as klc_path:
-        with klc_path.open("w", encoding="utf-16le", newline="\r\n") as file:
-            try:
-                file.write(klc.klc(layout))
-            except ValueError as err:
-                print(err)
-
-    # macOS driver
-    with file_creation_context(".keylayout") as osx_path:
-        with osx_path.open("w", encoding="utf-8", newline="\n") as file:
-            file.write(keylayout.keylayout(layout))
-
-    # Linux driver, user-space
-    with file_creation_context(".xkb_keymap") as xkb_path:
-        with xkb_path.open("w", encoding="utf-8", newline="\n") as file:
-            file.write(xkb.xkb_keymap(layout))
-
-    # Linux driver, root
-    with file_creation_context(".xkb_symbols") as xkb_custom_path:
-        with xkb_custom_path.open("w", encoding="utf-8", newline="\n") as file:
-            file.write(xkb.xkb_symbols(layout))
-
-    # JSON data
-    with file_creation_context(".json") as json_path:
-        json_path.write_text(web.pretty_json(layout), encoding="utf8")
-
-    # SVG data
-    with file_creation_context(".svg") as svg_path:
-        web.svg(layout).write(svg_path, encoding="utf-8", xml_declaration=True)
-
-
 @cli.command()
 @click.argument(
     "layout_descriptors",
@@ -102,65 +42,137 @@ def build_all(layout: KeyboardLayout, output_dir_path: Path) -> None:
     is_flag=True,
     help="Keep shortcuts at their qwerty location",
 )
+@click.option(
+    "--cache/--no-cache",
+    default=None,
+    help="Use the parsed layout cache (default: $KALAMINE_CACHE)",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    type=click.IntRange(min=0),
+    help="Number of layouts to build in parallel (0: one per CPU)",
+)
+@click.option(
+    "--force",
+    default=False,
+    is_flag=True,
+    help="Rebuild the layouts whose outputs are up to date",
+)
+@click.option(
+    "--reproducible",
+    default=False,
+    is_flag=True,
+    help="Do not stamp the build date (default: $SOURCE_DATE_EPOCH)",
+)
+@click.option(
+    "--matrix",
+    default=False,
+    is_flag=True,
+    help="Build all angle-mod and qwerty-shortcuts variants from a single parse",
+)
+@click.option(
+    "--svg-geometry",
+    multiple=True,
+    help="With --matrix: also draw the layouts for this keyboard geometry",
+)
+@click.option(
+    "--archive",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write all outputs into a .zip or .tar.gz archive instead of `dist`",
+)
+@click.option(
+    "--watch",
+    default=False,
+    is_flag=True,
+    help="Rebuild the outputs that change when a descriptor is modified",
+)
+@click.option(
+    "--daemon/--no-daemon",
+    default=True,
+    help="Forward the build to a running `kalamine daemon`, if any",
+)
 def build(
     layout_descriptors: List[Path],
     out: Union[Path, Literal["all"]],
     angle_mod: bool,
     qwerty_shortcuts: bool,
+    cache: Optional[bool],
+    jobs: int,
+    force: bool,
+    reproducible: bool,
+    matrix: bool,
+    svg_geometry: Tuple[str, ...],
+    archive: Optional[Path],
+    watch: bool,
+    daemon: bool,
 ) -> None:
     """Convert TOML/YAML descriptions into OS-specific keyboard drivers."""
 
-    for input_file in layout_descriptors:
-        layout = KeyboardLayout(load_layout(input_file), angle_mod, qwerty_shortcuts)
-
-        # default: build all in the `dist` subdirectory
-        if out == "all":
-            build_all(layout, Path("dist"))
-            continue
-
-        # quick output: reuse the input name and change the file extension
-        if out in ["keylayout", "klc", "xkb_keymap", "xkb_symbols", "svg"]:
-            output_file = input_file.with_suffix(f".{out}")
-        else:
-            output_file = Path(out)
-
-        # detailed output
-        if output_file.suffix == ".ahk":
-            with output_file.open("w", encoding="utf-8", newline="\n") as file:
-                file.write("\ufeff")  # AHK scripts require a BOM
-                file.write(ahk.ahk(layout))
-
-        elif output_file.suffix == ".klc":
-            with output_file.open("w", encoding="utf-16le", newline="\r\n") as file:
-                try:
-                    file.write(klc.klc(layout))
-                except ValueError as err:
-                    print(err)
-
-        elif output_file.suffix == ".keylayout":
-            with output_file.open("w", encoding="utf-8", newline="\n") as file:
-                file.write(keylayout.keylayout(layout))
-
-        elif output_file.suffix == ".xkb_keymap":
-            with output_file.open("w", encoding="utf-8", newline="\n") as file:
-                file.write(xkb.xkb_keymap(layout))
-
-        elif output_file.suffix == ".xkb_symbols":
-            with output_file.open("w", encoding="utf-8", newline="\n") as file:
-                file.write(xkb.xkb_symbols(layout))
-
-        elif output_file.suffix == ".json":
-            output_file.write_text(web.pretty_json(layout), encoding="utf8")
-
-        elif output_file.suffix == ".svg":
-            web.svg(layout).write(output_file, encoding="utf-8", xml_declaration=True)
-
-        else:
-            click.echo("Unsupported output format.", err=True)
+    if reproducible:  # inherited by the worker processes
+        os.environ["KALAMINE_REPRODUCIBLE"] = "1"
+
+    output = str(out)
+    if output != "all" and any(
+        output_path(input_file, output) is None for input_file in layout_descriptors
+    ):
+        click.echo("Unsupported output format.", err=True)
+        return
+    if matrix and output != "all":
+        click.echo("A build matrix requires all output formats.", err=True)
+        return
+    if archive:
+        from .archive import archive_suffix
+
+        if output != "all":
+            click.echo("An archive requires all output formats.", err=True)
             return
-
-        # successfully converted, display file name
-        click.echo(f"... {output_file}")
+        if not archive_suffix(archive):
+            click.echo("Unsupported archive format: use .zip or .tar.gz.", err=True)
+            return
+    if svg_geometry and not matrix:
+        click.echo("SVG geometries require a build matrix.", err=True)
+        return
+    if watch and (matrix or archive):
+        click.echo("Watch mode does not support --matrix or --archive.", err=True)
+        return
+
+    build_jobs = [
+        BuildJob(
+            input_file,
+            output,
+            angle_mod,
+            qwerty_shortcuts,
+            cache,
+            matrix,
+            svg_geometry,
+        )
+        for input_file in layout_descriptors
+    ]
+    if watch:
+        from .watcher import watch_layouts
+
+        watch_layouts(build_jobs)
+        return
+
+    failed = None
+    if daemon and sys.platform != "win32":
+        from .daemon import DaemonError, remote_build
+
+        try:
+            failed = remote_build(build_jobs, jobs, force, archive)
+        except DaemonError as exc:  # e.g. another kalamine version or checkout
+            click.echo(f"Warning: {exc}, building locally.", err=True)
+    if failed is None and archive:  # single process, no build manifest
+        failed = build_archive(build_jobs, archive)
+    elif failed is None:
+        failed = build_layouts(build_jobs, jobs, force)
+    if failed:
+        click.echo(f"{len(failed)} layout(s) could not be built:", err=True)
+        for input_file in failed:
+            click.echo(f"    {input_file}", err=True)
+        sys.exit(1)
 
 
 # TODO: Provide geometry choices
@@ -171,6 +183,8 @@ def build(
 @click.option("--1dk/--no-1dk", "odk", default=False, help="Set a custom dead key.")
 def new(output_file: Path, geometry: str, altgr: bool, odk: bool) -> None:
     """Create a new TOML layout description."""
+    from .help import create_layout
+
     create_layout(output_file, geometry, altgr, odk)
     click.echo(f"... {output_file}")
 
@@ -182,14 +196,59 @@ def new(output_file: Path, geometry: str, altgr: bool, odk: bool) -> None:
     default=False,
     help="Apply Angle-Mod (which is a [ZXCVB] permutation with the LSGT key (a.k.a. ISO key))",
 )
-def watch(filepath: Path, angle_mod: bool) -> None:
-    """Watch a layout description file and display it in a web browser."""
-    keyboard_server(filepath, angle_mod)
+@click.option(
+    "--cache/--no-cache",
+    default=None,
+    help="Use the parsed layout cache (default: $KALAMINE_CACHE)",
+)
+def watch(filepath: Path, angle_mod: bool, cache: Optional[bool]) -> None:
+    """Watch a layout description file (or a directory of layout description
+    files) and display it in a web browser."""
+    if filepath.is_dir():
+        from .directory_server import directory_server
+
+        directory_server(filepath, angle_mod, cache)
+        return
+
+    from .server import keyboard_server
+
+    keyboard_server(filepath, angle_mod, cache)
+
+
+@cli.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Unix socket to listen on (default: $KALAMINE_DAEMON)",
+)
+@click.option("--stop", default=False, is_flag=True, help="Stop the running daemon.")
+def daemon(socket_path: Optional[Path], stop: bool) -> None:
+    """Keep kalamine loaded and build layouts on request, to speed up builds."""
+    if sys.platform == "win32":
+        click.echo("The build daemon is not available on Windows.", err=True)
+        sys.exit(1)
+
+    from .daemon import DaemonError, request, serve
+
+    try:
+        if stop:
+            if request({"command": "stop"}, socket_path) is None:
+                click.echo("No daemon is running.", err=True)
+                sys.exit(1)
+            click.echo("Daemon stopped.")
+        else:
+            serve(socket_path)
+    except DaemonError as exc:
+        click.echo(f"Error: {exc}.", err=True)
+        sys.exit(1)
 
 
 @cli.command()
 def guide() -> None:
     """Show user guide and exit."""
+    from .help import user_guide
+
     sys.stdout.reconfigure(encoding="utf-8")
     click.echo(user_guide())
 
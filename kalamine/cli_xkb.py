@@ -9,8 +9,9 @@ from typing import Dict, List, Optional, Union
 
 import click
 
+from .cache import parse_layout
 from .generators import xkb
-from .layout import KeyboardLayout, load_layout
+from .layout import KeyboardLayout
 from .xkb_manager import WAYLAND, KbdIndex, XKBManager
 
 
@@ -29,7 +30,12 @@ def cli() -> None:
     default=False,
     help="Apply Angle-Mod (which is a [ZXCVB] permutation with the LSGT key (a.k.a. ISO key))",
 )
-def apply(filepath: Path, angle_mod: bool) -> None:
+@click.option(
+    "--cache/--no-cache",
+    default=None,
+    help="Use the parsed layout cache (default: $KALAMINE_CACHE)",
+)
+def apply(filepath: Path, angle_mod: bool, cache: Optional[bool]) -> None:
     """Apply a Kalamine layout."""
 
     if WAYLAND:
@@ -37,7 +43,7 @@ def apply(filepath: Path, angle_mod: bool) -> None:
             "You appear to be running Wayland, which does not support this operation."
         )
 
-    layout = KeyboardLayout(load_layout(filepath), angle_mod)
+    layout = parse_layout(filepath, angle_mod, cache=cache)
     with tempfile.NamedTemporaryFile(
         mode="w+", suffix=".xkb_keymap", encoding="utf-8"
     ) as temp_file:
@@ -54,7 +60,12 @@ def apply(filepath: Path, angle_mod: bool) -> None:
     default=False,
     help="Apply Angle-Mod (which is a [ZXCVB] permutation with the LSGT key (a.k.a. ISO key))",
 )
-def install(layouts: List[Path], angle_mod: bool) -> None:
+@click.option(
+    "--cache/--no-cache",
+    default=None,
+    help="Use the parsed layout cache (default: $KALAMINE_CACHE)",
+)
+def install(layouts: List[Path], angle_mod: bool, cache: Optional[bool]) -> None:
     """Install a list of Kalamine layouts."""
 
     if not layouts:
@@ -63,8 +74,7 @@ def install(layouts: List[Path], angle_mod: bool) -> None:
     kb_locales = set()
     kb_layouts = []
     for file in layouts:
-        layout_file = load_layout(file)
-        layout = KeyboardLayout(layout_file, angle_mod)
+        layout = parse_layout(file, angle_mod, cache=cache)
         kb_layouts.append(layout)
         kb_locales.add(layout.meta["locale"])
 
@@ -0,0 +1,374 @@
+"""
+Build daemon: keeps kalamine warm (imports, data tables, templates) and builds
+layouts on request, over a Unix socket (not available on Windows).
+
+Requests and responses are single lines of JSON. `kalamine build` forwards its
+work to a running daemon, and builds the layouts itself if there is none.
+Builds are run concurrently, one thread per client: the paths are resolved
+against the working directory of the client, and its build environment is
+turned into build settings, so that the process state is left untouched. The
+build messages are captured per thread.
+"""
+
+import base64
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from contextlib import contextmanager
+from importlib import metadata
+from os import environ
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from .build import QUICK_OUTPUTS, BuildJob
+from .sources import sources_digest
+
+if TYPE_CHECKING:
+    from .utils import BuildStamp
+
+PROTOCOL_VERSION = 1
+
+# environment variables that change the outputs of a build
+BUILD_ENV = ["KALAMINE_CACHE", "KALAMINE_REPRODUCIBLE", "SOURCE_DATE_EPOCH"]
+
+
+class DaemonError(Exception):
+    """Request rejected by the daemon."""
+
+
+def socket_path() -> Path:
+    """Socket of the daemon: $KALAMINE_DAEMON if set, or a per-user socket."""
+
+    path = environ.get("KALAMINE_DAEMON")
+    if path:
+        return Path(path)
+    runtime_dir = environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "kalamine.sock"
+
+    import tempfile
+
+    user_id = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(tempfile.gettempdir()) / f"kalamine-{user_id}.sock"
+
+
+###
+# Client
+#
+
+
+def request(message: Dict[str, Any], path: Optional[Path] = None) -> Optional[Dict]:
+    """Send a request to the daemon, and return its response, or None if no
+    daemon is listening. Raises DaemonError if the request is rejected, or if
+    the socket belongs to another user (who would get the client requests)."""
+
+    path = path or socket_path()
+    if not path.is_socket():
+        return None
+    if hasattr(os, "getuid") and path.stat().st_uid != os.getuid():
+        raise DaemonError(f"{path} belongs to another user")
+
+    message = {
+        "protocol": PROTOCOL_VERSION,
+        "version": metadata.version("kalamine"),
+        "sources": sources_digest(),
+        **message,
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(path))
+            sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+    except OSError:  # stale socket, daemon stopped meanwhile, etc.
+        return None
+    if not line:
+        return None
+
+    response = json.loads(line)
+    if "error" in response:
+        raise DaemonError(response["error"])
+    return response
+
+
+def remote_build(
+    jobs: List[BuildJob],
+    processes: int = 1,
+    force: bool = False,
+    archive: Optional[Path] = None,
+    path: Optional[Path] = None,
+) -> Optional[List[Path]]:
+    """Same as `build_layouts` (or `build_archive`), run by the daemon: print
+    the build messages and return the descriptors that could not be built, or
+    None if no daemon is listening."""
+
+    import click
+
+    message = {
+        "command": "build",
+        "cwd": os.getcwd(),
+        "env": {name: environ[name] for name in BUILD_ENV if name in environ},
+        "jobs": [job._asdict() for job in jobs],
+        "processes": processes,
+        "force": force,
+        "archive": archive,
+    }
+    response = request(json.loads(json.dumps(message, default=str)), path)
+    if response is None:
+        return None
+    click.echo(response["stdout"], nl=False)
+    click.echo(response["stderr"], nl=False, err=True)
+    return [Path(input_file) for input_file in response["failed"]]
+
+
+def remote_artifacts(
+    descriptor: Any,
+    formats: Optional[List[str]] = None,
+    flags: Optional[List[str]] = None,
+    path: Optional[Path] = None,
+) -> Optional[Dict[str, bytes]]:
+    """Same as `build_artifacts`, run by the daemon, or None if no daemon is
+    listening. The descriptor is a file path, a TOML text or the descriptor
+    data."""
+
+    message: Dict[str, Any] = {"command": "artifacts", "flags": flags or []}
+    if isinstance(descriptor, dict):
+        message["descriptor"] = descriptor
+    elif isinstance(descriptor, bytes):
+        message["text"] = descriptor.decode("utf-8")
+    elif isinstance(descriptor, str):
+        message["text"] = descriptor
+    else:
+        message["path"] = str(Path(descriptor).resolve())
+    if formats is not None:
+        message["formats"] = formats
+
+    response = request(message, path)
+    if response is None:
+        return None
+    return {ext: base64.b64decode(data) for ext, data in response["artifacts"].items()}
+
+
+###
+# Server
+#
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """Answers the requests of a client connection, one line each."""
+
+    server: "BuildDaemon"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                response = self.server.dispatch(json.loads(line))
+            except (DaemonError, KeyError, OSError, TypeError, ValueError) as exc:
+                response = {"error": str(exc) or exc.__class__.__name__}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class BuildDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Build server, one thread per client connection."""
+
+    daemon_threads = True
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._sources = sources_digest()  # the code that this daemon runs
+        if path.is_socket():
+            if request({"command": "ping"}, path) is not None:
+                raise DaemonError(f"a daemon is already listening on {path}")
+            path.unlink()  # stale socket
+        umask = os.umask(0o077)  # restrict the socket to the current user
+        try:
+            super().__init__(str(path), DaemonHandler)
+        finally:
+            os.umask(umask)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def server_close(self) -> None:
+        super().server_close()
+        ThreadOutput.uninstall()
+        self._path.unlink(missing_ok=True)
+
+    def dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Response to a request."""
+
+        version = metadata.version("kalamine")
+        if message.get("protocol") != PROTOCOL_VERSION:
+            raise DaemonError("unsupported protocol version")
+        if message.get("version") != version:
+            raise DaemonError(f"the daemon runs kalamine {version}")
+        if message.get("sources") != self._sources:  # e.g. edited checkout
+            raise DaemonError("the daemon runs other kalamine sources")
+
+        command = message.get("command")
+        if command == "ping":
+            return {"version": version, "pid": os.getpid()}
+        if command == "stop":
+            threading.Thread(target=self.shutdown).start()
+            return {}
+        if command == "build":
+            return self.build(message)
+        if command == "artifacts":
+            return self.artifacts(message)
+        raise DaemonError(f"unknown command: {command}")
+
+    def build(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Build layout descriptors, as the client would."""
+
+        from .build import build_archive, build_layouts
+        from .cache import cache_enabled
+        from .utils import BuildStamp
+
+        cwd = Path(message["cwd"])
+        stamp = BuildStamp.from_env(message["env"])
+        cache = cache_enabled(message["env"])
+        jobs = [client_job(job, cwd, stamp, cache) for job in message["jobs"]]
+        with capture_output() as (stdout, stderr):
+            if message["archive"]:
+                archive = cwd / message["archive"]
+                failed = build_archive(jobs, archive, stamp)
+            else:
+                failed = build_layouts(jobs, message["processes"], message["force"])
+        return {
+            "stdout": client_paths(stdout.getvalue(), cwd),
+            "stderr": client_paths(stderr.getvalue(), cwd),
+            "failed": [client_paths(str(input_file), cwd) for input_file in failed],
+        }
+
+    def artifacts(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Build output files in memory, base64-encoded."""
+
+        from .build import build_artifacts
+
+        descriptor = message.get("descriptor", message.get("text"))
+        if descriptor is None:
+            descriptor = Path(message["path"])
+        kwargs = {"flags": message.get("flags", [])}
+        if "formats" in message:
+            kwargs["formats"] = message["formats"]
+
+        artifacts = build_artifacts(descriptor, **kwargs)
+        return {
+            "artifacts": {
+                ext: base64.b64encode(data).decode("ascii")
+                for ext, data in artifacts.items()
+            }
+        }
+
+
+def client_job(
+    job: Dict[str, Any], cwd: Path, stamp: "BuildStamp", cache: bool
+) -> BuildJob:
+    """Build job of a client, with paths resolved against its working
+    directory, and the build settings of its environment."""
+
+    out = job["out"]
+    if out != "all" and out not in QUICK_OUTPUTS:
+        out = str(cwd / out)
+    return BuildJob(
+        **{
+            **job,
+            "input_file": cwd / job["input_file"],
+            "out": out,
+            "cache": cache if job["cache"] is None else job["cache"],
+            "svg_geometries": tuple(job["svg_geometries"]),
+            "stamp": stamp,
+            "dist_dir": cwd / job["dist_dir"],
+        }
+    )
+
+
+def client_paths(text: str, cwd: Path) -> str:
+    """Build messages with the paths relative to the working directory of the
+    client, as it has given them (see `client_job`)."""
+
+    if cwd.parent == cwd:  # root directory
+        return text
+    return text.replace(os.path.join(cwd, ""), "")
+
+
+class ThreadOutput(io.TextIOBase):
+    """Standard stream whose output can be captured by each thread, so that
+    concurrent builds do not mix their messages."""
+
+    _install_lock = threading.Lock()
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+        self._local = threading.local()
+
+    @classmethod
+    def install(cls) -> Tuple["ThreadOutput", "ThreadOutput"]:
+        """Wrap the standard output and error, unless already done."""
+
+        with cls._install_lock:
+            if not isinstance(sys.stdout, cls):
+                sys.stdout = cls(sys.stdout)  # type: ignore
+            if not isinstance(sys.stderr, cls):
+                sys.stderr = cls(sys.stderr)  # type: ignore
+            return sys.stdout, sys.stderr  # type: ignore
+
+    @classmethod
+    def uninstall(cls) -> None:
+        with cls._install_lock:
+            if isinstance(sys.stdout, cls):
+                sys.stdout = sys.stdout._stream
+            if isinstance(sys.stderr, cls):
+                sys.stderr = sys.stderr._stream
+
+    @property
+    def encoding(self) -> str:  # type: ignore
+        return "utf-8"
+
+    @contextmanager
+    def capture(self) -> Iterator[io.StringIO]:
+        self._local.buffer = io.StringIO()
+        try:
+            yield self._local.buffer
+        finally:
+            self._local.buffer = None
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._stream).write(text)
+
+    def flush(self) -> None:
+        if not getattr(self._local, "buffer", None):
+            self._stream.flush()
+
+
+@contextmanager
+def capture_output() -> Iterator[Tuple[io.StringIO, io.StringIO]]:
+    """Standard output and error of the current thread (see `ThreadOutput`)."""
+
+    stdout, stderr = ThreadOutput.install()
+    with stdout.capture() as out, stderr.capture() as err:
+        yield out, err
+
+
+def serve(path: Optional[Path] = None) -> None:
+    """Run the build daemon until it is stopped (`kalamine daemon --stop`)."""
+
+    import click
+
+    from .build import preload
+
+    preload()
+    with BuildDaemon(path or socket_path()) as daemon:
+        click.echo(f"Daemon listening on {daemon.path}")
+        click.echo("Hit Ctrl-C to stop.")
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    click.echo("Daemon stopped.")
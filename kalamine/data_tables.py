@@ -0,0 +1,2314 @@
+"""
+Frozen copy of kalamine/data/*.yaml -- generated by `python -m kalamine.freeze`.
+Do not edit: edit the YAML files and run `make data` instead.
+"""
+
+from typing import Any, Callable, Dict
+
+# fmt: off
+
+
+def _dead_keys() -> Any:
+    return [{'char': '**',
+             'name': '1dk',
+             'base': '',
+             'alt': '',
+             'alt_space': "'",
+             'alt_self': "'"},
+            {'char': '*`',
+             'name': 'grave',
+             'base': 'AaEeIiNnOoUuWwYyЕеИи',
+             'alt': 'ÀàÈèÌìǸǹÒòÙùẀẁỲỳЀѐЍѝ',
+             'alt_space': '`',
+             'alt_self': '`'},
+            {'char': '*‟',
+             'name': 'doublegrave',
+             'base': 'AaEeIiOoRrUuѴѴ',
+             'alt': 'ȀȁȄȅȈȉȌȍȐȑȔȕѶѷ',
+             'alt_space': '‟',
+             'alt_self': '‟'},
+            {'char': '*´',
+             'name': 'acute',
+             'base': 'AaCcEeGgIiKkLlMmNnOoPpRrSsUuWwYyZzΑαΕεΗηΙιΟοΥυΩωГгКк',
+             'alt': 'ÁáĆćÉéǴǵÍíḰḱĹĺḾḿŃńÓóṔṕŔŕŚśÚúẂẃÝýŹźΆάΈέΉήΊίΌόΎύΏώЃѓЌќ',
+             'alt_space': "'",
+             'alt_self': '´'},
+            {'char': '*”',
+             'name': 'doubleacute',
+             'base': 'OoUuУу',
+             'alt': 'ŐőŰűӲӳ',
+             'alt_space': '”',
+             'alt_self': '˝'},
+            {'char': '*^',
+             'name': 'circumflex',
+             'base': 'AaCcEeGgHhIiJjOoSsUuWwYyZz0123456789()+-=',
+             'alt': 'ÂâĈĉÊêĜĝĤĥÎîĴĵÔôŜŝÛûŴŵŶŷẐẑ⁰¹²³⁴⁵⁶⁷⁸⁹⁽⁾⁺⁻⁼',
+             'alt_space': '^',
+             'alt_self': '^'},
+            {'char': '*ˇ',
+             'name': 'caron',
+             'base': 'AaCcDdEeGgHhIiKkLlNnOoRrSsTtUuZzƷʒ0123456789()+-=',
+             'alt': 'ǍǎČčĎďĚěǦǧȞȟǏǐǨǩĽľŇňǑǒŘřŠšŤťǓǔŽžǮǯ₀₁₂₃₄₅₆₇₈₉₍₎₊₋₌',
+             'alt_space': 'ˇ',
+             'alt_self': 'ˇ'},
+            {'char': '*˘',
+             'name': 'breve',
+             'base': 'AaEeGgIiOoUuΑαΙιΥυАаЕеЖжИиУу',
+             'alt': 'ĂăĔĕĞğĬĭŎŏŬŭᾸᾰῘῐῨῠӐӑӖӗӁӂЙйЎў',
+             'alt_space': '˘',
+             'alt_self': '˘'},
+            {'char': '*⁻',
+             'name': 'invertedbreve',
+             'base': 'AaEeIiOoUuRr',
+             'alt': 'ȂȃȆȇȊȋȎȏȖȗȒȓ',
+             'alt_space': '˘',
+             'alt_self': '˘'},
+            {'char': '*~',
+             'name': 'tilde',
+             'base': 'AaEeIiNnOoUuVvYy<>=',
+             'alt': 'ÃãẼẽĨĩÑñÕõŨũṼṽỸỹ≲≳≃',
+             'alt_space': '~',
+             'alt_self': '~'},
+            {'char': '*¯',
+             'name': 'macron',
+             'base': 'AaÆæEeGgIiOoUuYy',
+             'alt': 'ĀāǢǣĒēḠḡĪīŌōŪūȲȳ',
+             'alt_space': '¯',
+             'alt_self': 'ˉ'},
+            {'char': '*¨',
+             'name': 'diaeresis',
+             'base': 'AaEeHhIiOotUuWwXxYyΙιΥυАаЕеӘәЖжЗзИиІіОоӨөУуЧчЫыЭэ',
+             'alt': 'ÄäËëḦḧÏïÖöẗÜüẄẅẌẍŸÿΪϊΫϋӒӓЁёӚӛӜӝӞӟӤӥЇїӦӧӪӫӰӱӴӵӸӹӬӭ',
+             'alt_space': '"',
+             'alt_self': '¨'},
+            {'char': '*˚',
+             'name': 'abovering',
+             'base': 'AaUuwy',
+             'alt': 'ÅåŮůẘẙ',
+             'alt_space': '˚',
+             'alt_self': '˚'},
+            {'char': '*¸',
+             'name': 'cedilla',
+             'base': 'CcDdEeGgHhKkLlNnRrSsTt',
+             'alt': 'ÇçḐḑȨȩĢģḨḩĶķĻļŅņŖŗŞşŢţ',
+             'alt_space': '¸',
+             'alt_self': '¸'},
+            {'char': '*,',
+             'name': 'belowcomma',
+             'base': 'SsTt',
+             'alt': 'ȘșȚț',
+             'alt_space': ',',
+             'alt_self': ','},
+            {'char': '*˛',
+             'name': 'ogonek',
+             'base': 'AaEeIiOoUu',
+             'alt': 'ĄąĘęĮįǪǫŲų',
+             'alt_space': '˛',
+             'alt_self': '˛'},
+            {'char': '*/',
+             'name': 'stroke',
+             'base': 'AaBbCcDdEeGgHhIiJjLlOoPpRrTtUuYyZz<≤≥>=',
+             'alt': 'ȺⱥɃƀȻȼĐđɆɇǤǥĦħƗɨɈɉŁłØøⱣᵽɌɍŦŧɄʉɎɏƵƶ≮≰≱≯≠',
+             'alt_space': '/',
+             'alt_self': '/'},
+            {'char': '*˙',
+             'name': 'abovedot',
+             'base': 'AaBbCcDdEeFfGgHhIijLlMmNnOoPpRrSsTtWwXxYyZz',
+             'alt': 'ȦȧḂḃĊċḊḋĖėḞḟĠġḢḣİıȷĿŀṀṁṄṅȮȯṖṗṘṙṠṡṪṫẆẇẊẋẎẏŻż',
+             'alt_space': '˙',
+             'alt_self': '˙'},
+            {'char': '*.',
+             'name': 'belowdot',
+             'base': 'AaBbDdEeHhIiKkLlMmNnOoRrSsTtUuVvWwYyZz',
+             'alt': 'ẠạḄḅḌḍẸẹḤḥỊịḲḳḶḷṂṃṆṇỌọṚṛṢṣṬṭỤụṾṿẈẉỴỵẒẓ',
+             'alt_space': '.',
+             'alt_self': '.'},
+            {'char': '*µ',
+             'name': 'greek',
+             'base': 'AaBbDdEeFfGgHhIiJjKkLlMmNnOoPpQqRrSsTtUuWwXxYyZz',
+             'alt': 'ΑαΒβΔδΕεΦφΓγΗηΙιΘθΚκΛλΜμΝνΟοΠπΧχΡρΣσΤτΥυΩωΞξΨψΖζ',
+             'alt_space': 'µ',
+             'alt_self': 'µ'},
+            {'char': '*¤',
+             'name': 'currency',
+             'base': 'AaBbÇCçcDdEeFfGgHhIiKkLlMmNnOoPpRrSsTtþÞUuWwYy',
+             'alt': '₳؋₱฿₵₡₵¢₯₫₠€₣ƒ₲₲₴₴៛﷼₭₭₤£ℳ₥₦₦૱௹₧₰₨₢$₪₮৳৲৲圓元₩₩円¥',
+             'alt_space': '¤',
+             'alt_self': '¤'}]
+
+
+def _geometry() -> Any:
+    return {'ANSI': {'template': '┌─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┲━━━━━━━━━━┓\n'
+                                 '│     │     │     │     │     │     │     │     │     │     '
+                                 '│     │     │     ┃          ┃\n'
+                                 '│     │     │     │     │     │     │     │     │     │     '
+                                 '│     │     │     ┃ ⌫        ┃\n'
+                                 '┢━━━━━┷━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┺━━┯━━━━━━━┩\n'
+                                 '┃        ┃     │     │     │     │     │     │     │     '
+                                 '│     │     │     │     │       │\n'
+                                 '┃ ↹      ┃     │     │     │     │     │     │     │     '
+                                 '│     │     │     │     │       │\n'
+                                 '┣━━━━━━━━┻┱────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┲━━━━┷━━━━━━━┪\n'
+                                 '┃         ┃     │     │     │     │     │     │     │     '
+                                 '│     │     │     ┃            ┃\n'
+                                 '┃ ⇬       ┃     │     │     │     │     │     │     │     '
+                                 '│     │     │     ┃ ⏎          ┃\n'
+                                 '┣━━━━━━━━━┻━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┲━━┻━━━━━━━━━━━━┫\n'
+                                 '┃            ┃     │     │     │     │     │     │     '
+                                 '│     │     │     ┃               ┃\n'
+                                 '┃ ⇧          ┃     │     │     │     │     │     │     '
+                                 '│     │     │     ┃ ⇧             ┃\n'
+                                 '┣━━━━━━━┳━━━━┻━━┳━━┷━━━━┱┴─────┴─────┴─────┴─────┴─────┴─┲━━━┷━━━┳━┷━━━━━╋━━━━━━━┳━━━━━━━┫\n'
+                                 '┃       ┃       ┃       ┃                                '
+                                 '┃       ┃       ┃       ┃       ┃\n'
+                                 '┃ Ctrl  ┃ super ┃ Alt   ┃ ␣                              ┃ '
+                                 'Alt   ┃ super ┃ menu  ┃ Ctrl  ┃\n'
+                                 '┗━━━━━━━┻━━━━━━━┻━━━━━━━┹────────────────────────────────┺━━━━━━━┻━━━━━━━┻━━━━━━━┻━━━━━━━┛\n',
+                     'rows': [{'offset': 2,
+                               'keys': ['tlde',
+                                        'ae01',
+                                        'ae02',
+                                        'ae03',
+                                        'ae04',
+                                        'ae05',
+                                        'ae06',
+                                        'ae07',
+                                        'ae08',
+                                        'ae09',
+                                        'ae10',
+                                        'ae11',
+                                        'ae12']},
+                              {'offset': 11,
+                               'keys': ['ad01',
+                                        'ad02',
+                                        'ad03',
+                                        'ad04',
+                                        'ad05',
+                                        'ad06',
+                                        'ad07',
+                                        'ad08',
+                                        'ad09',
+                                        'ad10',
+                                        'ad11',
+                                        'ad12',
+                                        'bksl']},
+                              {'offset': 12,
+                               'keys': ['ac01',
+                                        'ac02',
+                                        'ac03',
+                                        'ac04',
+                                        'ac05',
+                                        'ac06',
+                                        'ac07',
+                                        'ac08',
+                                        'ac09',
+                                        'ac10',
+                                        'ac11']},
+                              {'offset': 15,
+                               'keys': ['ab01',
+                                        'ab02',
+                                        'ab03',
+                                        'ab04',
+                                        'ab05',
+                                        'ab06',
+                                        'ab07',
+                                        'ab08',
+                                        'ab09',
+                                        'ab10']}]},
+            'ISO': {'template': '┌─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┲━━━━━━━━━━┓\n'
+                                '│     │     │     │     │     │     │     │     │     │     '
+                                '│     │     │     ┃          ┃\n'
+                                '│     │     │     │     │     │     │     │     │     │     '
+                                '│     │     │     ┃ ⌫        ┃\n'
+                                '┢━━━━━┷━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┺━━┳━━━━━━━┫\n'
+                                '┃        ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃       ┃\n'
+                                '┃ ↹      ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃       ┃\n'
+                                '┣━━━━━━━━┻┱────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┺┓  '
+                                '⏎   ┃\n'
+                                '┃         ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃      ┃\n'
+                                '┃ ⇬       ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃      ┃\n'
+                                '┣━━━━━━┳━━┹──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┲━━┷━━━━━┻━━━━━━┫\n'
+                                '┃      ┃     │     │     │     │     │     │     │     │     '
+                                '│     │     ┃               ┃\n'
+                                '┃ ⇧    ┃     │     │     │     │     │     │     │     │     '
+                                '│     │     ┃ ⇧             ┃\n'
+                                '┣━━━━━━┻┳━━━━┷━━┳━━┷━━━━┱┴─────┴─────┴─────┴─────┴─────┴─┲━━━┷━━━┳━┷━━━━━╋━━━━━━━┳━━━━━━━┫\n'
+                                '┃       ┃       ┃       ┃                                '
+                                '┃       ┃       ┃       ┃       ┃\n'
+                                '┃ Ctrl  ┃ super ┃ Alt   ┃ ␣                              ┃ '
+                                'AltGr ┃ super ┃ menu  ┃ Ctrl  ┃\n'
+                                '┗━━━━━━━┻━━━━━━━┻━━━━━━━┹────────────────────────────────┺━━━━━━━┻━━━━━━━┻━━━━━━━┻━━━━━━━┛\n',
+                    'rows': [{'offset': 2,
+                              'keys': ['tlde',
+                                       'ae01',
+                                       'ae02',
+                                       'ae03',
+                                       'ae04',
+                                       'ae05',
+                                       'ae06',
+                                       'ae07',
+                                       'ae08',
+                                       'ae09',
+                                       'ae10',
+                                       'ae11',
+                                       'ae12']},
+                             {'offset': 11,
+                              'keys': ['ad01',
+                                       'ad02',
+                                       'ad03',
+                                       'ad04',
+                                       'ad05',
+                                       'ad06',
+                                       'ad07',
+                                       'ad08',
+                                       'ad09',
+                                       'ad10',
+                                       'ad11',
+                                       'ad12']},
+                             {'offset': 12,
+                              'keys': ['ac01',
+                                       'ac02',
+                                       'ac03',
+                                       'ac04',
+                                       'ac05',
+                                       'ac06',
+                                       'ac07',
+                                       'ac08',
+                                       'ac09',
+                                       'ac10',
+                                       'ac11',
+                                       'bksl']},
+                             {'offset': 9,
+                              'keys': ['lsgt',
+                                       'ab01',
+                                       'ab02',
+                                       'ab03',
+                                       'ab04',
+                                       'ab05',
+                                       'ab06',
+                                       'ab07',
+                                       'ab08',
+                                       'ab09',
+                                       'ab10']}]},
+            'ABNT': {'template': '┌─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┲━━━━━━━━━━┓\n'
+                                 '│     │     │     │     │     │     │     │     │     │     '
+                                 '│     │     │     ┃          ┃\n'
+                                 '│     │     │     │     │     │     │     │     │     │     '
+                                 '│     │     │     ┃ ⌫        ┃\n'
+                                 '┢━━━━━┷━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┺━━┳━━━━━━━┫\n'
+                                 '┃        ┃     │     │     │     │     │     │     │     '
+                                 '│     │     │     │     ┃       ┃\n'
+                                 '┃ ↹      ┃     │     │     │     │     │     │     │     '
+                                 '│     │     │     │     ┃       ┃\n'
+                                 '┣━━━━━━━━┻┱────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┺┓  '
+                                 '⏎   ┃\n'
+                                 '┃         ┃     │     │     │     │     │     │     │     '
+                                 '│     │     │     │     ┃      ┃\n'
+                                 '┃ ⇬       ┃     │     │     │     │     │     │     │     '
+                                 '│     │     │     │     ┃      ┃\n'
+                                 '┣━━━━━━┳━━┹──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┲━━┻━━━━━━┫\n'
+                                 '┃      ┃     │     │     │     │     │     │     │     '
+                                 '│     │     │     │     ┃         ┃\n'
+                                 '┃ ⇧    ┃     │     │     │     │     │     │     │     '
+                                 '│     │     │     │     ┃ ⇧       ┃\n'
+                                 '┣━━━━━━┻┳━━━━┷━━┳━━┷━━━━┱┴─────┴─────┴─────┴─────┴─────┴─┲━━━┷━━━┳━┷━━━━━╈━━━━━┻━┳━━━━━━━┫\n'
+                                 '┃       ┃       ┃       ┃                                '
+                                 '┃       ┃       ┃       ┃       ┃\n'
+                                 '┃ Ctrl  ┃ super ┃ Alt   ┃ ␣                              ┃ '
+                                 'AltGr ┃ super ┃ menu  ┃ Ctrl  ┃\n'
+                                 '┗━━━━━━━┻━━━━━━━┻━━━━━━━┹────────────────────────────────┺━━━━━━━┻━━━━━━━┻━━━━━━━┻━━━━━━━┛\n',
+                     'rows': [{'offset': 2,
+                               'keys': ['tlde',
+                                        'ae01',
+                                        'ae02',
+                                        'ae03',
+                                        'ae04',
+                                        'ae05',
+                                        'ae06',
+                                        'ae07',
+                                        'ae08',
+                                        'ae09',
+                                        'ae10',
+                                        'ae11',
+                                        'ae12']},
+                              {'offset': 11,
+                               'keys': ['ad01',
+                                        'ad02',
+                                        'ad03',
+                                        'ad04',
+                                        'ad05',
+                                        'ad06',
+                                        'ad07',
+                                        'ad08',
+                                        'ad09',
+                                        'ad10',
+                                        'ad11',
+                                        'ad12']},
+                              {'offset': 12,
+                               'keys': ['ac01',
+                                        'ac02',
+                                        'ac03',
+                                        'ac04',
+                                        'ac05',
+                                        'ac06',
+                                        'ac07',
+                                        'ac08',
+                                        'ac09',
+                                        'ac10',
+                                        'ac11',
+                                        'bksl']},
+                              {'offset': 9,
+                               'keys': ['lsgt',
+                                        'ab01',
+                                        'ab02',
+                                        'ab03',
+                                        'ab04',
+                                        'ab05',
+                                        'ab06',
+                                        'ab07',
+                                        'ab08',
+                                        'ab09',
+                                        'ab10',
+                                        'ab11']}]},
+            'JIS': {'template': '┏━━━━━┱─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┲━━━━━┓\n'
+                                '┃     ┃     │     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃     ┃\n'
+                                '┃ W.  ┃     │     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃ ⌫   ┃\n'
+                                '┣━━━━━┻━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┲━━┻━━━━━┫\n'
+                                '┃        ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃        ┃\n'
+                                '┃ ↹      ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃        ┃\n'
+                                '┣━━━━━━━━┻┱────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┺┓  '
+                                '⏎    ┃\n'
+                                '┃         ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃       ┃\n'
+                                '┃ ⇬       ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃       ┃\n'
+                                '┣━━━━━━━━━┻━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┲━━┻━━━━━━━┫\n'
+                                '┃            ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     ┃          ┃\n'
+                                '┃ ⇧          ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     ┃ ⇧        ┃\n'
+                                '┣━━━━━━━┳━━━━┻━━┳━━┷━━━━┳┷━━━━┱┴─────┴─────┴─┲━━━┷━┳━━━┷━┳━━━┷━━━┳━┷━━━━━╈━━━━━┻━┳━━━━━━━━┫\n'
+                                '┃       ┃       ┃       ┃     ┃              ┃     ┃     '
+                                '┃       ┃       ┃       ┃        ┃\n'
+                                '┃ Ctrl  ┃ super ┃ Alt   ┃ NC. ┃ ␣            ┃ C.  ┃ K.  ┃ '
+                                'Alt   ┃ super ┃ menu  ┃ Ctrl   ┃\n'
+                                '┗━━━━━━━┻━━━━━━━┻━━━━━━━┻━━━━━┹──────────────┺━━━━━┻━━━━━┻━━━━━━━┻━━━━━━━┻━━━━━━━┻━━━━━━━━┛\n',
+                    'rows': [{'offset': 8,
+                              'keys': ['ae01',
+                                       'ae02',
+                                       'ae03',
+                                       'ae04',
+                                       'ae05',
+                                       'ae06',
+                                       'ae07',
+                                       'ae08',
+                                       'ae09',
+                                       'ae10',
+                                       'ae11',
+                                       'ae12',
+                                       'ae13']},
+                             {'offset': 11,
+                              'keys': ['ad01',
+                                       'ad02',
+                                       'ad03',
+                                       'ad04',
+                                       'ad05',
+                                       'ad06',
+                                       'ad07',
+                                       'ad08',
+                                       'ad09',
+                                       'ad10',
+                                       'ad11',
+                                       'ad12']},
+                             {'offset': 12,
+                              'keys': ['ac01',
+                                       'ac02',
+                                       'ac03',
+                                       'ac04',
+                                       'ac05',
+                                       'ac06',
+                                       'ac07',
+                                       'ac08',
+                                       'ac09',
+                                       'ac10',
+                                       'ac11',
+                                       'bksl']},
+                             {'offset': 15,
+                              'keys': ['ab01',
+                                       'ab02',
+                                       'ab03',
+                                       'ab04',
+                                       'ab05',
+                                       'ab06',
+                                       'ab07',
+                                       'ab08',
+                                       'ab09',
+                                       'ab10',
+                                       'ab11']}]},
+            'ALT': {'template': '┌─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┲━━━━━┓\n'
+                                '│     │     │     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃     ┃\n'
+                                '│     │     │     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃ ⌫   ┃\n'
+                                '┢━━━━━┷━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┲━━┻━━━━━┫\n'
+                                '┃        ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃        ┃\n'
+                                '┃ ↹      ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     │     ┃        ┃\n'
+                                '┣━━━━━━━━┻┱────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┲━━━━┛   '
+                                '⏎    ┃\n'
+                                '┃         ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     ┃             ┃\n'
+                                '┃ ⇬       ┃     │     │     │     │     │     │     │     '
+                                '│     │     │     ┃             ┃\n'
+                                '┣━━━━━━━━━┻━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┲━━┻━━━━━━━━━━━━━┫\n'
+                                '┃            ┃     │     │     │     │     │     │     │     '
+                                '│     │     ┃                ┃\n'
+                                '┃ ⇧          ┃     │     │     │     │     │     │     │     '
+                                '│     │     ┃ ⇧              ┃\n'
+                                '┣━━━━━━━┳━━━━┻━━┳━━┷━━━━┱┴─────┴─────┴─────┴─────┴─────┴─┲━━━┷━━━┳━┷━━━━━╋━━━━━━━┳━━━━━━━━┫\n'
+                                '┃       ┃       ┃       ┃                                '
+                                '┃       ┃       ┃       ┃        ┃\n'
+                                '┃ Ctrl  ┃ super ┃ Alt   ┃ ␣                              ┃ '
+                                'Alt   ┃ super ┃ menu  ┃ Ctrl   ┃\n'
+                                '┗━━━━━━━┻━━━━━━━┻━━━━━━━┹────────────────────────────────┺━━━━━━━┻━━━━━━━┻━━━━━━━┻━━━━━━━━┛\n',
+                    'rows': [{'offset': 2,
+                              'keys': ['tlde',
+                                       'ae01',
+                                       'ae02',
+                                       'ae03',
+                                       'ae04',
+                                       'ae05',
+                                       'ae06',
+                                       'ae07',
+                                       'ae08',
+                                       'ae09',
+                                       'ae10',
+                                       'ae11',
+                                       'ae12',
+                                       'bksl']},
+                             {'offset': 11,
+                              'keys': ['ad01',
+                                       'ad02',
+                                       'ad03',
+                                       'ad04',
+                                       'ad05',
+                                       'ad06',
+                                       'ad07',
+                                       'ad08',
+                                       'ad09',
+                                       'ad10',
+                                       'ad11',
+                                       'ad12']},
+                             {'offset': 12,
+                              'keys': ['ac01',
+                                       'ac02',
+                                       'ac03',
+                                       'ac04',
+                                       'ac05',
+                                       'ac06',
+                                       'ac07',
+                                       'ac08',
+                                       'ac09',
+                                       'ac10',
+                                       'ac11']},
+                             {'offset': 15,
+                              'keys': ['ab01',
+                                       'ab02',
+                                       'ab03',
+                                       'ab04',
+                                       'ab05',
+                                       'ab06',
+                                       'ab07',
+                                       'ab08',
+                                       'ab09',
+                                       'ab10']}]},
+            'ERGO': {'template': '╭╌╌╌╌╌┰─────┬─────┬─────┬─────┬─────┰─────┬─────┬─────┬─────┬─────┰╌╌╌╌╌┬╌╌╌╌╌╮\n'
+                                 '┆     ┃     │     │     │     │     ┃     │     │     │     '
+                                 '│     ┃     ┆     ┆\n'
+                                 '┆     ┃     │     │     │     │     ┃     │     │     │     '
+                                 '│     ┃     ┆     ┆\n'
+                                 '╰╌╌╌╌╌╂─────┼─────┼─────┼─────┼─────╂─────┼─────┼─────┼─────┼─────╂╌╌╌╌╌┼╌╌╌╌╌┤\n'
+                                 '      ┃     │     │     │     │     ┃     │     │     │     '
+                                 '│     ┃     ┆     ┆\n'
+                                 '      ┃     │     │     │     │     ┃     │     │     │     '
+                                 '│     ┃     ┆     ┆\n'
+                                 '      '
+                                 '┠─────┼─────┼─────┼─────┼─────╂─────┼─────┼─────┼─────┼─────╂╌╌╌╌╌┼╌╌╌╌╌┤\n'
+                                 '      ┃     │     │     │     │     ┃     │     │     │     '
+                                 '│     ┃     ┆     ┆\n'
+                                 '      ┃     │     │     │     │     ┃     │     │     │     '
+                                 '│     ┃     ┆     ┆\n'
+                                 '╭╌╌╌╌╌╂─────┼─────┼─────┼─────┼─────╂─────┼─────┼─────┼─────┼─────╂╌╌╌╌╌┴╌╌╌╌╌╯\n'
+                                 '┆     ┃     │     │     │     │     ┃     │     │     │     '
+                                 '│     ┃\n'
+                                 '┆     ┃     │     │     │     │     ┃     │     │     │     '
+                                 '│     ┃\n'
+                                 '╰╌╌╌╌╌┸─────┴─────┴─────┴─────┴─────┸─────┴─────┴─────┴─────┴─────┚\n',
+                     'rows': [{'offset': 2,
+                               'keys': ['tlde',
+                                        'ae01',
+                                        'ae02',
+                                        'ae03',
+                                        'ae04',
+                                        'ae05',
+                                        'ae06',
+                                        'ae07',
+                                        'ae08',
+                                        'ae09',
+                                        'ae10',
+                                        'ae11',
+                                        'ae12']},
+                              {'offset': 8,
+                               'keys': ['ad01',
+                                        'ad02',
+                                        'ad03',
+                                        'ad04',
+                                        'ad05',
+                                        'ad06',
+                                        'ad07',
+                                        'ad08',
+                                        'ad09',
+                                        'ad10',
+                                        'ad11',
+                                        'ad12']},
+                              {'offset': 8,
+                               'keys': ['ac01',
+                                        'ac02',
+                                        'ac03',
+                                        'ac04',
+                                        'ac05',
+                                        'ac06',
+                                        'ac07',
+                                        'ac08',
+                                        'ac09',
+                                        'ac10',
+                                        'ac11',
+                                        'bksl']},
+                              {'offset': 2,
+                               'keys': ['lsgt',
+                                        'ab01',
+                                        'ab02',
+                                        'ab03',
+                                        'ab04',
+                                        'ab05',
+                                        'ab06',
+                                        'ab07',
+                                        'ab08',
+                                        'ab09',
+                                        'ab10']}]}}
+
+
+def _key_sym() -> Any:
+    return {' ': 'space',
+            '!': 'exclam',
+            '"': 'quotedbl',
+            '#': 'numbersign',
+            '$': 'dollar',
+            '%': 'percent',
+            '&': 'ampersand',
+            "'": 'apostrophe',
+            '(': 'parenleft',
+            ')': 'parenright',
+            '*': 'asterisk',
+            '+': 'plus',
+            ',': 'comma',
+            '-': 'minus',
+            '.': 'period',
+            '/': 'slash',
+            '0': '0',
+            '1': '1',
+            '2': '2',
+            '3': '3',
+            '4': '4',
+            '5': '5',
+            '6': '6',
+            '7': '7',
+            '8': '8',
+            '9': '9',
+            ':': 'colon',
+            ';': 'semicolon',
+            '<': 'less',
+            '=': 'equal',
+            '>': 'greater',
+            '?': 'question',
+            '@': 'at',
+            'A': 'A',
+            'B': 'B',
+            'C': 'C',
+            'D': 'D',
+            'E': 'E',
+            'F': 'F',
+            'G': 'G',
+            'H': 'H',
+            'I': 'I',
+            'J': 'J',
+            'K': 'K',
+            'L': 'L',
+            'M': 'M',
+            'N': 'N',
+            'O': 'O',
+            'P': 'P',
+            'Q': 'Q',
+            'R': 'R',
+            'S': 'S',
+            'T': 'T',
+            'U': 'U',
+            'V': 'V',
+            'W': 'W',
+            'X': 'X',
+            'Y': 'Y',
+            'Z': 'Z',
+            '[': 'bracketleft',
+            '\\': 'backslash',
+            ']': 'bracketright',
+            '^': 'asciicircum',
+            '_': 'underscore',
+            '`': 'grave',
+            'a': 'a',
+            'b': 'b',
+            'c': 'c',
+            'd': 'd',
+            'e': 'e',
+            'f': 'f',
+            'g': 'g',
+            'h': 'h',
+            'i': 'i',
+            'j': 'j',
+            'k': 'k',
+            'l': 'l',
+            'm': 'm',
+            'n': 'n',
+            'o': 'o',
+            'p': 'p',
+            'q': 'q',
+            'r': 'r',
+            's': 's',
+            't': 't',
+            'u': 'u',
+            'v': 'v',
+            'w': 'w',
+            'x': 'x',
+            'y': 'y',
+            'z': 'z',
+            '{': 'braceleft',
+            '|': 'bar',
+            '}': 'braceright',
+            '~': 'asciitilde',
+            '\xa0': 'nobreakspace',
+            '¡': 'exclamdown',
+            '¢': 'cent',
+            '£': 'sterling',
+            '¤': 'currency',
+            '¥': 'yen',
+            '¦': 'brokenbar',
+            '§': 'section',
+            '¨': 'diaeresis',
+            '©': 'copyright',
+            'ª': 'ordfeminine',
+            '«': 'guillemotleft',
+            '¬': 'notsign',
+            '\xad': 'hyphen',
+            '®': 'registered',
+            '¯': 'macron',
+            '°': 'degree',
+            '±': 'plusminus',
+            '²': 'twosuperior',
+            '³': 'threesuperior',
+            '´': 'acute',
+            'µ': 'mu',
+            '¶': 'paragraph',
+            '·': 'periodcentered',
+            '¸': 'cedilla',
+            '¹': 'onesuperior',
+            'º': 'masculine',
+            '»': 'guillemotright',
+            '¼': 'onequarter',
+            '½': 'onehalf',
+            '¾': 'threequarters',
+            '¿': 'questiondown',
+            'À': 'Agrave',
+            'Á': 'Aacute',
+            'Â': 'Acircumflex',
+            'Ã': 'Atilde',
+            'Ä': 'Adiaeresis',
+            'Å': 'Aring',
+            'Æ': 'AE',
+            'Ç': 'Ccedilla',
+            'È': 'Egrave',
+            'É': 'Eacute',
+            'Ê': 'Ecircumflex',
+            'Ë': 'Ediaeresis',
+            'Ì': 'Igrave',
+            'Í': 'Iacute',
+            'Î': 'Icircumflex',
+            'Ï': 'Idiaeresis',
+            'Ð': 'Eth',
+            'Ñ': 'Ntilde',
+            'Ò': 'Ograve',
+            'Ó': 'Oacute',
+            'Ô': 'Ocircumflex',
+            'Õ': 'Otilde',
+            'Ö': 'Odiaeresis',
+            '×': 'multiply',
+            'Ø': 'Ooblique',
+            'Ù': 'Ugrave',
+            'Ú': 'Uacute',
+            'Û': 'Ucircumflex',
+            'Ü': 'Udiaeresis',
+            'Ý': 'Yacute',
+            'Þ': 'Thorn',
+            'ß': 'ssharp',
+            'à': 'agrave',
+            'á': 'aacute',
+            'â': 'acircumflex',
+            'ã': 'atilde',
+            'ä': 'adiaeresis',
+            'å': 'aring',
+            'æ': 'ae',
+            'ç': 'ccedilla',
+            'è': 'egrave',
+            'é': 'eacute',
+            'ê': 'ecircumflex',
+            'ë': 'ediaeresis',
+            'ì': 'igrave',
+            'í': 'iacute',
+            'î': 'icircumflex',
+            'ï': 'idiaeresis',
+            'ð': 'eth',
+            'ñ': 'ntilde',
+            'ò': 'ograve',
+            'ó': 'oacute',
+            'ô': 'ocircumflex',
+            'õ': 'otilde',
+            'ö': 'odiaeresis',
+            '÷': 'division',
+            'ø': 'ooblique',
+            'ù': 'ugrave',
+            'ú': 'uacute',
+            'û': 'ucircumflex',
+            'ü': 'udiaeresis',
+            'ý': 'yacute',
+            'þ': 'thorn',
+            'ÿ': 'ydiaeresis',
+            'Ă': 'Abreve',
+            'ă': 'abreve',
+            'Ą': 'Aogonek',
+            'ą': 'aogonek',
+            'Ć': 'Cacute',
+            'ć': 'cacute',
+            'Č': 'Ccaron',
+            'č': 'ccaron',
+            'Ď': 'Dcaron',
+            'ď': 'dcaron',
+            'Đ': 'Dstroke',
+            'đ': 'dstroke',
+            'Ę': 'Eogonek',
+            'ę': 'eogonek',
+            'Ě': 'Ecaron',
+            'ě': 'ecaron',
+            'Ĺ': 'Lacute',
+            'ĺ': 'lacute',
+            'Ľ': 'Lcaron',
+            'ľ': 'lcaron',
+            'Ł': 'Lstroke',
+            'ł': 'lstroke',
+            'Ń': 'Nacute',
+            'ń': 'nacute',
+            'Ň': 'Ncaron',
+            'ň': 'ncaron',
+            'Ő': 'Odoubleacute',
+            'ő': 'odoubleacute',
+            'Ŕ': 'Racute',
+            'ŕ': 'racute',
+            'Ř': 'Rcaron',
+            'ř': 'rcaron',
+            'Ś': 'Sacute',
+            'ś': 'sacute',
+            'Ş': 'Scedilla',
+            'ş': 'scedilla',
+            'Š': 'Scaron',
+            'š': 'scaron',
+            'Ţ': 'Tcedilla',
+            'ţ': 'tcedilla',
+            'Ť': 'Tcaron',
+            'ť': 'tcaron',
+            'Ů': 'Uring',
+            'ů': 'uring',
+            'Ű': 'Udoubleacute',
+            'ű': 'udoubleacute',
+            'Ź': 'Zacute',
+            'ź': 'zacute',
+            'Ż': 'Zabovedot',
+            'ż': 'zabovedot',
+            'Ž': 'Zcaron',
+            'ž': 'zcaron',
+            'ˇ': 'caron',
+            '˘': 'breve',
+            '˙': 'abovedot',
+            '˛': 'ogonek',
+            '˝': 'doubleacute',
+            'Ĉ': 'Ccircumflex',
+            'ĉ': 'ccircumflex',
+            'Ċ': 'Cabovedot',
+            'ċ': 'cabovedot',
+            'Ĝ': 'Gcircumflex',
+            'ĝ': 'gcircumflex',
+            'Ğ': 'Gbreve',
+            'ğ': 'gbreve',
+            'Ġ': 'Gabovedot',
+            'ġ': 'gabovedot',
+            'Ĥ': 'Hcircumflex',
+            'ĥ': 'hcircumflex',
+            'Ħ': 'Hstroke',
+            'ħ': 'hstroke',
+            'İ': 'Iabovedot',
+            'ı': 'idotless',
+            'Ĵ': 'Jcircumflex',
+            'ĵ': 'jcircumflex',
+            'Ŝ': 'Scircumflex',
+            'ŝ': 'scircumflex',
+            'Ŭ': 'Ubreve',
+            'ŭ': 'ubreve',
+            'Ā': 'Amacron',
+            'ā': 'amacron',
+            'Ē': 'Emacron',
+            'ē': 'emacron',
+            'Ė': 'Eabovedot',
+            'ė': 'eabovedot',
+            'Ģ': 'Gcedilla',
+            'ģ': 'gcedilla',
+            'Ĩ': 'Itilde',
+            'ĩ': 'itilde',
+            'Ī': 'Imacron',
+            'ī': 'imacron',
+            'Į': 'Iogonek',
+            'į': 'iogonek',
+            'Ķ': 'Kcedilla',
+            'ķ': 'kcedilla',
+            'ĸ': 'kra',
+            'Ļ': 'Lcedilla',
+            'ļ': 'lcedilla',
+            'Ņ': 'Ncedilla',
+            'ņ': 'ncedilla',
+            'Ŋ': 'ENG',
+            'ŋ': 'eng',
+            'Ō': 'Omacron',
+            'ō': 'omacron',
+            'Ŗ': 'Rcedilla',
+            'ŗ': 'rcedilla',
+            'Ŧ': 'Tslash',
+            'ŧ': 'tslash',
+            'Ũ': 'Utilde',
+            'ũ': 'utilde',
+            'Ū': 'Umacron',
+            'ū': 'umacron',
+            'Ų': 'Uogonek',
+            'ų': 'uogonek',
+            'က174': 'Wcircumflex',
+            'က175': 'wcircumflex',
+            'က176': 'Ycircumflex',
+            'က177': 'ycircumflex',
+            'ခe02': 'Babovedot',
+            'ခe03': 'babovedot',
+            'ခe0a': 'Dabovedot',
+            'ခe0b': 'dabovedot',
+            'ခe1e': 'Fabovedot',
+            'ခe1f': 'fabovedot',
+            'ခe40': 'Mabovedot',
+            'ခe41': 'mabovedot',
+            'ခe56': 'Pabovedot',
+            'ခe57': 'pabovedot',
+            'ခe60': 'Sabovedot',
+            'ခe61': 'sabovedot',
+            'ခe6a': 'Tabovedot',
+            'ခe6b': 'tabovedot',
+            'ခe80': 'Wgrave',
+            'ခe81': 'wgrave',
+            'ခe82': 'Wacute',
+            'ခe83': 'wacute',
+            'ခe84': 'Wdiaeresis',
+            'ခe85': 'wdiaeresis',
+            'ခef2': 'Ygrave',
+            'ခef3': 'ygrave',
+            'Œ': 'OE',
+            'œ': 'oe',
+            'Ÿ': 'Ydiaeresis',
+            '€': 'EuroSign',
+            'ƒ': 'function',
+            '←': 'leftarrow',
+            '↑': 'uparrow',
+            '→': 'rightarrow',
+            '↓': 'downarrow',
+            '⇔': 'ifonlyif',
+            '∂': 'partialderivative',
+            '∇': 'nabla',
+            '√': 'radical',
+            '∝': 'variation',
+            '∞': 'infinity',
+            '∧': 'logicaland',
+            '∨': 'logicalor',
+            '∩': 'intersection',
+            '∪': 'union',
+            '∫': 'integral',
+            '∴': 'therefore',
+            '∼': 'approximate',
+            '≃': 'similarequal',
+            '≠': 'notequal',
+            '≡': 'identical',
+            '≤': 'lessthanequal',
+            '≥': 'greaterthanequal',
+            '⊂': 'includedin',
+            '⊃': 'includes',
+            '⌠': 'topintegral',
+            '⌡': 'botintegral',
+            '⎛': 'topleftparens',
+            '⎝': 'botleftparens',
+            '⎞': 'toprightparens',
+            '⎠': 'botrightparens',
+            '⎡': 'topleftsqbracket',
+            '⎣': 'botleftsqbracket',
+            '⎤': 'toprightsqbracket',
+            '⎦': 'botrightsqbracket',
+            '⎨': 'leftmiddlecurlybrace',
+            '⎬': 'rightmiddlecurlybrace',
+            '⎷': 'leftradical',
+            '─': 'horizconnector',
+            '│': 'vertconnector',
+            '┌': 'topleftradical',
+            '\u2002': 'enspace',
+            '\u2003': 'emspace',
+            '\u2004': 'em3space',
+            '\u2005': 'em4space',
+            '\u2007': 'digitspace',
+            '\u2008': 'punctspace',
+            '\u2009': 'thinspace',
+            '\u200a': 'hairspace',
+            '‒': 'figdash',
+            '–': 'endash',
+            '—': 'emdash',
+            '‘': 'leftsinglequotemark',
+            '’': 'rightsinglequotemark',
+            '‚': 'singlelowquotemark',
+            '“': 'leftdoublequotemark',
+            '”': 'rightdoublequotemark',
+            '„': 'doublelowquotemark',
+            '†': 'dagger',
+            '‡': 'doubledagger',
+            '•': 'enfilledcircbullet',
+            '‥': 'doubbaselinedot',
+            '…': 'ellipsis',
+            '′': 'minutes',
+            '″': 'seconds',
+            '‸': 'caret',
+            '℅': 'careof',
+            '℗': 'phonographcopyright',
+            '℞': 'prescription',
+            '™': 'trademark',
+            '⅓': 'onethird',
+            '⅔': 'twothirds',
+            '⅕': 'onefifth',
+            '⅖': 'twofifths',
+            '⅗': 'threefifths',
+            '⅘': 'fourfifths',
+            '⅙': 'onesixth',
+            '⅚': 'fivesixths',
+            '⅛': 'oneeighth',
+            '⅜': 'threeeighths',
+            '⅝': 'fiveeighths',
+            '⅞': 'seveneighths',
+            '⌕': 'telephonerecorder',
+            '␣': 'signifblank',
+            '▪': 'enfilledsqbullet',
+            '▫': 'enopensquarebullet',
+            '▬': 'filledrectbullet',
+            '▭': 'openrectbullet',
+            '▮': 'emfilledrect',
+            '▯': 'emopenrectangle',
+            '▲': 'filledtribulletup',
+            '△': 'opentribulletup',
+            '▶': 'filledrighttribullet',
+            '▷': 'rightopentriangle',
+            '▼': 'filledtribulletdown',
+            '▽': 'opentribulletdown',
+            '◀': 'filledlefttribullet',
+            '◁': 'leftopentriangle',
+            '○': 'emopencircle',
+            '●': 'emfilledcircle',
+            '◦': 'enopencircbullet',
+            '☆': 'openstar',
+            '☎': 'telephone',
+            '☓': 'signaturemark',
+            '☜': 'leftpointer',
+            '☞': 'rightpointer',
+            '♀': 'femalesymbol',
+            '♂': 'malesymbol',
+            '♣': 'club',
+            '♥': 'heart',
+            '♦': 'diamond',
+            '♭': 'musicalflat',
+            '♯': 'musicalsharp',
+            '✓': 'checkmark',
+            '✗': 'ballotcross',
+            '✝': 'latincross',
+            '✠': 'maltesecross'}
+
+
+def _layout() -> Any:
+    return {'name': 'custom',
+            'name8': 'custom',
+            'locale': 'us',
+            'variant': 'custom',
+            'author': 'nobody',
+            'description': 'QWERTY, custom variant',
+            'url': 'https://OneDeadKey.github.com/kalamine/',
+            'version': '0.0.1',
+            'alpha': '┌─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┲━━━━━━━━━━┓\n'
+                     '│ ~   │ !   │ @   │ #   │ $   │ %   │ ^   │ &   │ *   │ (   │ )   │ _   '
+                     '│ +   ┃          ┃\n'
+                     '│ `   │ 1   │ 2   │ 3   │ 4   │ 5   │ 6   │ 7   │ 8   │ 9   │ 0   │ -   '
+                     '│ =   ┃ ⌫        ┃\n'
+                     '┢━━━━━┷━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┺━━┯━━━━━━━┩\n'
+                     '┃        ┃ Q   │ W   │ E   │ R   │ T   │ Y   │ U   │ I   │ O   │ P   │ '
+                     '{   │ }   │ |     │\n'
+                     '┃ ↹      ┃     │     │     │     │     │     │     │     │     │     │ '
+                     '[   │ ]   │ \\     │\n'
+                     '┣━━━━━━━━┻┱────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┲━━━━┷━━━━━━━┪\n'
+                     '┃         ┃ A   │ S   │ D   │ F   │ G   │ H   │ J   │ K   │ L   │ :   │ '
+                     '"   ┃            ┃\n'
+                     '┃ ⇬       ┃     │     │     │     │     │     │     │     │     │ ;   │ '
+                     "'   ┃ ⏎          ┃\n"
+                     '┣━━━━━━━━━┻━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┲━━┻━━━━━━━━━━━━┫\n'
+                     '┃            ┃ Z   │ X   │ C   │ V   │ B   │ N   │ M   │ <   │ >   │ '
+                     '?   ┃               ┃\n'
+                     '┃ ⇧          ┃     │     │     │     │     │     │     │ ,   │ .   │ '
+                     '/   ┃ ⇧             ┃\n'
+                     '┣━━━━━━━┳━━━━┻━━┳━━┷━━━━┱┴─────┴─────┴─────┴─────┴─────┴─┲━━━┷━━━┳━┷━━━━━╋━━━━━━━┳━━━━━━━┫\n'
+                     '┃       ┃       ┃       ┃                                ┃       '
+                     '┃       ┃       ┃       ┃\n'
+                     '┃ Ctrl  ┃ super ┃ Alt   ┃ ␣                              ┃ Alt   ┃ '
+                     'super ┃ menu  ┃ Ctrl  ┃\n'
+                     '┗━━━━━━━┻━━━━━━━┻━━━━━━━┹────────────────────────────────┺━━━━━━━┻━━━━━━━┻━━━━━━━┻━━━━━━━┛\n',
+            '1dk': '┌─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┲━━━━━━━━━━┓\n'
+                   '│ ~   │ !   │ @   │ #   │ $   │ %   │ ^   │ &   │ *   │ (   │ )   │ _   │ '
+                   '+   ┃          ┃\n'
+                   '│ `   │ 1   │ 2 « │ 3 » │ 4   │ 5 € │ 6   │ 7   │ 8   │ 9   │ 0   │ -   │ '
+                   '=   ┃ ⌫        ┃\n'
+                   '┢━━━━━┷━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┺━━┯━━━━━━━┩\n'
+                   '┃        ┃ Q   │ W   │ E   │ R   │ T   │ Y   │ U   │ I   │ O   │ P   │ '
+                   '{   │ }   │ |     │\n'
+                   '┃ ↹      ┃     │     │   é │     │     │   ý │   ú │   í │   ó │     │ '
+                   '[   │ ]   │ \\     │\n'
+                   '┣━━━━━━━━┻┱────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┲━━━━┷━━━━━━━┪\n'
+                   '┃         ┃ A   │ S   │ D   │ F   │ G   │ H   │ J   │ K   │ L   │ :   '
+                   '│*¨   ┃            ┃\n'
+                   '┃ ⇬       ┃   á │     │     │     │     │     │     │     │     │ ;   │** '
+                   "' ┃ ⏎          ┃\n"
+                   '┣━━━━━━━━━┻━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┲━━┻━━━━━━━━━━━━┫\n'
+                   '┃            ┃ Z   │ X   │ C   │ V   │ B   │ N   │ M   │ < • │ >   │ ?   '
+                   '┃               ┃\n'
+                   '┃ ⇧          ┃     │     │   ç │     │     │     │   µ │ , · │ . … │ /   '
+                   '┃ ⇧             ┃\n'
+                   '┣━━━━━━━┳━━━━┻━━┳━━┷━━━━┱┴─────┴─────┴─────┴─────┴─────┴─┲━━━┷━━━┳━┷━━━━━╋━━━━━━━┳━━━━━━━┫\n'
+                   '┃       ┃       ┃       ┃                                ┃       ┃       '
+                   '┃       ┃       ┃\n'
+                   '┃ Ctrl  ┃ super ┃ Alt   ┃ ␣                              ┃ Alt   ┃ super '
+                   '┃ menu  ┃ Ctrl  ┃\n'
+                   '┗━━━━━━━┻━━━━━━━┻━━━━━━━┹────────────────────────────────┺━━━━━━━┻━━━━━━━┻━━━━━━━┻━━━━━━━┛\n',
+            'altgr': '┌─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┲━━━━━━━━━━┓\n'
+                     '│  *~ │     │     │     │     │     │     │     │     │     │     │     '
+                     '│     ┃          ┃\n'
+                     '│  *` │     │     │     │     │     │  *^ │     │     │     │     │     '
+                     '│     ┃ ⌫        ┃\n'
+                     '┢━━━━━┷━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┺━━┯━━━━━━━┩\n'
+                     '┃        ┃     │     │     │     │     │     │     │     │     │     '
+                     '│     │     │       │\n'
+                     "┃ ↹      ┃   @ │   < │   > │   $ │   % │   ^ │   & │   * │   ' │   ` "
+                     '│     │     │       │\n'
+                     '┣━━━━━━━━┻┱────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┬────┴┲━━━━┷━━━━━━━┪\n'
+                     '┃         ┃     │     │     │     │     │     │     │     │     │     '
+                     '│  *¨ ┃            ┃\n'
+                     '┃ ⇬       ┃   { │   ( │   ) │   } │   = │   \\ │   + │   - │   / │   " '
+                     '│  *´ ┃ ⏎          ┃\n'
+                     '┣━━━━━━━━━┻━━┱──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┬──┴──┲━━┻━━━━━━━━━━━━┫\n'
+                     '┃            ┃     │     │     │     │     │     │     │     │     '
+                     '│     ┃               ┃\n'
+                     '┃ ⇧          ┃   ~ │   [ │   ] │   _ │   # │   | │   ! │   ; │   : │   '
+                     '? ┃ ⇧             ┃\n'
+                     '┣━━━━━━━┳━━━━┻━━┳━━┷━━━━┱┴─────┴─────┴─────┴─────┴─────┴─┲━━━┷━━━┳━┷━━━━━╋━━━━━━━┳━━━━━━━┫\n'
+                     '┃       ┃       ┃       ┃                                ┃       '
+                     '┃       ┃       ┃       ┃\n'
+                     '┃ Ctrl  ┃ super ┃ Alt   ┃ ␣                              ┃ AltGr ┃ '
+                     'super ┃ menu  ┃ Ctrl  ┃\n'
+                     '┗━━━━━━━┻━━━━━━━┻━━━━━━━┹────────────────────────────────┺━━━━━━━┻━━━━━━━┻━━━━━━━┻━━━━━━━┛\n'}
+
+
+def _qwerty_vk() -> Any:
+    return {'39': 'SPACE',
+            '02': '1',
+            '03': '2',
+            '04': '3',
+            '05': '4',
+            '06': '5',
+            '07': '6',
+            '08': '7',
+            '09': '8',
+            '0a': '9',
+            '0b': '0',
+            '10': 'Q',
+            '11': 'W',
+            '12': 'E',
+            '13': 'R',
+            '14': 'T',
+            '15': 'Y',
+            '16': 'U',
+            '17': 'I',
+            '18': 'O',
+            '19': 'P',
+            '1e': 'A',
+            '1f': 'S',
+            '20': 'D',
+            '21': 'F',
+            '22': 'G',
+            '23': 'H',
+            '24': 'J',
+            '25': 'K',
+            '26': 'L',
+            '27': 'OEM_1',
+            '2c': 'Z',
+            '2d': 'X',
+            '2e': 'C',
+            '2f': 'V',
+            '30': 'B',
+            '31': 'N',
+            '32': 'M',
+            '33': 'OEM_COMMA',
+            '34': 'OEM_PERIOD',
+            '35': 'OEM_2',
+            '29': 'OEM_3',
+            '0c': 'OEM_MINUS',
+            '0d': 'OEM_PLUS',
+            '1a': 'OEM_4',
+            '1b': 'OEM_6',
+            '28': 'OEM_7',
+            '2b': 'OEM_5',
+            '56': 'OEM_102'}
+
+
+def _scan_codes() -> Any:
+    return {'klc': {'spce': '39',
+                    'ae01': '02',
+                    'ae02': '03',
+                    'ae03': '04',
+                    'ae04': '05',
+                    'ae05': '06',
+                    'ae06': '07',
+                    'ae07': '08',
+                    'ae08': '09',
+                    'ae09': '0a',
+                    'ae10': '0b',
+                    'ad01': '10',
+                    'ad02': '11',
+                    'ad03': '12',
+                    'ad04': '13',
+                    'ad05': '14',
+                    'ad06': '15',
+                    'ad07': '16',
+                    'ad08': '17',
+                    'ad09': '18',
+                    'ad10': '19',
+                    'ac01': '1e',
+                    'ac02': '1f',
+                    'ac03': '20',
+                    'ac04': '21',
+                    'ac05': '22',
+                    'ac06': '23',
+                    'ac07': '24',
+                    'ac08': '25',
+                    'ac09': '26',
+                    'ac10': '27',
+                    'ab01': '2c',
+                    'ab02': '2d',
+                    'ab03': '2e',
+                    'ab04': '2f',
+                    'ab05': '30',
+                    'ab06': '31',
+                    'ab07': '32',
+                    'ab08': '33',
+                    'ab09': '34',
+                    'ab10': '35',
+                    'tlde': '29',
+                    'ae11': '0c',
+                    'ae12': '0d',
+                    'ae13': '0d',
+                    'ad11': '1a',
+                    'ad12': '1b',
+                    'ac11': '28',
+                    'ab11': '28',
+                    'bksl': '2b',
+                    'lsgt': '56'},
+            'osx': {'spce': 49,
+                    'ae01': 18,
+                    'ae02': 19,
+                    'ae03': 20,
+                    'ae04': 21,
+                    'ae05': 23,
+                    'ae06': 22,
+                    'ae07': 26,
+                    'ae08': 28,
+                    'ae09': 25,
+                    'ae10': 29,
+                    'ad01': 12,
+                    'ad02': 13,
+                    'ad03': 14,
+                    'ad04': 15,
+                    'ad05': 17,
+                    'ad06': 16,
+                    'ad07': 32,
+                    'ad08': 34,
+                    'ad09': 31,
+                    'ad10': 35,
+                    'ac01': 0,
+                    'ac02': 1,
+                    'ac03': 2,
+                    'ac04': 3,
+                    'ac05': 5,
+                    'ac06': 4,
+                    'ac07': 38,
+                    'ac08': 40,
+                    'ac09': 37,
+                    'ac10': 41,
+                    'ab01': 6,
+                    'ab02': 7,
+                    'ab03': 8,
+                    'ab04': 9,
+                    'ab05': 11,
+                    'ab06': 45,
+                    'ab07': 46,
+                    'ab08': 43,
+                    'ab09': 47,
+                    'ab10': 44,
+                    'tlde': 50,
+                    'ae11': 27,
+                    'ae12': 24,
+                    'ae13': 42,
+                    'ad11': 33,
+                    'ad12': 30,
+                    'ac11': 39,
+                    'ab11': 39,
+                    'bksl': 42,
+                    'lsgt': 10},
+            'web': {'spce': 'Space',
+                    'ae01': 'Digit1',
+                    'ae02': 'Digit2',
+                    'ae03': 'Digit3',
+                    'ae04': 'Digit4',
+                    'ae05': 'Digit5',
+                    'ae06': 'Digit6',
+                    'ae07': 'Digit7',
+                    'ae08': 'Digit8',
+                    'ae09': 'Digit9',
+                    'ae10': 'Digit0',
+                    'ad01': 'KeyQ',
+                    'ad02': 'KeyW',
+                    'ad03': 'KeyE',
+                    'ad04': 'KeyR',
+                    'ad05': 'KeyT',
+                    'ad06': 'KeyY',
+                    'ad07': 'KeyU',
+                    'ad08': 'KeyI',
+                    'ad09': 'KeyO',
+                    'ad10': 'KeyP',
+                    'ac01': 'KeyA',
+                    'ac02': 'KeyS',
+                    'ac03': 'KeyD',
+                    'ac04': 'KeyF',
+                    'ac05': 'KeyG',
+                    'ac06': 'KeyH',
+                    'ac07': 'KeyJ',
+                    'ac08': 'KeyK',
+                    'ac09': 'KeyL',
+                    'ac10': 'Semicolon',
+                    'ab01': 'KeyZ',
+                    'ab02': 'KeyX',
+                    'ab03': 'KeyC',
+                    'ab04': 'KeyV',
+                    'ab05': 'KeyB',
+                    'ab06': 'KeyN',
+                    'ab07': 'KeyM',
+                    'ab08': 'Comma',
+                    'ab09': 'Period',
+                    'ab10': 'Slash',
+                    'tlde': 'Backquote',
+                    'ae11': 'Minus',
+                    'ae12': 'Equal',
+                    'ae13': 'IntlYen',
+                    'ad11': 'BracketLeft',
+                    'ad12': 'BracketRight',
+                    'bksl': 'Backslash',
+                    'ac11': 'Quote',
+                    'ab11': 'IntlRo',
+                    'lsgt': 'IntlBackslash'}}
+
+
+def _user_guide() -> Any:
+    return {'Layers': {'base': 'The `base` layer contains the base and shifted keys:\n'
+                               '\n'
+                               '                   +-----+\n'
+                               '    shift -------> | ?   |\n'
+                               '    base --------> | /   |\n'
+                               '                   +-----+\n'
+                               '\n'
+                               'When the base and shift keys correspond to the same '
+                               'character, you may only\n'
+                               'specify the uppercase char:\n'
+                               '\n'
+                               '                   +-----+\n'
+                               '    shift -------> | A   |\n'
+                               '    (base = a) --> |     |\n'
+                               '                   +-----+\n',
+                       'altgr': 'The `altgr` layer contains the altgr and shift+altgr '
+                                'symbols:\n'
+                                '\n'
+                                '                   +-----+\n'
+                                '                   |     | <----- (altgr+shift+key is '
+                                'undefined)\n'
+                                '                   |   { | <----- altgr+key = {\n'
+                                '                   +-----+\n',
+                       'full': 'The `full` view lets you specify the `base` and `altgr` '
+                               'levels together:\n'
+                               '\n'
+                               '                   +-----+\n'
+                               '    shift -------> | A   | <----- (altgr+shift+key is '
+                               'undefined)\n'
+                               '    (base = a) --> |   { | <----- altgr+key = {\n'
+                               '                   +-----+\n'},
+            'Dead_Keys': {'Usage': 'Dead keys are preceded by a `*` sign. They can be used in '
+                                   'the `base` layer:\n'
+                                   '\n'
+                                   '                   +-----+\n'
+                                   '    shift -------> |*"   |  = dead diaeresis\n'
+                                   '    base --------> |*´   |  = dead acute accent\n'
+                                   '                   +-----+\n'
+                                   '\n'
+                                   '… as well as in the `altgr` layer:\n'
+                                   '\n'
+                                   '                   +-----+\n'
+                                   '                   |  *" | <----- altgr+shift+key = dead '
+                                   'diaeresis\n'
+                                   '                   |  *´ | <----- altgr+key       = dead '
+                                   'acute accent\n'
+                                   '                   +-----+\n'
+                                   '\n'
+                                   '… and combined in the `full` layer:\n'
+                                   '\n'
+                                   '                    +-----+\n'
+                                   '  shift+key = A --> | A*" | <----- altgr+shift+key = dead '
+                                   'diaeresis\n'
+                                   '        key = a --> | a*´ | <----- altgr+key       = dead '
+                                   'acute accent\n'
+                                   '                    +-----+\n',
+                          'Standard_Dead_Keys': 'The following dead keys are supported, and '
+                                                'their behavior cannot be customized:\n',
+                          'Custom_Dead_Key': 'There is one dead key (1dk), noted `**`, that '
+                                             'can be customized by specifying\n'
+                                             'how it modifies each character in the `base` '
+                                             'layer:\n'
+                                             '\n'
+                                             '                   +-----+\n'
+                                             '    shift -------> | ? ¿ | <----- 1dk, '
+                                             'shift+key\n'
+                                             '    base --------> | / ÷ | <----- 1dk, key\n'
+                                             '                   +-----+\n'
+                                             '\n'
+                                             'When the base and shift keys correspond to the '
+                                             'same accented character, you may\n'
+                                             'only specify the lowercase accented char in the '
+                                             '`base` layer:\n'
+                                             '\n'
+                                             '                   +-----+\n'
+                                             '    shift -------> | A   | <----- (1dk, '
+                                             'shift+key = À)\n'
+                                             '    (base = a) --> |   à | <----- 1dk, key = à\n'
+                                             '                   +-----+\n'
+                                             '\n'
+                                             'You may also chain dead keys by specifying a '
+                                             'dead key in the `1dk` layer:\n'
+                                             '\n'
+                                             '                   +-----+\n'
+                                             '    shift -------> | G   |\n'
+                                             '    (base = g) --> |  *µ | <----- 1dk, key = '
+                                             'dead Greek\n'
+                                             '                   +-----+\n'
+                                             '\n'
+                                             '**Warning:** chained dead keys are not '
+                                             'supported by MSKLC, and KbdEdit will be\n'
+                                             'required to build a Windows driver for such a '
+                                             'keyboard layout.\n'},
+            'Space_Bar': 'Kalamine descriptor files have an optional section to define '
+                         'specific behaviors\n'
+                         'of the space bar in non-base layers:\n'
+                         '\n'
+                         '    [spacebar]\n'
+                         '    shift       = "\\u202f"  # NARROW NO-BREAK SPACE\n'
+                         '    altgr       = "\\u0020"  # SPACE\n'
+                         '    altgr_shift = "\\u00a0"  # NO-BREAK SPACE\n'
+                         '    1dk         = "\\u2019"  # RIGHT SINGLE QUOTATION MARK\n'
+                         '    1dk_shift   = "\\u2019"  # RIGHT SINGLE QUOTATION MARK\n'
+                         '\n'
+                         'Kalamine doesn’t support non-space chars on the `base` layer for '
+                         'the space bar.\n'
+                         'Space characters outside of the space bar are not supported '
+                         'either.\n'}
+
+
+def _win_locales() -> Any:
+    return {'aa': '1000',
+            'aa-DJ': '1000',
+            'aa-ER': '1000',
+            'aa-ET': '1000',
+            'af': '0036',
+            'af-NA': '1000',
+            'af-ZA': '0436',
+            'agq': '1000',
+            'agq-CM': '1000',
+            'ak': '1000',
+            'ak-GH': '1000',
+            'am': '005E',
+            'am-ET': '045E',
+            'ar': '0001',
+            'ar-001': '1000',
+            'ar-AE': '3801',
+            'ar-BH': '3C01',
+            'ar-DJ': '1000',
+            'ar-DZ': '1401',
+            'ar-EG': '0c01',
+            'ar-ER': '1000',
+            'ar-IL': '1000',
+            'ar-IQ': '0801',
+            'ar-JO': '2C01',
+            'ar-KM': '1000',
+            'ar-KW': '3401',
+            'ar-LB': '3001',
+            'ar-LY': '1001',
+            'ar-MA': '1801',
+            'ar-MR': '1000',
+            'ar-OM': '2001',
+            'ar-PS': '1000',
+            'ar-QA': '4001',
+            'ar-SA': '0401',
+            'ar-SD': '1000',
+            'ar-SO': '1000',
+            'ar-SS': '1000',
+            'ar-SY': '2801',
+            'ar-TD': '1000',
+            'ar-TN': '1C01',
+            'ar-YE': '2401',
+            'arn': '007A',
+            'arn-CL': '047A',
+            'as': '004D',
+            'as-IN': '044D',
+            'asa': '1000',
+            'asa-TZ': '1000',
+            'ast': '1000',
+            'ast-ES': '1000',
+            'az': '002C',
+            'az-Cyrl': '742C',
+            'az-Cyrl-AZ': '082C',
+            'az-Latn': '782C',
+            'az-Latn-AZ': '042C',
+            'ba': '006D',
+            'ba-RU': '046D',
+            'bas': '1000',
+            'bas-CM': '1000',
+            'be': '0023',
+            'be-BY': '0423',
+            'bem': '1000',
+            'bem-ZM': '1000',
+            'bez': '1000',
+            'bez-TZ': '1000',
+            'bg': '0002',
+            'bg-BG': '0402',
+            'bm': '1000',
+            'bm-Latn-ML': '1000',
+            'bn': '0045',
+            'bn-BD': '0845',
+            'bn-IN': '0445',
+            'bo': '0051',
+            'bo-CN': '0451',
+            'bo-IN': '1000',
+            'br': '007E',
+            'br-FR': '047E',
+            'brx': '1000',
+            'brx-IN': '1000',
+            'bs': '781A',
+            'bs-Cyrl': '641A',
+            'bs-Cyrl-BA': '201A',
+            'bs-Latn': '681A',
+            'bs-Latn-BA': '141A',
+            'byn': '1000',
+            'byn-ER': '1000',
+            'ca': '0003',
+            'ca-AD': '1000',
+            'ca-ES': '0403',
+            'ca-ES-valencia': '0803',
+            'ca-FR': '1000',
+            'ca-IT': '1000',
+            'ccp': '1000',
+            'ccp-Cakm': '1000',
+            'ccp-Cakm-BD': '1000',
+            'ccp-Cakm-IN': '1000',
+            'cd-RU': '1000',
+            'ceb': '1000',
+            'ceb-Latn': '1000',
+            'ceb-Latn-PH': '1000',
+            'cgg': '1000',
+            'cgg-UG': '1000',
+            'chr': '005C',
+            'chr-Cher': '7c5C',
+            'chr-Cher-US': '045C',
+            'co': '0083',
+            'co-FR': '0483',
+            'cs': '0005',
+            'cs-CZ': '0405',
+            'cu-RU': '1000',
+            'cy': '0052',
+            'cy-GB': '0452',
+            'da': '0006',
+            'da-DK': '0406',
+            'da-GL': '1000',
+            'dav': '1000',
+            'dav-KE': '1000',
+            'de': '0007',
+            'de-AT': '0C07',
+            'de-BE': '1000',
+            'de-CH': '0807',
+            'de-DE': '0407',
+            'de-IT': '1000',
+            'de-LI': '1407',
+            'de-LU': '1007',
+            'dje': '1000',
+            'dje-NE': '1000',
+            'dsb': '7C2E',
+            'dsb-DE': '082E',
+            'dua': '1000',
+            'dua-CM': '1000',
+            'dv': '0065',
+            'dv-MV': '0465',
+            'dyo': '1000',
+            'dyo-SN': '1000',
+            'dz': '1000',
+            'dz-BT': '0C51',
+            'ebu': '1000',
+            'ebu-KE': '1000',
+            'ee': '1000',
+            'ee-GH': '1000',
+            'ee-TG': '1000',
+            'el': '0008',
+            'el-CY': '1000',
+            'el-GR': '0408',
+            'en': '0009',
+            'en-001': '1000',
+            'en-029': '2409',
+            'en-150': '1000',
+            'en-AE': '4C09',
+            'en-AG': '1000',
+            'en-AI': '1000',
+            'en-AS': '1000',
+            'en-AT': '1000',
+            'en-AU': '0C09',
+            'en-BB': '1000',
+            'en-BE': '1000',
+            'en-BI': '1000',
+            'en-BM': '1000',
+            'en-BS': '1000',
+            'en-BW': '1000',
+            'en-BZ': '2809',
+            'en-CA': '1009',
+            'en-CC': '1000',
+            'en-CH': '1000',
+            'en-CK': '1000',
+            'en-CM': '1000',
+            'en-CX': '1000',
+            'en-CY': '1000',
+            'en-DE': '1000',
+            'en-DK': '1000',
+            'en-DM': '1000',
+            'en-ER': '1000',
+            'en-FI': '1000',
+            'en-FJ': '1000',
+            'en-FK': '1000',
+            'en-FM': '1000',
+            'en-GB': '0809',
+            'en-GD': '1000',
+            'en-GG': '1000',
+            'en-GH': '1000',
+            'en-GI': '1000',
+            'en-GM': '1000',
+            'en-GU': '1000',
+            'en-GY': '1000',
+            'en-HK': '3C09',
+            'en-IE': '1809',
+            'en-IL': '1000',
+            'en-IM': '1000',
+            'en-IN': '4009',
+            'en-IO': '1000',
+            'en-JE': '1000',
+            'en-JM': '2009',
+            'en-KE': '1000',
+            'en-KI': '1000',
+            'en-KN': '1000',
+            'en-KY': '1000',
+            'en-LC': '1000',
+            'en-LR': '1000',
+            'en-LS': '1000',
+            'en-MG': '1000',
+            'en-MH': '1000',
+            'en-MO': '1000',
+            'en-MP': '1000',
+            'en-MS': '1000',
+            'en-MT': '1000',
+            'en-MU': '1000',
+            'en-MW': '1000',
+            'en-MY': '4409',
+            'en-NA': '1000',
+            'en-NF': '1000',
+            'en-NG': '1000',
+            'en-NL': '1000',
+            'en-NR': '1000',
+            'en-NU': '1000',
+            'en-NZ': '1409',
+            'en-PG': '1000',
+            'en-PH': '3409',
+            'en-PK': '1000',
+            'en-PN': '1000',
+            'en-PR': '1000',
+            'en-PW': '1000',
+            'en-RW': '1000',
+            'en-SB': '1000',
+            'en-SC': '1000',
+            'en-SD': '1000',
+            'en-SE': '1000',
+            'en-SG': '4809',
+            'en-SH': '1000',
+            'en-SI': '1000',
+            'en-SL': '1000',
+            'en-SS': '1000',
+            'en-SX': '1000',
+            'en-SZ': '1000',
+            'en-TC': '1000',
+            'en-TK': '1000',
+            'en-TO': '1000',
+            'en-TT': '2c09',
+            'en-TV': '1000',
+            'en-TZ': '1000',
+            'en-UG': '1000',
+            'en-UM': '1000',
+            'en-US': '0409',
+            'en-VC': '1000',
+            'en-VG': '1000',
+            'en-VI': '1000',
+            'en-VU': '1000',
+            'en-WS': '1000',
+            'en-ZA': '1C09',
+            'en-ZM': '1000',
+            'en-ZW': '3009',
+            'eo': '1000',
+            'eo-001': '1000',
+            'es': '000A',
+            'es-419': '580A',
+            'es-AR': '2C0A',
+            'es-BO': '400A',
+            'es-BR': '1000',
+            'es-BZ': '1000',
+            'es-CL': '340A',
+            'es-CO': '240A',
+            'es-CR': '140A',
+            'es-CU': '5c0A',
+            'es-DO': '1c0A',
+            'es-EC': '300A',
+            'es-ES': '0c0A',
+            'es-ES_tradnl': '040A',
+            'es-GQ': '1000',
+            'es-GT': '100A',
+            'es-HN': '480A',
+            'es-MX': '080A',
+            'es-NI': '4C0A',
+            'es-PA': '180A',
+            'es-PE': '280A',
+            'es-PH': '1000',
+            'es-PR': '500A',
+            'es-PY': '3C0A',
+            'es-SV': '440A',
+            'es-US': '540A',
+            'es-UY': '380A',
+            'es-VE': '200A',
+            'et': '0025',
+            'et-EE': '0425',
+            'eu': '002D',
+            'eu-ES': '042D',
+            'ewo': '1000',
+            'ewo-CM': '1000',
+            'fa': '0029',
+            'fa-AF': '1000',
+            'fa-IR': '0429',
+            'ff': '0067',
+            'ff-CM': '1000',
+            'ff-GN': '1000',
+            'ff-Latn': '7C67',
+            'ff-Latn-BF': '1000',
+            'ff-Latn-CM': '1000',
+            'ff-Latn-GH': '1000',
+            'ff-Latn-GM': '1000',
+            'ff-Latn-GN': '1000',
+            'ff-Latn-GW': '1000',
+            'ff-Latn-LR': '1000',
+            'ff-Latn-MR': '1000',
+            'ff-Latn-NE': '1000',
+            'ff-Latn-NG': '1000',
+            'ff-Latn-SL': '1000',
+            'ff-Latn-SN': '0867',
+            'ff-MR': '1000',
+            'ff-NG': '1000',
+            'fi': '000B',
+            'fi-FI': '040B',
+            'fil': '0064',
+            'fil-PH': '0464',
+            'fo': '0038',
+            'fo-DK': '1000',
+            'fo-FO': '0438',
+            'fr': '000C',
+            'fr-BE': '080C',
+            'fr-BF': '1000',
+            'fr-BI': '1000',
+            'fr-BJ': '1000',
+            'fr-BL': '1000',
+            'fr-CA': '0c0C',
+            'fr-CD': '240C',
+            'fr-CF': '1000',
+            'fr-CG': '1000',
+            'fr-CH': '100C',
+            'fr-CI': '300C',
+            'fr-CM': '2c0C',
+            'fr-DJ': '1000',
+            'fr-DZ': '1000',
+            'fr-FR': '040C',
+            'fr-GA': '1000',
+            'fr-GF': '1000',
+            'fr-GN': '1000',
+            'fr-GP': '1000',
+            'fr-GQ': '1000',
+            'fr-HT': '3c0C',
+            'fr-KM': '1000',
+            'fr-LU': '140C',
+            'fr-MA': '380C',
+            'fr-MC': '180C',
+            'fr-MF': '1000',
+            'fr-MG': '1000',
+            'fr-ML': '340C',
+            'fr-MQ': '1000',
+            'fr-MR': '1000',
+            'fr-MU': '1000',
+            'fr-NC': '1000',
+            'fr-NE': '1000',
+            'fr-PF': '1000',
+            'fr-PM': '1000',
+            'fr-RE': '200C',
+            'fr-RW': '1000',
+            'fr-SC': '1000',
+            'fr-SN': '280C',
+            'fr-SY': '1000',
+            'fr-TD': '1000',
+            'fr-TG': '1000',
+            'fr-TN': '1000',
+            'fr-VU': '1000',
+            'fr-WF': '1000',
+            'fr-YT': '1000',
+            'fur': '1000',
+            'fur-IT': '1000',
+            'fy': '0062',
+            'fy-NL': '0462',
+            'ga': '003C',
+            'ga-IE': '083C',
+            'gd': '0091',
+            'gd-GB': '0491',
+            'gl': '0056',
+            'gl-ES': '0456',
+            'gn': '0074',
+            'gn-PY': '0474',
+            'gsw': '0084',
+            'gsw-CH': '1000',
+            'gsw-FR': '0484',
+            'gsw-LI': '1000',
+            'gu': '0047',
+            'gu-IN': '0447',
+            'guz': '1000',
+            'guz-KE': '1000',
+            'gv': '1000',
+            'gv-IM': '1000',
+            'ha': '0068',
+            'ha-Latn': '7C68',
+            'ha-Latn-GH': '1000',
+            'ha-Latn-NE': '1000',
+            'ha-Latn-NG': '0468',
+            'haw': '0075',
+            'haw-US': '0475',
+            'he': '000D',
+            'he-IL': '040D',
+            'hi': '0039',
+            'hi-IN': '0439',
+            'hr-BA': '101A',
+            'hr-HR': '041A',
+            'hr': '001A',
+            'hsb': '002E',
+            'hsb-DE': '042E',
+            'hu': '000E',
+            'hu-HU': '040E',
+            'hy': '002B',
+            'hy-AM': '042B',
+            'ia': '1000',
+            'ia-001': '1000',
+            'ia-FR': '1000',
+            'id': '0021',
+            'id-ID': '0421',
+            'ig': '0070',
+            'ig-NG': '0470',
+            'ii': '0078',
+            'ii-CN': '0478',
+            'is': '000F',
+            'is-IS': '040F',
+            'it': '0010',
+            'it-CH': '0810',
+            'it-IT': '0410',
+            'it-SM': '1000',
+            'it-VA': '1000',
+            'iu': '005D',
+            'iu-Cans': '785D',
+            'iu-Cans-CA': '045d',
+            'iu-Latn': '7C5D',
+            'iu-Latn-CA': '085D',
+            'ja': '0011',
+            'ja-JP': '0411',
+            'jgo': '1000',
+            'jgo-CM': '1000',
+            'jmc': '1000',
+            'jmc-TZ': '1000',
+            'jv': '1000',
+            'jv-Latn': '1000',
+            'jv-Latn-ID': '1000',
+            'ka': '0037',
+            'ka-GE': '0437',
+            'kab': '1000',
+            'kab-DZ': '1000',
+            'kam': '1000',
+            'kam-KE': '1000',
+            'kde': '1000',
+            'kde-TZ': '1000',
+            'kea': '1000',
+            'kea-CV': '1000',
+            'khq': '1000',
+            'khq-ML': '1000',
+            'ki': '1000',
+            'ki-KE': '1000',
+            'kk': '003F',
+            'kk-KZ': '043F',
+            'kkj': '1000',
+            'kkj-CM': '1000',
+            'kl': '006F',
+            'kl-GL': '046F',
+            'kln': '1000',
+            'kln-KE': '1000',
+            'km': '0053',
+            'km-KH': '0453',
+            'kn': '004B',
+            'kn-IN': '044B',
+            'ko': '0012',
+            'ko-KP': '1000',
+            'ko-KR': '0412',
+            'kok': '0057',
+            'kok-IN': '0457',
+            'ks': '0060',
+            'ks-Arab': '0460',
+            'ks-Arab-IN': '1000',
+            'ksb': '1000',
+            'ksb-TZ': '1000',
+            'ksf': '1000',
+            'ksf-CM': '1000',
+            'ksh': '1000',
+            'ksh-DE': '1000',
+            'ku': '0092',
+            'ku-Arab': '7c92',
+            'ku-Arab-IQ': '0492',
+            'ku-Arab-IR': '1000',
+            'kw': '1000',
+            'kw-GB': '1000',
+            'ky': '0040',
+            'ky-KG': '0440',
+            'lag': '1000',
+            'lag-TZ': '1000',
+            'lb': '006E',
+            'lb-LU': '046E',
+            'lg': '1000',
+            'lg-UG': '1000',
+            'lkt': '1000',
+            'lkt-US': '1000',
+            'ln': '1000',
+            'ln-AO': '1000',
+            'ln-CD': '1000',
+            'ln-CF': '1000',
+            'ln-CG': '1000',
+            'lo': '0054',
+            'lo-LA': '0454',
+            'lrc-IQ': '1000',
+            'lrc-IR': '1000',
+            'lt': '0027',
+            'lt-LT': '0427',
+            'lu': '1000',
+            'lu-CD': '1000',
+            'luo': '1000',
+            'luo-KE': '1000',
+            'luy': '1000',
+            'luy-KE': '1000',
+            'lv': '0026',
+            'lv-LV': '0426',
+            'mas': '1000',
+            'mas-KE': '1000',
+            'mas-TZ': '1000',
+            'mer': '1000',
+            'mer-KE': '1000',
+            'mfe': '1000',
+            'mfe-MU': '1000',
+            'mg': '1000',
+            'mg-MG': '1000',
+            'mgh': '1000',
+            'mgh-MZ': '1000',
+            'mgo': '1000',
+            'mgo-CM': '1000',
+            'mi': '0081',
+            'mi-NZ': '0481',
+            'mk': '002F',
+            'mk-MK': '042F',
+            'ml': '004C',
+            'ml-IN': '044C',
+            'mn': '0050',
+            'mn-Cyrl': '7850',
+            'mn-MN': '0450',
+            'mn-Mong': '7C50',
+            'mn-Mong-CN': '0850',
+            'mn-Mong-MN': '0C50',
+            'moh': '007C',
+            'moh-CA': '047C',
+            'mr': '004E',
+            'mr-IN': '044E',
+            'ms': '003E',
+            'ms-BN': '083E',
+            'ms-MY': '043E',
+            'mt': '003A',
+            'mt-MT': '043A',
+            'mua': '1000',
+            'mua-CM': '1000',
+            'my': '0055',
+            'my-MM': '0455',
+            'mzn-IR': '1000',
+            'naq': '1000',
+            'naq-NA': '1000',
+            'nb': '7C14',
+            'nb-NO': '0414',
+            'nb-SJ': '1000',
+            'nd': '1000',
+            'nd-ZW': '1000',
+            'nds': '1000',
+            'nds-DE': '1000',
+            'nds-NL': '1000',
+            'ne': '0061',
+            'ne-IN': '0861',
+            'ne-NP': '0461',
+            'nl': '0013',
+            'nl-AW': '1000',
+            'nl-BE': '0813',
+            'nl-BQ': '1000',
+            'nl-CW': '1000',
+            'nl-NL': '0413',
+            'nl-SR': '1000',
+            'nl-SX': '1000',
+            'nmg': '1000',
+            'nmg-CM': '1000',
+            'nn': '7814',
+            'nn-NO': '0814',
+            'nnh': '1000',
+            'nnh-CM': '1000',
+            'no': '0014',
+            'nqo': '1000',
+            'nqo-GN': '1000',
+            'nr': '1000',
+            'nr-ZA': '1000',
+            'nso': '006C',
+            'nso-ZA': '046C',
+            'nus': '1000',
+            'nus-SD': '1000',
+            'nus-SS': '1000',
+            'nyn': '1000',
+            'nyn-UG': '1000',
+            'oc': '0082',
+            'oc-FR': '0482',
+            'om': '0072',
+            'om-ET': '0472',
+            'om-KE': '1000',
+            'or': '0048',
+            'or-IN': '0448',
+            'os': '1000',
+            'os-GE': '1000',
+            'os-RU': '1000',
+            'pa': '0046',
+            'pa-Arab': '7C46',
+            'pa-Arab-PK': '0846',
+            'pa-IN': '0446',
+            'pl': '0015',
+            'pl-PL': '0415',
+            'prg-001': '1000',
+            'prs': '008C',
+            'prs-AF': '048C',
+            'ps': '0063',
+            'ps-AF': '0463',
+            'ps-PK': '1000',
+            'pt': '0016',
+            'pt-AO': '1000',
+            'pt-BR': '0416',
+            'pt-CH': '1000',
+            'pt-CV': '1000',
+            'pt-GQ': '1000',
+            'pt-GW': '1000',
+            'pt-LU': '1000',
+            'pt-MO': '1000',
+            'pt-MZ': '1000',
+            'pt-PT': '0816',
+            'pt-ST': '1000',
+            'pt-TL': '1000',
+            'qps-ploc': '0501',
+            'qps-ploca': '05FE',
+            'qps-plocm': '09FF',
+            'quc': '0086',
+            'quc-Latn-GT': '0486',
+            'quz': '006B',
+            'quz-BO': '046B',
+            'quz-EC': '086B',
+            'quz-PE': '0C6B',
+            'rm': '0017',
+            'rm-CH': '0417',
+            'rn': '1000',
+            'rn-BI': '1000',
+            'ro': '0018',
+            'ro-MD': '0818',
+            'ro-RO': '0418',
+            'rof': '1000',
+            'rof-TZ': '1000',
+            'ru': '0019',
+            'ru-BY': '1000',
+            'ru-KG': '1000',
+            'ru-KZ': '1000',
+            'ru-MD': '0819',
+            'ru-RU': '0419',
+            'ru-UA': '1000',
+            'rw': '0087',
+            'rw-RW': '0487',
+            'rwk': '1000',
+            'rwk-TZ': '1000',
+            'sa': '004F',
+            'sa-IN': '044F',
+            'sah': '0085',
+            'sah-RU': '0485',
+            'saq': '1000',
+            'saq-KE': '1000',
+            'sbp': '1000',
+            'sbp-TZ': '1000',
+            'sd': '0059',
+            'sd-Arab': '7C59',
+            'sd-Arab-PK': '0859',
+            'se': '003B',
+            'se-FI': '0C3B',
+            'se-NO': '043B',
+            'se-SE': '083B',
+            'seh': '1000',
+            'seh-MZ': '1000',
+            'ses': '1000',
+            'ses-ML': '1000',
+            'sg': '1000',
+            'sg-CF': '1000',
+            'shi': '1000',
+            'shi-Latn': '1000',
+            'shi-Latn-MA': '1000',
+            'shi-Tfng': '1000',
+            'shi-Tfng-MA': '1000',
+            'si': '005B',
+            'si-LK': '045B',
+            'sk': '001B',
+            'sk-SK': '041B',
+            'sl': '0024',
+            'sl-SI': '0424',
+            'sma': '783B',
+            'sma-NO': '183B',
+            'sma-SE': '1C3B',
+            'smj': '7C3B',
+            'smj-NO': '103B',
+            'smj-SE': '143B',
+            'smn': '703B',
+            'smn-FI': '243B',
+            'sms': '743B',
+            'sms-FI': '203B',
+            'sn': '1000',
+            'sn-Latn': '1000',
+            'sn-Latn-ZW': '1000',
+            'so': '0077',
+            'so-DJ': '1000',
+            'so-ET': '1000',
+            'so-KE': '1000',
+            'so-SO': '0477',
+            'sq': '001C',
+            'sq-AL': '041C',
+            'sq-MK': '1000',
+            'sr': '7C1A',
+            'sr-Cyrl': '6C1A',
+            'sr-Cyrl-BA': '1C1A',
+            'sr-Cyrl-CS': '0C1A',
+            'sr-Cyrl-ME': '301A',
+            'sr-Cyrl-RS': '281A',
+            'sr-Latn': '701A',
+            'sr-Latn-BA': '181A',
+            'sr-Latn-CS': '081A',
+            'sr-Latn-ME': '2c1A',
+            'sr-Latn-RS': '241A',
+            'ss': '1000',
+            'ss-SZ': '1000',
+            'ss-ZA': '1000',
+            'ssy': '1000',
+            'ssy-ER': '1000',
+            'st': '0030',
+            'st-LS': '1000',
+            'st-ZA': '0430',
+            'sv': '001D',
+            'sv-AX': '1000',
+            'sv-FI': '081D',
+            'sv-SE': '041D',
+            'sw': '0041',
+            'sw-KE': '0441',
+            'sw-TZ': '1000',
+            'sw-UG': '1000',
+            'swc': '1000',
+            'swc-CD': '1000',
+            'syr': '005A',
+            'syr-SY': '045A',
+            'ta': '0049',
+            'ta-IN': '0449',
+            'ta-LK': '0849',
+            'ta-MY': '1000',
+            'ta-SG': '1000',
+            'te': '004A',
+            'te-IN': '044A',
+            'teo': '1000',
+            'teo-KE': '1000',
+            'teo-UG': '1000',
+            'tg': '0028',
+            'tg-Cyrl': '7C28',
+            'tg-Cyrl-TJ': '0428',
+            'th': '001E',
+            'th-TH': '041E',
+            'ti': '0073',
+            'ti-ER': '0873',
+            'ti-ET': '0473',
+            'tig': '1000',
+            'tig-ER': '1000',
+            'tk': '0042',
+            'tk-TM': '0442',
+            'tn': '0032',
+            'tn-BW': '0832',
+            'tn-ZA': '0432',
+            'to': '1000',
+            'to-TO': '1000',
+            'tr': '001F',
+            'tr-CY': '1000',
+            'tr-TR': '041F',
+            'ts': '0031',
+            'ts-ZA': '0431',
+            'tt': '0044',
+            'tt-RU': '0444',
+            'twq': '1000',
+            'twq-NE': '1000',
+            'tzm': '005F',
+            'tzm-Latn': '7C5F',
+            'tzm-Latn-DZ': '085F',
+            'tzm-Latn-MA': '1000',
+            'ug': '0080',
+            'ug-CN': '0480',
+            'uk': '0022',
+            'uk-UA': '0422',
+            'ur': '0020',
+            'ur-IN': '0820',
+            'ur-PK': '0420',
+            'uz': '0043',
+            'uz-Arab': '1000',
+            'uz-Arab-AF': '1000',
+            'uz-Cyrl': '7843',
+            'uz-Cyrl-UZ': '0843',
+            'uz-Latn': '7C43',
+            'uz-Latn-UZ': '0443',
+            'vai': '1000',
+            'vai-Latn': '1000',
+            'vai-Latn-LR': '1000',
+            'vai-Vaii': '1000',
+            'vai-Vaii-LR': '1000',
+            've': '0033',
+            've-ZA': '0433',
+            'vi': '002A',
+            'vi-VN': '042A',
+            'vo': '1000',
+            'vo-001': '1000',
+            'vun': '1000',
+            'vun-TZ': '1000',
+            'wae': '1000',
+            'wae-CH': '1000',
+            'wal': '1000',
+            'wal-ET': '1000',
+            'wo': '0088',
+            'wo-SN': '0488',
+            'xh': '0034',
+            'xh-ZA': '0434',
+            'xog': '1000',
+            'xog-UG': '1000',
+            'yav': '1000',
+            'yav-CM': '1000',
+            'yo': '006A',
+            'yo-BJ': '1000',
+            'yo-NG': '046A',
+            'zgh': '1000',
+            'zgh-Tfng': '1000',
+            'zgh-Tfng-MA': '1000',
+            'zh': '7804',
+            'zh-CN': '0804',
+            'zh-Hans': '0004',
+            'zh-Hant': '7C04',
+            'zh-HK': '0C04',
+            'zh-MO': '1404',
+            'zh-SG': '1004',
+            'zh-TW': '0404',
+            'zu': '0035',
+            'zu-ZA': '0435'}
+
+
+TABLES: Dict[str, Callable[[], Any]] = {
+    "dead_keys": _dead_keys,
+    "geometry": _geometry,
+    "key_sym": _key_sym,
+    "layout": _layout,
+    "qwerty_vk": _qwerty_vk,
+    "scan_codes": _scan_codes,
+    "user_guide": _user_guide,
+    "win_locales": _win_locales,
+}
@@ -0,0 +1,581 @@
+"""
+Preview server for a whole directory of layout descriptors.
+
+A single asyncio event loop serves all layouts of the directory, and watches
+them for changes. Layouts are parsed on their first request, and only the most
+recently used ones are kept in memory, as well as their rendered outputs.
+Parsing and rendering run in worker threads, so that the event loop keeps
+serving static files and event streams meanwhile.
+
+Each layout is served under its own path, e.g. `/intl/` for `intl.toml`, with
+the same pages, outputs and live updates as `kalamine watch layout.toml`.
+"""
+
+import asyncio
+import mimetypes
+import webbrowser
+from collections import OrderedDict
+from html import escape
+from http import HTTPStatus
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+from urllib.parse import parse_qs, unquote, urlparse
+
+import click
+
+from .cache import parse_layout
+from .layout import KeyboardLayout
+from .server import (
+    ENDPOINTS,
+    WWW_DIR,
+    Response,
+    event_message,
+    http_response,
+    layout_patch,
+    main_page,
+    output_key,
+    output_renderer,
+    static_response,
+)
+from .watcher import FileWatcher
+
+DESCRIPTOR_SUFFIXES = [".toml", ".yaml", ".yml"]
+
+MAX_LAYOUTS = 16  # parsed layouts kept in memory
+MAX_OUTPUTS = 128  # rendered outputs kept in memory
+KEEPALIVE = 15  # seconds between two comments on idle event streams
+MAX_LINE = 8192  # bytes, for the request line and each header line
+MAX_HEADERS = 100
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Mapping that drops its least recently used items above `max_size`,
+    except the pinned ones."""
+
+    def __init__(
+        self, max_size: int, pinned: Callable[[K], bool] = lambda key: False
+    ) -> None:
+        self._items: OrderedDict[K, V] = OrderedDict()
+        self._max_size = max_size
+        self._pinned = pinned
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._items
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(list(self._items))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: K) -> Optional[V]:
+        if key not in self._items:
+            return None
+        self._items.move_to_end(key)
+        return self._items[key]
+
+    def peek(self, key: K) -> Optional[V]:
+        """Same as `get`, without marking the item as recently used."""
+        return self._items.get(key)
+
+    def put(self, key: K, value: V) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        excess = len(self._items) - self._max_size
+        for old_key in list(self._items):
+            if excess <= 0:
+                break
+            if old_key != key and not self._pinned(old_key):
+                del self._items[old_key]
+                excess -= 1
+
+    def pop(self, key: K) -> Optional[V]:
+        return self._items.pop(key, None)
+
+
+class BadRequest(ValueError):
+    """Malformed or oversized HTTP request."""
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    query: Dict[str, List[str]]
+    headers: Dict[str, str]  # lowercase names
+    keep_alive: bool
+
+
+async def read_line(reader: asyncio.StreamReader) -> str:
+    try:  # the reader limit is `MAX_LINE`
+        line = await reader.readline()
+    except ValueError:
+        raise BadRequest("line too long")
+    return line.decode("latin-1")
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """Next HTTP request of a connection, or None if it has been closed.
+    Raises BadRequest if the request is malformed or too large. Request bodies
+    are not read: the connection is not kept alive after a request with one."""
+
+    line = await read_line(reader)
+    if not line:
+        return None
+    request_line = line.split()
+    if len(request_line) != 3 or not request_line[2].startswith("HTTP/1."):
+        raise BadRequest("malformed request line")
+    method, target, version = request_line
+    headers: Dict[str, str] = {}
+    for count in range(MAX_HEADERS + 1):
+        line = await read_line(reader)
+        if not line.strip():
+            break
+        if count == MAX_HEADERS:
+            raise BadRequest("too many headers")
+        name, colon, value = line.partition(":")
+        if not colon or not name.strip():
+            raise BadRequest("malformed header")
+        headers[name.strip().lower()] = value.strip()
+
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.1":
+        keep_alive = connection != "close"
+    else:
+        keep_alive = connection == "keep-alive"
+    if headers.get("content-length", "0") != "0" or "transfer-encoding" in headers:
+        keep_alive = False
+    url = urlparse(target)
+    return Request(method, unquote(url.path), parse_qs(url.query), headers, keep_alive)
+
+
+class LayoutEntry:
+    """A parsed layout, and the descriptor files it has been parsed from."""
+
+    def __init__(self, layout: KeyboardLayout, watcher: FileWatcher) -> None:
+        self.layout = layout
+        self.watcher = watcher
+        self.revision = 0
+
+
+class DirectoryServer:
+    """Preview server for the layout descriptors of a directory."""
+
+    def __init__(
+        self,
+        directory: Path,
+        angle_mod: bool = False,
+        cache: Optional[bool] = None,
+        max_layouts: int = MAX_LAYOUTS,
+        max_outputs: int = MAX_OUTPUTS,
+        interval: float = 0.5,
+    ) -> None:
+        self._directory = directory
+        self._angle_mod = angle_mod
+        self._cache = cache
+        self._interval = interval
+        self._descriptors = self.list_descriptors()
+        self._subscribers: Dict[str, Set[asyncio.Queue[Dict[str, Any]]]] = {}
+        # parsed layouts and rendered outputs, or their pending tasks
+        self._layouts: LRUCache[str, asyncio.Future[LayoutEntry]] = LRUCache(
+            max_layouts, lambda name: bool(self._subscribers.get(name))
+        )
+        self._outputs: LRUCache[Tuple[str, int, str], asyncio.Future[Response]]
+        self._outputs = LRUCache(max_outputs)
+
+    @property
+    def parsed_layouts(self) -> List[str]:
+        """Names of the layouts in memory, least recently used first."""
+        return list(self._layouts)
+
+    def list_descriptors(self) -> Dict[str, Path]:
+        """Layout descriptors of the directory, by name."""
+
+        descriptors: Dict[str, Path] = {}
+        for path in sorted(self._directory.iterdir()):
+            if path.suffix in DESCRIPTOR_SUFFIXES and path.is_file():
+                descriptors.setdefault(path.stem, path)
+        return descriptors
+
+    ###
+    # Layouts and outputs
+    #
+
+    def _parse(self, name: str) -> KeyboardLayout:
+        try:
+            return parse_layout(
+                self._descriptors[name], self._angle_mod, cache=self._cache
+            )
+        except SystemExit:  # `load_layout` has already reported the error
+            raise ValueError(f"{self._descriptors[name].name} could not be parsed")
+
+    def _files(self, name: str, layout: KeyboardLayout) -> List[Path]:
+        path = self._descriptors[name]
+        if "extends" not in layout.meta:
+            return [path]
+        return [path, path.parent / layout.meta["extends"]]
+
+    def _load(self, name: str) -> LayoutEntry:
+        watcher = FileWatcher([self._descriptors[name]])
+        layout = self._parse(name)
+        watcher.watch(self._files(name, layout))
+        return LayoutEntry(layout, watcher)
+
+    async def layout(self, name: str) -> LayoutEntry:
+        """Parsed layout, parsed only once even if requested concurrently."""
+
+        future = self._layouts.get(name)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, self._load, name)
+            self._layouts.put(name, future)
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            if self._layouts.peek(name) is future:  # try again on next request
+                self._layouts.pop(name)
+            raise
+
+    async def output(
+        self, name: str, key: str, render: Callable[[KeyboardLayout], Response]
+    ) -> Response:
+        """Rendered output of a layout, rendered once per layout revision."""
+
+        entry = await self.layout(name)
+        cache_key = (name, entry.revision, key)
+        future = self._outputs.get(cache_key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, render, entry.layout)
+            self._outputs.put(cache_key, future)
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            if self._outputs.peek(cache_key) is future:
+                self._outputs.pop(cache_key)
+            raise
+
+    ###
+    # File watching
+    #
+
+    @staticmethod
+    def _changes(entries: Dict[str, LayoutEntry]) -> Set[str]:
+        """Layouts whose files have changed (reads files: run in a thread)."""
+        return {name for name, entry in entries.items() if entry.watcher.changes()}
+
+    async def watch(self) -> None:
+        """Poll the directory and the parsed layouts for changes, until
+        cancelled. Errors are reported, and do not stop the live updates."""
+
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.poll()
+            except Exception as exc:  # noqa: BLE001 -- e.g. a removed directory
+                click.echo(f"Error: {exc!r}", err=True)
+
+    async def poll(self) -> None:
+        """Reload the layouts that have changed. Files are read and hashed in
+        a worker thread, not in the event loop."""
+
+        loop = asyncio.get_running_loop()
+        self._descriptors = await loop.run_in_executor(None, self.list_descriptors)
+        entries = {}
+        for name in self._layouts:
+            future = self._layouts.peek(name)
+            if future and future.done() and not future.exception():
+                entries[name] = future.result()
+        changed = await loop.run_in_executor(None, self._changes, entries)
+        entries = {name: entries[name] for name in changed}
+        while entries:  # editors often write a file in several steps
+            await asyncio.sleep(self._interval / 4)
+            if not await loop.run_in_executor(None, self._changes, entries):
+                break
+        for name, entry in entries.items():
+            await self.reload(name, entry)
+
+    async def reload(self, name: str, entry: LayoutEntry) -> None:
+        """Parse a changed layout again, and notify its pages."""
+
+        if name not in self._descriptors:  # removed
+            self._layouts.pop(name)
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            layout = await loop.run_in_executor(None, self._parse, name)
+        except Exception as exc:  # noqa: BLE001 -- reported, the page is kept
+            click.echo(f"Error: {exc}", err=True)
+            return
+        patch = await loop.run_in_executor(None, layout_patch, entry.layout, layout)
+        for key in self._outputs:  # outdated outputs
+            if key[:2] == (name, entry.revision):
+                self._outputs.pop(key)
+        entry.layout = layout
+        entry.revision += 1
+        await loop.run_in_executor(None, entry.watcher.watch, self._files(name, layout))
+        click.echo(f"... {self._descriptors[name]}: reloaded")
+        for queue in self._subscribers.get(name, set()):
+            queue.put_nowait({"revision": entry.revision, **patch})
+
+    ###
+    # HTTP
+    #
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve the requests of a client connection."""
+
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                if request.method not in ["GET", "HEAD"]:  # body not read
+                    request = request._replace(keep_alive=False)
+                await self.respond(request, writer)
+                if not request.keep_alive:
+                    break
+        except BadRequest as exc:
+            error = self.error(HTTPStatus.BAD_REQUEST, str(exc))
+            self.write(writer, None, *error, keep_alive=False)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        if request.method not in ["GET", "HEAD"]:
+            self.write(writer, request, *self.error(HTTPStatus.METHOD_NOT_ALLOWED))
+            return
+
+        name, slash, resource = request.path.lstrip("/").partition("/")
+        if not request.path.strip("/"):
+            response = Response.render(self.index_page(), "text/html", "utf-8")
+            self.write(writer, request, *http_response(response, cache=False))
+        elif name not in self._descriptors:
+            static = self.static_file(request.path)
+            if static:
+                self.send(writer, request, static)
+            else:
+                self.write(writer, request, *self.error(HTTPStatus.NOT_FOUND))
+        elif not slash:
+            headers = [("Location", f"/{name}/"), ("Content-Length", "0")]
+            self.write(writer, request, HTTPStatus.MOVED_PERMANENTLY, headers, b"")
+        elif resource == "events":
+            await self.send_events(writer, name)
+        else:
+            await self.send_layout_resource(writer, request, name, resource)
+        await writer.drain()
+
+    def render_main_page(self, layout: KeyboardLayout) -> Response:
+        page = main_page(layout, self._angle_mod)
+        return Response.render(page, "text/html", "utf-8")
+
+    async def send_layout_resource(
+        self, writer: asyncio.StreamWriter, request: Request, name: str, resource: str
+    ) -> None:
+        """Page, output or static file of a layout."""
+
+        path = "/" + resource
+        render: Callable[[KeyboardLayout], Response]
+        if not resource:
+            render = self.render_main_page
+            key, cache = "/", False
+        elif path in ENDPOINTS or path == "/svg":
+            geometry = request.query.get("geometry", [None])[0]
+            render = output_renderer(path, geometry)
+            key, cache = output_key(path, geometry), True
+        else:
+            static = self.static_file(path)
+            if static:
+                self.send(writer, request, static)
+            else:
+                self.write(writer, request, *self.error(HTTPStatus.NOT_FOUND))
+            return
+
+        try:
+            response = await self.output(name, key, render)
+        except Exception as exc:  # noqa: BLE001 -- reported to both ends
+            click.echo(f"Error: {exc}", err=True)
+            error = self.error(HTTPStatus.INTERNAL_SERVER_ERROR, str(exc))
+            self.write(writer, request, *error)
+            return
+        self.send(writer, request, response, cache)
+
+    async def send_events(self, writer: asyncio.StreamWriter, name: str) -> None:
+        """Server-sent events: the current revision of the layout, then a
+        patch for each change."""
+
+        try:
+            entry = await self.layout(name)
+        except Exception as exc:  # noqa: BLE001 -- reported to the client
+            error = self.error(HTTPStatus.INTERNAL_SERVER_ERROR, str(exc))
+            self.write(writer, None, *error)
+            return
+
+        headers = [
+            ("Content-type", "text/event-stream"),
+            ("Cache-Control", "no-cache"),
+        ]
+        self.write(writer, None, HTTPStatus.OK, headers, b"", keep_alive=False)
+        queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
+        self._subscribers.setdefault(name, set()).add(queue)
+        try:
+            writer.write(event_message("layout", {"revision": entry.revision}))
+            await writer.drain()
+            while True:
+                try:
+                    patch = await asyncio.wait_for(queue.get(), KEEPALIVE)
+                    writer.write(event_message("patch", patch))
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                await writer.drain()
+        finally:
+            self._subscribers[name].discard(queue)
+
+    @staticmethod
+    def static_file(path: str) -> Optional[Response]:
+        file_path = (WWW_DIR / path.lstrip("/")).resolve()
+        if WWW_DIR.resolve() not in file_path.parents or not file_path.is_file():
+            return None
+        content_type = mimetypes.guess_type(file_path.name)[0]
+        return static_response(file_path, content_type or "application/octet-stream")
+
+    @staticmethod
+    def error(
+        status: HTTPStatus, message: str = ""
+    ) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        body = (message or status.phrase).encode("utf-8")
+        headers = [
+            ("Content-type", "text/plain; charset=utf-8"),
+            ("Content-Length", str(len(body))),
+        ]
+        return status, headers, body
+
+    def send(
+        self,
+        writer: asyncio.StreamWriter,
+        request: Request,
+        response: Response,
+        cache: bool = True,
+    ) -> None:
+        status, headers, body = http_response(
+            response,
+            request.headers.get("accept-encoding", ""),
+            request.headers.get("if-none-match", ""),
+            cache,
+        )
+        self.write(writer, request, status, headers, body)
+
+    @staticmethod
+    def write(
+        writer: asyncio.StreamWriter,
+        request: Optional[Request],
+        status: int,
+        headers: List[Tuple[str, str]],
+        body: bytes,
+        keep_alive: Optional[bool] = None,
+    ) -> None:
+        if keep_alive is None:
+            keep_alive = bool(request and request.keep_alive)
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        lines += [f"{name}: {value}" for name, value in headers]
+        lines += [f"Connection: {'keep-alive' if keep_alive else 'close'}", "", ""]
+        writer.write("\r\n".join(lines).encode("latin-1"))
+        if request is None or request.method != "HEAD":
+            writer.write(body)
+
+    def index_page(self) -> str:
+        """List of the layouts, with their names if they have been parsed."""
+
+        items = []
+        for name, path in self._descriptors.items():
+            future = self._layouts.peek(name)
+            description = ""
+            if future and future.done() and not future.exception():
+                meta = future.result().layout.meta
+                description = (
+                    f" — {escape(meta['name'])}: {escape(meta['description'])}"
+                )
+            items.append(
+                f'<li><a href="/{escape(name)}/">{escape(path.name)}</a>{description}</li>'
+            )
+        return f"""
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <meta charset="utf-8">
+                <title>Kalamine</title>
+                <link rel="stylesheet" type="text/css" href="/style.css">
+            </head>
+            <body>
+                <h1>{escape(str(self._directory))}</h1>
+                <ul>
+                    {"".join(items)}
+                </ul>
+            </body>
+            </html>
+        """
+
+    ###
+    # Server
+    #
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        """Start serving and watching, in the background."""
+
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        self._watch_task = asyncio.ensure_future(self.watch())
+        return server
+
+    async def stop(self, server: asyncio.AbstractServer) -> None:
+        """Stop serving and watching, and close the client connections."""
+
+        server.close()
+        tasks = [
+            task for task in asyncio.all_tasks() if task is not asyncio.current_task()
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await server.wait_closed()
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await self.start(host, port)
+        url = f"http://{host}:{port}"
+        print(f"Server started: {url}")
+        print("Hit Ctrl-C to stop.")
+        await asyncio.get_running_loop().run_in_executor(None, webbrowser.open, url)
+        async with server:
+            await server.serve_forever()
+
+
+def directory_server(
+    directory: Path,
+    angle_mod: bool = False,
+    cache: Optional[bool] = None,
+    port: int = 1664,
+) -> None:
+    server = DirectoryServer(directory, angle_mod, cache)
+    try:
+        asyncio.run(server.serve("localhost", port))
+    except KeyboardInterrupt:
+        pass
+    click.echo("Server stopped.")
@@ -0,0 +1,51 @@
+"""
+Compile `kalamine/data/*.yaml` into `kalamine/data_tables.py`, so that
+importing kalamine does not have to run the YAML parser.
+
+Run `python -m kalamine.freeze` (or `make data`) after editing a data file.
+Until then, `load_data` keeps reading the YAML files that are newer than the
+generated module.
+"""
+
+from pathlib import Path
+from pprint import pformat
+from textwrap import indent
+
+from .utils import DATA_DIR, load_yaml_data
+
+TABLES_PATH = Path(__file__).parent / "data_tables.py"
+
+HEADER = '''"""
+Frozen copy of kalamine/data/*.yaml -- generated by `python -m kalamine.freeze`.
+Do not edit: edit the YAML files and run `make data` instead.
+"""
+
+from typing import Any, Callable, Dict
+
+# fmt: off
+'''
+
+
+def frozen_tables() -> str:
+    """Python source of the `data_tables` module."""
+
+    names = sorted(path.stem for path in DATA_DIR.glob("*.yaml"))
+    out = HEADER
+    for name in names:
+        data = pformat(load_yaml_data(name), width=84, sort_dicts=False)
+        out += f"\n\ndef _{name}() -> Any:\n"
+        out += f"    return {indent(data, ' ' * 11).lstrip()}\n"
+    out += "\n\nTABLES: Dict[str, Callable[[], Any]] = {\n"
+    for name in names:
+        out += f'    "{name}": _{name},\n'
+    out += "}\n"
+    return out
+
+
+def freeze(path: Path = TABLES_PATH) -> None:
+    path.write_text(frozen_tables(), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    freeze()
+    print(f"... {TABLES_PATH}")
@@ -11,8 +11,10 @@ from typing import TYPE_CHECKING, Dict, List
 if TYPE_CHECKING:
     from ..layout import KeyboardLayout
 
-from ..template import load_tpl, substitute_lines
-from ..utils import LAYER_KEYS, SCAN_CODES, Layer, load_data
+from ..template import Sink, render, write_tpl
+from ..utils import Layer, load_data
+
+QWERTY_VK = load_data("qwerty_vk")
 
 
 def ahk_keymap(layout: "KeyboardLayout", altgr: bool = False) -> List[str]:
@@ -38,39 +40,37 @@ def ahk_keymap(layout: "KeyboardLayout", altgr: bool = False) -> List[str]:
         return actions
 
     output = []
-    for key_name in LAYER_KEYS:
-        if key_name.startswith("-"):
-            output.append(f"; {key_name[1:]}")
-            output.append("")
-            continue
-
-        if key_name in ["ae13", "ab11"]:  # ABNT / JIS keys
-            continue  # these two keys are not supported yet
-
-        sc = f"SC{SCAN_CODES['klc'][key_name]}"
-        for i in (
-            [Layer.ALTGR, Layer.ALTGR_SHIFT] if altgr else [Layer.BASE, Layer.SHIFT]
-        ):
-            layer = layout.layers[i]
-            if key_name not in layer:
-                continue
-
-            symbol = layer[key_name]
-            sym = ahk_escape(symbol)
-
-            if symbol in layout.dead_keys:
-                actions = {sym: layout.dead_keys[symbol][symbol]}
-            elif key_name == "spce":
-                actions = ahk_actions(key_name)
-            else:
-                actions = ahk_actions(symbol)
-
-            desc = f" ; {symbol}" if symbol != sym else ""
-            act = json.dumps(actions, ensure_ascii=False)
-            output.append(f'{prefixes[i]}{sc}::SendKey("{sym}", {act}){desc}')
-
-        if output[-1]:
-            output.append("")
+    for section, keys in layout.resolved.sections:
+        output.append(f"; {section}")
+        output.append("")
+
+        for key in keys:
+            if key.name in ["ae13", "ab11"]:  # ABNT / JIS keys
+                continue  # these two keys are not supported yet
+
+            sc = f"SC{key.scan_codes['klc']}"
+            for i in (
+                [Layer.ALTGR, Layer.ALTGR_SHIFT] if altgr else [Layer.BASE, Layer.SHIFT]
+            ):
+                symbol = key.chars[i]
+                if not symbol:
+                    continue
+
+                sym = ahk_escape(symbol)
+
+                if key.dead[i]:
+                    actions = {sym: key.repeats[i]}
+                elif key.name == "spce":
+                    actions = ahk_actions(key.name)
+                else:
+                    actions = ahk_actions(symbol)
+
+                desc = f" ; {symbol}" if symbol != sym else ""
+                act = json.dumps(actions, ensure_ascii=False)
+                output.append(f'{prefixes[i]}{sc}::SendKey("{sym}", {act}){desc}')
+
+            if output[-1]:
+                output.append("")
 
     return output
 
@@ -80,43 +80,47 @@ def ahk_shortcuts(layout: "KeyboardLayout") -> List[str]:
 
     prefixes = [" ^", "^+"]
     enabled = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    qwerty_vk = load_data("qwerty_vk")
 
     output = []
-    for key_name in LAYER_KEYS:
-        if key_name.startswith("-"):
-            output.append(f"; {key_name[1:]}")
-            output.append("")
-            continue
-
-        if key_name in ["ae13", "ab11"]:  # ABNT / JIS keys
-            continue  # these two keys are not supported yet
-
-        scan_code = SCAN_CODES["klc"][key_name]
-        for i in [Layer.BASE, Layer.SHIFT]:
-            layer = layout.layers[i]
-            if key_name not in layer:
-                continue
-
-            symbol = layer[key_name]
-            if layout.qwerty_shortcuts:
-                symbol = qwerty_vk[scan_code]
-            if symbol in enabled:
-                output.append(f"{prefixes[i]}SC{scan_code}::Send {prefixes[i]}{symbol}")
-
-        if output[-1]:
-            output.append("")
+    for section, keys in layout.resolved.sections:
+        output.append(f"; {section}")
+        output.append("")
+
+        for key in keys:
+            if key.name in ["ae13", "ab11"]:  # ABNT / JIS keys
+                continue  # these two keys are not supported yet
+
+            scan_code = key.scan_codes["klc"]
+            for i in [Layer.BASE, Layer.SHIFT]:
+                symbol = key.chars[i]
+                if not symbol:
+                    continue
+
+                if layout.qwerty_shortcuts:
+                    symbol = QWERTY_VK[scan_code]
+                if symbol in enabled:
+                    output.append(
+                        f"{prefixes[i]}SC{scan_code}::Send {prefixes[i]}{symbol}"
+                    )
+
+            if output[-1]:
+                output.append("")
 
     return output
 
 
-def ahk(layout: "KeyboardLayout") -> str:
+def write_ahk(layout: "KeyboardLayout", file: Sink) -> None:
     """Windows AHK driver"""
 
     # fmt: off
-    out = load_tpl(layout, ".ahk")
-    out = substitute_lines(out, "LAYOUT",    ahk_keymap(layout))
-    out = substitute_lines(out, "ALTGR",     ahk_keymap(layout, True))
-    out = substitute_lines(out, "SHORTCUTS", ahk_shortcuts(layout))
+    write_tpl(file, layout, ".ahk", context={
+        "LAYOUT":    ahk_keymap(layout),
+        "ALTGR":     ahk_keymap(layout, True),
+        "SHORTCUTS": ahk_shortcuts(layout),
+    })
     # fmt: on
-    return out
+
+
+def ahk(layout: "KeyboardLayout") -> str:
+    """Windows AHK driver"""
+    return render(write_ahk, layout)
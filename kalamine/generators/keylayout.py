@@ -8,8 +8,8 @@ from typing import TYPE_CHECKING, List, Tuple
 if TYPE_CHECKING:
     from ..layout import KeyboardLayout
 
-from ..template import load_tpl, substitute_lines
-from ..utils import DK_INDEX, LAYER_KEYS, SCAN_CODES, Layer, hex_ord
+from ..template import Sink, render, write_tpl
+from ..utils import DK_INDEX, Layer, hex_ord
 
 
 def _xml_proof(char: str) -> str:
@@ -30,8 +30,8 @@ def macos_keymap(layout: "KeyboardLayout") -> List[List[str]]:
 
     ret_str = []
     for index in range(5):
-        layer = layout.layers[
-            [Layer.BASE, Layer.SHIFT, Layer.BASE, Layer.ALTGR, Layer.ALTGR_SHIFT][index]
+        layer = [Layer.BASE, Layer.SHIFT, Layer.BASE, Layer.ALTGR, Layer.ALTGR_SHIFT][
+            index
         ]
         caps = index == 2
 
@@ -44,36 +44,35 @@ def macos_keymap(layout: "KeyboardLayout") -> List[List[str]]:
             return False
 
         output: List[str] = []
-        for key_name in LAYER_KEYS:
-            if key_name in ["ae13", "ab11"]:  # ABNT / JIS keys
-                continue  # these two keys are not supported yet
-
-            if key_name.startswith("-"):
-                if output:
-                    output.append("")
-                output.append("<!--" + key_name[1:] + " -->")
-                continue
-
-            symbol = "&#x0010;"
-            final_key = True
-
-            if key_name in layer:
-                key = layer[key_name]
-                if key in layout.dead_keys:
-                    symbol = f"dead_{DK_INDEX[key].name}"
-                    final_key = False
+        for section, keys in layout.resolved.sections:
+            if output:
+                output.append("")
+            output.append("<!--" + section + " -->")
+
+            for resolved in keys:
+                if resolved.name in ["ae13", "ab11"]:  # ABNT / JIS keys
+                    continue  # these two keys are not supported yet
+
+                symbol = "&#x0010;"
+                final_key = True
+
+                key = resolved.chars[layer]
+                if key:
+                    if resolved.dead[layer]:
+                        symbol = f"dead_{DK_INDEX[key].name}"
+                        final_key = False
+                    else:
+                        symbol = _xml_proof(key.upper() if caps else key)
+                        final_key = not has_dead_keys(key.upper())
+
+                char = f'code="{resolved.scan_codes["osx"]}"'.ljust(10)
+                if final_key:
+                    action = f'output="{symbol}"'
+                elif symbol.startswith("dead_"):
+                    action = f'action="{_xml_proof_id(symbol)}"'
                 else:
-                    symbol = _xml_proof(key.upper() if caps else key)
-                    final_key = not has_dead_keys(key.upper())
-
-            char = f'code="{SCAN_CODES["osx"][key_name]}"'.ljust(10)
-            if final_key:
-                action = f'output="{symbol}"'
-            elif symbol.startswith("dead_"):
-                action = f'action="{_xml_proof_id(symbol)}"'
-            else:
-                action = f'action="{key_name}_{_xml_proof_id(symbol)}"'
-            output.append(f"<key {char} {action} />")
+                    action = f'action="{resolved.name}_{_xml_proof_id(symbol)}"'
+                output.append(f"<key {char} {action} />")
 
         ret_str.append(output)
     return ret_str
@@ -114,29 +113,27 @@ def macos_actions(layout: "KeyboardLayout") -> List[str]:
         continue
 
     # normal key actions
-    for key_name in LAYER_KEYS:
-        if key_name.startswith("-"):
-            ret_actions.append("")
-            ret_actions.append(f"<!--{key_name[1:]} -->")
-            continue
-
-        for i in [Layer.BASE, Layer.SHIFT, Layer.ALTGR, Layer.ALTGR_SHIFT]:
-            if key_name == "spce" or key_name not in layout.layers[i]:
-                continue
-
-            key = layout.layers[i][key_name]
-            if i and key_name in layout.layers[Layer.BASE] and key == layout.layers[Layer.BASE][key_name]:
-                continue
-            if key in layout.dead_keys:
-                continue
-
-            actions: List[Tuple[str, str]] = []
-            for k in DK_INDEX:
-                if k in layout.dead_keys:
-                    if key in layout.dead_keys[k]:
-                        actions.append((DK_INDEX[k].name, layout.dead_keys[k][key]))
-            if actions:
-                append_actions(key_name, _xml_proof(key), actions)
+    for section, keys in layout.resolved.sections:
+        ret_actions.append("")
+        ret_actions.append(f"<!--{section} -->")
+
+        for resolved in keys:
+            for i in [Layer.BASE, Layer.SHIFT, Layer.ALTGR, Layer.ALTGR_SHIFT]:
+                key = resolved.chars[i]
+                if resolved.name == "spce" or not key:
+                    continue
+                if i and key == resolved.chars[Layer.BASE]:
+                    continue
+                if resolved.dead[i]:
+                    continue
+
+                actions: List[Tuple[str, str]] = []
+                for k in DK_INDEX:
+                    if k in layout.dead_keys:
+                        if key in layout.dead_keys[k]:
+                            actions.append((DK_INDEX[k].name, layout.dead_keys[k][key]))
+                if actions:
+                    append_actions(resolved.name, _xml_proof(key), actions)
 
     # spacebar actions
     actions = []
@@ -168,12 +165,17 @@ def macos_terminators(layout: "KeyboardLayout") -> List[str]:
     return ret_terminators
 
 
-def keylayout(layout: "KeyboardLayout") -> str:
+def write_keylayout(layout: "KeyboardLayout", file: Sink) -> None:
     """macOS driver"""
 
-    out = load_tpl(layout, ".keylayout")
+    context = {}
     for i, layer in enumerate(macos_keymap(layout)):
-        out = substitute_lines(out, "LAYER_" + str(i), layer)
-    out = substitute_lines(out, "ACTIONS", macos_actions(layout))
-    out = substitute_lines(out, "TERMINATORS", macos_terminators(layout))
-    return out
+        context["LAYER_" + str(i)] = layer
+    context["ACTIONS"] = macos_actions(layout)
+    context["TERMINATORS"] = macos_terminators(layout)
+    write_tpl(file, layout, ".keylayout", context=context)
+
+
+def keylayout(layout: "KeyboardLayout") -> str:
+    """macOS driver"""
+    return render(write_keylayout, layout)
@@ -11,13 +11,15 @@ because they are not recognized by KBDEdit (as of v19.8.0).
 """
 
 import re
-from typing import TYPE_CHECKING, Dict, List, Optional
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 if TYPE_CHECKING:
     from ..layout import KeyboardLayout
 
-from ..template import load_tpl, substitute_lines, substitute_token
-from ..utils import DK_INDEX, LAYER_KEYS, SCAN_CODES, Layer, hex_ord, load_data
+from ..template import Sink, render, write_tpl
+from ..utils import DK_INDEX, Layer, hex_ord, load_data
 
 
 # return the corresponding char for a symbol
@@ -36,26 +38,34 @@ def _get_chr(symbol: str) -> str:
     return char
 
 
+WIN_LOCALES = load_data("win_locales")
+QWERTY_VK = load_data("qwerty_vk")
+
+
 def _get_langid(locale: str) -> str:
-    locale_codes = load_data("win_locales")
-    if locale not in locale_codes:
+    if locale not in WIN_LOCALES:
         raise ValueError(f"`{locale}` is not a valid locale")
-    return locale_codes[locale]
+    return WIN_LOCALES[locale]
 
 
 
-def _get_vk_from_symbols(
-    layout: "KeyboardLayout", symbols: List[str], scan_code: str
-) -> Optional[str]:
-    oem_102_scan_code = "56"
-    if layout.angle_mod:
-        oem_102_scan_code = "30"
-    if scan_code == oem_102_scan_code:
-        # manage the ISO key (between shift and Z on ISO keyboards).
-        # We're assuming that its scancode is always 56
-        # https://www.win.tue.nl/~aeb/linux/kbd/scancodes.html
-        return "OEM_102"
+class VkReason(Enum):
+    """Why a virtual key has been assigned to a scan code."""
 
+    ISO_KEY = "ISO key"
+    SYMBOL = "matches the layout symbols"
+    QWERTY = "QWERTY shortcuts"
+    QWERTY_DEFAULT = "QWERTY default"
+    ARBITRARY_OEM = "arbitrary OEM key"
+
+
+@dataclass(frozen=True)
+class VirtualKey:
+    vk: str
+    reason: VkReason
+
+
+def _get_vk_from_symbols(symbols: List[str]) -> Optional[str]:
     base = _get_chr(symbols[0])
     shifted = _get_chr(symbols[1])
 
@@ -85,55 +95,65 @@ def _get_vk_from_symbols(
     return None
 
 
-def _assign_vks(layout: "KeyboardLayout") -> Dict[str, str]:
-    qwerty_vk = load_data("qwerty_vk")
-    key_entries = []
+def assign_vks(layout: "KeyboardLayout") -> Dict[str, VirtualKey]:
+    """Windows virtual keys: scan code -> VK, and why it has been chosen.
+    Computed once per layout and build flags, shared by the KLC and C outputs."""
 
-    for key_name in LAYER_KEYS:
-        if key_name.startswith("-"):
-            continue
-        if key_name in ["ae13", "ab11"]:
+    memo_key = ("vks", layout.angle_mod, layout.qwerty_shortcuts)
+    memo = layout.resolved.memo
+    if memo_key not in memo:
+        memo[memo_key] = _assign_vks(layout)
+    return memo[memo_key]
+
+
+def _assign_vks(layout: "KeyboardLayout") -> Dict[str, VirtualKey]:
+    key_entries: List[Dict[str, Any]] = []
+
+    for key in layout.resolved:
+        if key.name in ["ae13", "ab11"]:
             continue
 
         symbols = []
         for i in [Layer.BASE, Layer.SHIFT]:
-            layer = layout.layers[i]
-            if key_name in layer:
-                symbol = layer[key_name]
-                if symbol in layout.dead_keys:
-                    symbol = layout.dead_keys[symbol][" "]
-                elif len(symbol) != 1:
-                    symbol = "-1"
-                symbols.append(symbol)
-            else:
-                symbols.append("-1")
+            symbol = key.terms[i]
+            if not symbol or (len(symbol) != 1 and not key.dead[i]):
+                symbol = "-1"
+            symbols.append(symbol)
 
-        scan_code = SCAN_CODES["klc"][key_name]
+        scan_code = key.scan_codes["klc"]
         key_entries.append({"scan_code": scan_code, "symbols": symbols})
 
-    final_vks: Dict[str, str] = {}
+    final_vks: Dict[str, VirtualKey] = {}
     used_vks = set()
 
     # Pass 1: Strong matches
     if not layout.qwerty_shortcuts:
+        # manage the ISO key (between shift and Z on ISO keyboards).
+        # We're assuming that its scancode is always 56
+        # https://www.win.tue.nl/~aeb/linux/kbd/scancodes.html
+        oem_102_scan_code = "30" if layout.angle_mod else "56"
         for entry in key_entries:
-            vk = _get_vk_from_symbols(layout, entry["symbols"], entry["scan_code"])
-            if vk:
-                final_vks[entry["scan_code"]] = vk
-                used_vks.add(vk)
+            symbol_vk: Optional[str] = "OEM_102"
+            reason = VkReason.ISO_KEY
+            if entry["scan_code"] != oem_102_scan_code:
+                symbol_vk = _get_vk_from_symbols(entry["symbols"])
+                reason = VkReason.SYMBOL
+            if symbol_vk:
+                final_vks[entry["scan_code"]] = VirtualKey(symbol_vk, reason)
+                used_vks.add(symbol_vk)
 
     # Pass 2: Fallback to QWERTY VK
     for entry in key_entries:
         sc = entry["scan_code"]
         if sc not in final_vks:
             if layout.qwerty_shortcuts:
-                vk = qwerty_vk[sc]
-                final_vks[sc] = vk
+                vk = QWERTY_VK[sc]
+                final_vks[sc] = VirtualKey(vk, VkReason.QWERTY)
                 used_vks.add(vk)
             else:
-                default_vk = qwerty_vk.get(sc)
+                default_vk = QWERTY_VK.get(sc)
                 if default_vk and default_vk not in used_vks:
-                    final_vks[sc] = default_vk
+                    final_vks[sc] = VirtualKey(default_vk, VkReason.QWERTY_DEFAULT)
                     used_vks.add(default_vk)
 
     # Pass 3: Arbitrary OEM keys
@@ -145,7 +165,7 @@ def _assign_vks(layout: "KeyboardLayout") -> Dict[str, str]:
             oem_idx += 1
             if oem_idx <= MAX_OEM:
                 vk = f"OEM_{oem_idx}"
-                final_vks[sc] = vk
+                final_vks[sc] = VirtualKey(vk, VkReason.ARBITRARY_OEM)
                 used_vks.add(vk)
             else:
                 raise Exception("Too many OEM keys needed and no standard VKs available")
@@ -158,14 +178,10 @@ def klc_keymap(layout: "KeyboardLayout") -> List[str]:
 
     supported_symbols = "1234567890abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
-    qwerty_vk = load_data("qwerty_vk")
-    key_entries = []
+    key_entries: List[Dict[str, Any]] = []
 
-    for key_name in LAYER_KEYS:
-        if key_name.startswith("-"):
-            continue
-
-        if key_name in ["ae13", "ab11"]:  # ABNT / JIS keys
+    for key in layout.resolved:
+        if key.name in ["ae13", "ab11"]:  # ABNT / JIS keys
             continue  # these two keys are not supported yet
 
         symbols = []
@@ -188,14 +204,13 @@ def klc_keymap(layout: "KeyboardLayout") -> List[str]:
         }
 
         for i in [Layer.BASE, Layer.SHIFT, Layer.ALTGR, Layer.ALTGR_SHIFT]:
-            layer = layout.layers[i]
+            symbol = key.chars[i]
 
-            if key_name in layer:
-                symbol = layer[key_name]
+            if symbol:
                 desc = symbol
-                if symbol in layout.dead_keys:
-                    desc = layout.dead_keys[symbol][" "]
-                    symbol = hex_ord(desc) + "@"
+                if key.dead[i]:
+                    desc = key.terms[i]
+                    symbol = f"{key.codes[i]}@"
                 else:
                     if i == Layer.BASE:
                         is_alpha = symbol.upper() != symbol
@@ -216,7 +231,7 @@ def klc_keymap(layout: "KeyboardLayout") -> List[str]:
                 symbols.append("-1")
             description += " " + desc
 
-        scan_code = SCAN_CODES["klc"][key_name]
+        scan_code = key.scan_codes["klc"]
         key_entries.append(
             {
                 "scan_code": scan_code,
@@ -227,11 +242,11 @@ def klc_keymap(layout: "KeyboardLayout") -> List[str]:
         )
 
     # Assign Virtual Keys
-    final_vks = _assign_vks(layout)
+    final_vks = assign_vks(layout)
 
     output = []
     for entry in key_entries:
-        vk = final_vks[entry["scan_code"]]
+        vk = final_vks[entry["scan_code"]].vk
         symbols = entry["symbols"]
         is_alpha = entry["is_alpha"]
         description = entry["description"]
@@ -330,14 +345,11 @@ def c_keymap(layout: "KeyboardLayout") -> List[str]:
     """Windows C layout, main part."""
 
     supported_symbols = "1234567890abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    final_vks = _assign_vks(layout)
+    final_vks = assign_vks(layout)
 
     output = []
-    for key_name in LAYER_KEYS:
-        if key_name.startswith("-"):
-            continue
-
-        if key_name in ["ae13", "ab11"]:  # ABNT / JIS keys
+    for key in layout.resolved:
+        if key.name in ["ae13", "ab11"]:  # ABNT / JIS keys
             continue  # these two keys are not supported yet
 
         symbols = []
@@ -346,16 +358,13 @@ def c_keymap(layout: "KeyboardLayout") -> List[str]:
         has_dead_key = False
 
         for i in [Layer.BASE, Layer.SHIFT, Layer.ALTGR, Layer.ALTGR_SHIFT]:
-            layer = layout.layers[i]
+            symbol = key.chars[i]
 
-            if key_name in layer:
-                symbol = layer[key_name]
-                desc = symbol
+            if symbol:
                 dead = "WCH_NONE"
-                if symbol in layout.dead_keys:
-                    desc = layout.dead_keys[symbol][" "]
+                if key.dead[i]:
                     symbol = "WCH_DEAD"
-                    dead = hex_ord(desc)
+                    dead = hex_ord(key.terms[i])
                     has_dead_key = True
                 else:
                     if i == Layer.BASE:
@@ -365,13 +374,12 @@ def c_keymap(layout: "KeyboardLayout") -> List[str]:
                 symbols.append(symbol)
                 dead_symbols.append(dead)
             else:
-                desc = " "
                 symbols.append("WCH_NONE")
                 dead_symbols.append("WCH_NONE")
 
-        scan_code = SCAN_CODES["klc"][key_name]
+        scan_code = key.scan_codes["klc"]
 
-        virtual_key = final_vks[scan_code]
+        virtual_key = final_vks[scan_code].vk
 
         if len(virtual_key) == 1:
             virtual_key_id = f"'{virtual_key}'"
@@ -463,11 +471,11 @@ def c_dk_index(layout: "KeyboardLayout") -> List[str]:
         if k not in layout.dead_keys:
             continue
         term = layout.dead_keys[k][" "]
-        output.append(f'L"\\\\x{hex_ord(term)}"\tL"{DK_INDEX[k].name.upper()}",')
+        output.append(f'L"\\x{hex_ord(term)}"\tL"{DK_INDEX[k].name.upper()}",')
     return output
 
 
-def klc(layout: "KeyboardLayout") -> str:
+def write_klc(layout: "KeyboardLayout", file: Sink) -> None:
     """Windows driver (warning: requires CR/LF + UTF16LE encoding)"""
 
     if len(layout.meta["name8"]) > 8:
@@ -482,30 +490,48 @@ def klc(layout: "KeyboardLayout") -> str:
     langid = _get_langid(locale)
 
     # fmt: off
-    out = load_tpl(layout, ".klc")
-    out = substitute_lines(out, "LAYOUT",         klc_keymap(layout))
-    out = substitute_lines(out, "DEAD_KEYS",      klc_deadkeys(layout))
-    out = substitute_lines(out, "DEAD_KEY_INDEX", klc_dk_index(layout))
-    out = substitute_token(out, "localeid",       f"0000{langid}")
-    out = substitute_token(out, "locale",         locale)
-    out = substitute_token(out, "encoding",       "utf-16le")
+    write_tpl(file, layout, ".klc", context={
+        "LAYOUT":         klc_keymap(layout),
+        "DEAD_KEYS":      klc_deadkeys(layout),
+        "DEAD_KEY_INDEX": klc_dk_index(layout),
+        "localeid":       f"0000{langid}",
+        "locale":         locale,
+        "encoding":       "utf-16le",
+    })
     # fmt: on
-    return out
 
 
-def klc_rc(layout: "KeyboardLayout") -> str:
+def klc(layout: "KeyboardLayout") -> str:
+    """Windows driver (warning: requires CR/LF + UTF16LE encoding)"""
+    return render(write_klc, layout)
+
+
+def write_klc_rc(layout: "KeyboardLayout", file: Sink) -> None:
     """Windows resource file for C drivers"""
-    out = load_tpl(layout, ".RC")
     # version numbers are in "a,b,c,d" format
     version = layout.meta["version"].replace(".", ",")
-    out = substitute_token(out, "rc_version", version)
-    return out
+    write_tpl(file, layout, ".RC", context={"rc_version": version})
+
+
+def klc_rc(layout: "KeyboardLayout") -> str:
+    """Windows resource file for C drivers"""
+    return render(write_klc_rc, layout)
+
+
+def write_klc_c(layout: "KeyboardLayout", file: Sink) -> None:
+    """Windows keymap file for C drivers"""
+    write_tpl(
+        file,
+        layout,
+        ".C",
+        context={
+            "LAYOUT": c_keymap(layout),
+            "DEAD_KEYS": c_deadkeys(layout),
+            "DEAD_KEY_INDEX": c_dk_index(layout),
+        },
+    )
 
 
 def klc_c(layout: "KeyboardLayout") -> str:
     """Windows keymap file for C drivers"""
-    out = load_tpl(layout, ".C")
-    out = substitute_lines(out, "LAYOUT", c_keymap(layout))
-    out = substitute_lines(out, "DEAD_KEYS", c_deadkeys(layout))
-    out = substitute_lines(out, "DEAD_KEY_INDEX", c_dk_index(layout))
-    return out
+    return render(write_klc_c, layout)
@@ -46,28 +46,26 @@ def raw_json(layout: "KeyboardLayout") -> Dict:
     # correcponding to Base, Shift, AltGr, AltGr+Shift
     keymap: Dict[str, List[str]] = {}
     legendmap: Dict[str, List[str]] = {}
-    for key_name in LAYER_KEYS:
-        if key_name.startswith("-"):
-            continue
-
+    for key in layout.resolved:
+        key_name = key.name
         for probe_layer in [Layer.BASE, Layer.SHIFT, Layer.ALTGR, Layer.ALTGR_SHIFT]:
             legend_probe = layout.legends[probe_layer].get(key_name)
             char_probe = layout.layers[probe_layer].get(key_name)
             if legend_probe and _should_export_legend(legend_probe, char_probe):
                 break
-        chars = list("")
+        chars = []
         legends = ["", "", "", ""]
         for idx, layer in enumerate(
             [Layer.BASE, Layer.SHIFT, Layer.ALTGR, Layer.ALTGR_SHIFT]
         ):
-            if key_name in layout.layers[layer]:
-                chars.append(layout.layers[layer][key_name])
+            char = key.chars[layer]
+            if char:
+                chars.append(char)
             legend = layout.legends[layer].get(key_name)
-            char = layout.layers[layer].get(key_name)
             if legend and _should_export_legend(legend, char):
                 legends[idx] = legend
         if chars:
-            scancode = SCAN_CODES["web"][key_name]
+            scancode = key.scan_codes["web"]
             keymap[scancode] = chars
             if any(legends):
                 legendmap[scancode] = legends
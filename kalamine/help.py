@@ -2,8 +2,7 @@ from pathlib import Path
 from typing import Dict, List
 
 from .layout import KeyboardLayout
-from .template import SCAN_CODES
-from .utils import Layer, load_data
+from .utils import SCAN_CODES, Layer, load_data
 
 SEPARATOR = (
     "--------------------------------------------------------------------------------"
@@ -1,17 +1,31 @@
-import copy
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Type, TypeVar
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import click
 import tomli
-import yaml
 
+from .resolve import ResolvedKeymap, resolve_keymap
 from .utils import (
     DEAD_KEYS,
+    DK_INDEX,
     LAYER_KEYS,
     ODK_ID,
+    BuildStamp,
     Layer,
     load_data,
     text_to_lines,
@@ -23,30 +37,51 @@ from .utils import (
 #
 
 
-def load_layout(layout_path: Path) -> Dict:
-    """Load the TOML/YAML layout description data (and its ancessor, if any)."""
+def _read_descriptor(file_path: Path) -> Dict:
+    if file_path.suffix in [".yaml", ".yml"]:
+        import yaml
+
+        with file_path.open(encoding="utf-8") as file:
+            return yaml.load(file, Loader=yaml.SafeLoader)
 
-    def load_descriptor(file_path: Path) -> Dict:
-        if file_path.suffix in [".yaml", ".yml"]:
-            with file_path.open(encoding="utf-8") as file:
-                return yaml.load(file, Loader=yaml.SafeLoader)
+    with file_path.open(mode="rb") as dfile:
+        return tomli.load(dfile)
 
-        with file_path.open(mode="rb") as dfile:
-            return tomli.load(dfile)
+
+def parse_descriptor(descriptor: Union[Dict, Path, str, bytes]) -> Dict:
+    """Normalized layout description data (merged with its ancessor, if any):
+    from a TOML/YAML file, a TOML text, or already loaded data. Raises
+    ValueError if the descriptor cannot be parsed.
+
+    Only descriptor files can extend another one (in the same directory), so
+    that a descriptor text cannot make kalamine read other files."""
 
     try:
-        cfg = load_descriptor(layout_path)
+        if isinstance(descriptor, Path):
+            cfg = _read_descriptor(descriptor)
+            if "name" not in cfg:
+                cfg["name"] = descriptor.stem
+        elif isinstance(descriptor, (str, bytes)):
+            if isinstance(descriptor, bytes):
+                descriptor = descriptor.decode("utf-8")
+            cfg = tomli.loads(descriptor)
+        else:
+            cfg = dict(descriptor)
         if "name" not in cfg:
-            cfg["name"] = layout_path.stem
+            cfg["name"] = MetaDescr.name
         if "extends" in cfg:
-            parent_path = layout_path.parent / cfg["extends"]
-            ext = load_descriptor(parent_path)
+            if not isinstance(descriptor, Path):
+                raise ValueError("only descriptor files can extend another one")
+            parent_path = descriptor.parent / cfg["extends"]
+            ext = _read_descriptor(parent_path)
             ext.update(cfg)
             cfg = ext
+        for key in ["locale", "variant", "description"]:  # used by generators
+            cfg.setdefault(key, getattr(MetaDescr, key))
         if "version" in cfg:
             version_check = cfg["version"].split(".")
             if len(version_check) > 3:
-                raise Exception(
+                raise ValueError(
                     f"Layout version number **must** follow `x.y.z` format\nCurrently got `version={cfg['version']}`"
                 )
             missing_digits = (3 - len(version_check)) * ["0"]
@@ -56,7 +91,19 @@ def load_layout(layout_path: Path) -> Dict:
 
         return cfg
 
-    except Exception as exc:
+    except ValueError:
+        raise
+    except Exception as exc:  # missing file, invalid YAML, etc.
+        raise ValueError(str(exc)) from exc
+
+
+def load_layout(layout_path: Path) -> Dict:
+    """Load the TOML/YAML layout description data (and its ancessor, if any),
+    or exit with an error message."""
+
+    try:
+        return parse_descriptor(layout_path)
+    except ValueError as exc:
         click.echo("File could not be parsed.", err=True)
         click.echo(f"Error: {exc}.", err=True)
         sys.exit(1)
@@ -113,18 +160,58 @@ class RowDescr:
     keys: List[str]
 
 
+# key name -> (line index, column) of the BASE glyph in a geometry template;
+# the shift glyph is on the line above, 1dk/AltGr glyphs are 2 columns right
+KeyPositions = Mapping[str, Tuple[int, int]]
+
+LAYER_COLUMN_OFFSET = {
+    Layer.BASE: 0,
+    Layer.ODK: 2,
+    Layer.ALTGR: 2,
+}
+
+
+def key_positions(rows: List[RowDescr]) -> KeyPositions:
+    """Compile geometry rows into an immutable key position map."""
+
+    positions: Dict[str, Tuple[int, int]] = {}
+    for j, row in enumerate(rows):
+        for k, key in enumerate(row.keys):
+            positions[key] = (2 + j * 3, row.offset + k * 6)
+    return MappingProxyType(positions)
+
+
+def angle_mod_rows(rows: List[RowDescr]) -> Optional[List[RowDescr]]:
+    """Apply the Angle Mod permutation, if the geometry supports it."""
+
+    if len(rows) < 4 or rows[3].keys[0] != "lsgt":
+        return None
+
+    # should become ['ab05', 'lsgt', 'ab01', 'ab02', 'ab03', 'ab04']
+    keys = rows[3].keys
+    last_row = RowDescr(rows[3].offset, [keys[5]] + keys[:5] + keys[6:])
+    return rows[:3] + [last_row] + rows[4:]
+
+
 T = TypeVar("T", bound="GeometryDescr")
 
 
-@dataclass
+@dataclass(frozen=True)
 class GeometryDescr:
     template: str
     rows: List[RowDescr]
+    keys: KeyPositions
+    angle_mod_keys: Optional[KeyPositions]  # None if Angle Mod is not supported
 
     @classmethod
     def from_dict(cls: Type[T], src: Dict) -> T:
+        rows = [RowDescr(**row) for row in src["rows"]]
+        am_rows = angle_mod_rows(rows)
         return cls(
-            template=src["template"], rows=[RowDescr(**row) for row in src["rows"]]
+            template=src["template"],
+            rows=rows,
+            keys=key_positions(rows),
+            angle_mod_keys=key_positions(am_rows) if am_rows else None,
         )
 
 
@@ -133,6 +220,288 @@ GEOMETRY = {
 }
 
 
+###
+# Template tokenizer
+#
+
+CIRCLED_FN = {
+    "①": "f1",
+    "②": "f2",
+    "③": "f3",
+    "④": "f4",
+    "⑤": "f5",
+    "⑥": "f6",
+    "⑦": "f7",
+    "⑧": "f8",
+    "⑨": "f9",
+    "⑩": "f10",
+    "⑪": "f11",
+    "⑫": "f12",
+}
+
+SPECIAL_KEYS = ("esc", "ins", "del", "bspc")
+
+
+def special_key(label: str) -> Optional[str]:
+    """Extract special key name from label, or None if not a special key."""
+
+    label_lower = label.lower().strip()
+    if not label_lower:
+        return None
+
+    if label_lower[0] in CIRCLED_FN:
+        return CIRCLED_FN[label_lower[0]]
+
+    # explicit special keys, either alone or followed by a non-letter
+    for special in SPECIAL_KEYS:
+        if label_lower.startswith(special):
+            if (
+                len(label_lower) == len(special)
+                or not label_lower[len(special)].isalpha()
+            ):
+                return special
+
+    # function keys: f1..f12
+    if label_lower.startswith("f"):
+        i = 1
+        while i < len(label_lower) and label_lower[i].isdigit():
+            i += 1
+        if i > 1:
+            try:
+                if 1 <= int(label_lower[1:i]) <= 12:
+                    return label_lower[:i]
+            except ValueError:  # non-ASCII digits, e.g. `f²`
+                pass
+
+    return None
+
+
+def split_label(label: str) -> Tuple[Optional[str], Optional[str]]:
+    """Split a label into its (left, right) parts, e.g.:
+    "f12÷" -> ("f12", "÷"); "f2 ¤" -> ("f2", "¤"); "Q" -> ("Q", None).
+    """
+
+    if not label:
+        return (None, None)
+
+    # special key + remainder
+    special = special_key(label)
+    if special:
+        remainder = label[len(special) :].strip()
+        return (special, remainder if remainder else None)
+
+    # otherwise split on the first whitespace, if any
+    parts = label.strip().split(None, 1)
+    if len(parts) == 2:
+        return (parts[0], parts[1])
+    elif len(parts) == 1:
+        return (parts[0], None)
+    return (None, None)
+
+
+def is_cell_border(char: str) -> bool:
+    return 0x2500 <= ord(char) <= 0x257F
+
+
+@dataclass(frozen=True)
+class TemplateCell:
+    """One line of a key cell in an ASCII-art layer template."""
+
+    span: Tuple[int, int]  # first and last columns between the cell borders
+    left: str  # left glyph (BASE layer), including its dead key marker
+    right: str  # right glyph (1dk / AltGr layer), including its dead key marker
+    label: str  # whole cell content
+    special: Optional[str]  # left part of the label, if it is a special key name
+    extra: Optional[str]  # right part of the label, if any
+
+
+# key name -> (base line cell, shift line cell)
+TemplateCells = Dict[str, Tuple[TemplateCell, TemplateCell]]
+
+# column -> (first, last) columns of the enclosing cell, if any
+CellSpans = List[Optional[Tuple[int, int]]]
+
+
+def _cell_spans(line: str) -> CellSpans:
+    """For each column of a template line, the span of the enclosing cell."""
+
+    spans: CellSpans = [None] * len(line)
+    start = 0
+    for col, char in enumerate(line):
+        if is_cell_border(char):
+            spans[start:col] = [(start, col - 1)] * (col - start)
+            start = col + 1
+    spans[start:] = [(start, len(line) - 1)] * (len(line) - start)
+    return spans
+
+
+def _glyph(line: str, col: int) -> str:
+    return ("*" if line[col - 1] == "*" else "") + line[col]
+
+
+def tokenize_template(template: List[str], positions: KeyPositions) -> TemplateCells:
+    """Turn an ASCII-art layer template into a table of key cells, once and for
+    all layers: each key cell provides its left and right glyphs and its label,
+    already split for special keys."""
+
+    spans: Dict[int, CellSpans] = {}
+
+    def template_cell(line_index: int, col: int) -> TemplateCell:
+        line = template[line_index]
+        if line_index not in spans:
+            spans[line_index] = _cell_spans(line)
+        span = spans[line_index][col] or (col, col)
+        label = line[span[0] : span[1] + 1].strip()
+        left, right = split_label(label)
+        return TemplateCell(
+            span=span,
+            left=_glyph(line, col),
+            right=_glyph(line, col + 2),
+            label=label,
+            special=left if left and special_key(left) else None,
+            extra=right,
+        )
+
+    return {
+        key: (template_cell(line, col), template_cell(line - 1, col))
+        for key, (line, col) in positions.items()
+    }
+
+
+###
+# Key maps
+#
+
+# key ordinal table: all layers are stored as flat arrays, in this order
+KEY_NAMES = tuple(key_name for key_name in LAYER_KEYS if not key_name.startswith("-"))
+KEY_ORDINALS = {key_name: i for i, key_name in enumerate(KEY_NAMES)}
+
+
+class LayerView(Mapping[str, str]):
+    """Dict-like view of one layer of a `KeyMap`: key name -> character(s)."""
+
+    __slots__ = ("_keymap", "_offset")
+
+    def __init__(self, keymap: "KeyMap", layer: Layer) -> None:
+        self._keymap = keymap
+        self._offset = layer * len(KEY_NAMES)
+
+    def __getitem__(self, key_name: str) -> str:
+        char = self._keymap._chars[self._offset + KEY_ORDINALS[key_name]]
+        if char is None:
+            raise KeyError(key_name)
+        return char
+
+    def __setitem__(self, key_name: str, char: str) -> None:
+        self._keymap._set(self._offset + KEY_ORDINALS[key_name], char)
+
+    def __contains__(self, key_name: object) -> bool:
+        ordinal = KEY_ORDINALS.get(key_name)  # type: ignore
+        if ordinal is None:
+            return False
+        return self._keymap._chars[self._offset + ordinal] is not None
+
+    def get(self, key_name: str, default: Any = None) -> Any:
+        ordinal = KEY_ORDINALS.get(key_name)
+        if ordinal is None:
+            return default
+        char = self._keymap._chars[self._offset + ordinal]
+        return default if char is None else char
+
+    def __iter__(self) -> Iterator[str]:
+        chars = self._keymap._chars[self._offset : self._offset + len(KEY_NAMES)]
+        return (key_name for key_name, char in zip(KEY_NAMES, chars) if char)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class KeyMap(Mapping[Layer, LayerView]):
+    """Compact storage of all layers of a layout: one slot per key and layer,
+    None for undefined keys. An indexed key map also keeps track of the slots
+    where each character can be found. `revision` is bumped on every write."""
+
+    __slots__ = ("_chars", "_index", "revision")
+
+    def __init__(self, indexed: bool = False) -> None:
+        self._chars: List[Optional[str]] = [None] * (len(KEY_NAMES) * len(Layer))
+        self._index: Optional[Dict[str, List[int]]] = {} if indexed else None
+        self.revision = 0
+
+    def __getitem__(self, layer: Layer) -> LayerView:
+        return LayerView(self, Layer(layer))
+
+    def __iter__(self) -> Iterator[Layer]:
+        return iter(Layer)
+
+    def __len__(self) -> int:
+        return len(Layer)
+
+    def __repr__(self) -> str:
+        return repr({layer: dict(view) for layer, view in self.items()})
+
+    def _set(self, slot: int, char: str) -> None:
+        char = sys.intern(char)
+        if self._index is not None:
+            previous = self._chars[slot]
+            if previous is not None:
+                self._index[previous].remove(slot)
+                if not self._index[previous]:
+                    del self._index[previous]
+            self._index.setdefault(char, []).append(slot)
+        self._chars[slot] = char
+        self.revision += 1
+
+    def copy(self) -> "KeyMap":
+        keymap = KeyMap.__new__(KeyMap)
+        keymap._chars = self._chars.copy()
+        keymap._index = None
+        if self._index is not None:
+            keymap._index = {char: slots.copy() for char, slots in self._index.items()}
+        keymap.revision = self.revision
+        return keymap
+
+    def permuted(self, key_names: Mapping[str, str]) -> "KeyMap":
+        """Copy of the key map, with the keys of all layers moved according to
+        `key_names` (old key name -> new key name; missing keys do not move)."""
+
+        ordinals = [
+            KEY_ORDINALS[key_names.get(key_name, key_name)] for key_name in KEY_NAMES
+        ]
+        keymap = KeyMap(indexed=self._index is not None)
+        for slot, char in enumerate(self._chars):
+            if char is not None:
+                layer, ordinal = divmod(slot, len(KEY_NAMES))
+                keymap._set(layer * len(KEY_NAMES) + ordinals[ordinal], char)
+        return keymap
+
+    def find(self, char: str) -> Set[Tuple[Layer, str]]:
+        """All (layer, key name) slots holding a given character."""
+
+        assert self._index is not None, "this key map is not indexed"
+        return {
+            (Layer(slot // len(KEY_NAMES)), KEY_NAMES[slot % len(KEY_NAMES)])
+            for slot in self._index.get(char, [])
+        }
+
+    def chars(self, layers: Set[Layer]) -> Set[str]:
+        """All characters that can be found in the given layers."""
+
+        assert self._index is not None, "this key map is not indexed"
+        return {
+            char
+            for char, slots in self._index.items()
+            if any(slot // len(KEY_NAMES) in layers for slot in slots)
+        }
+
+
+# dead key base -> alt pairs, shared by all layouts
+DEAD_KEY_PAIRS = {dk.char: tuple(zip(dk.base, dk.alt)) for dk in DEAD_KEYS}
+
+
 ###
 # Main
 #
@@ -149,8 +518,8 @@ class KeyboardLayout:
         """Import a keyboard layout to instanciate the object."""
 
         # initialize a blank layout
-        self.layers: Dict[Layer, Dict[str, str]] = {layer: {} for layer in Layer}
-        self.legends: Dict[Layer, Dict[str, str]] = {layer: {} for layer in Layer}
+        self.layers = KeyMap(indexed=True)
+        self.legends = KeyMap()
         self.dk_set: Set[str] = set()
         self.dead_keys: Dict[str, Dict[str, str]] = {}  # dictionary subset of DEAD_KEYS
         # self.meta = Dict[str, str] = {} # default parameters, hardcoded
@@ -159,6 +528,8 @@ class KeyboardLayout:
         self.has_1dk = False
         self.qwerty_shortcuts = qwerty_shortcuts
         self.angle_mod = angle_mod
+        self._resolved: Optional[Tuple[int, ResolvedKeymap]] = None
+        self.stamp: Optional[BuildStamp] = None  # None: from the environment
 
         # metadata: self.meta
         for k in layout_data:
@@ -175,14 +546,13 @@ class KeyboardLayout:
         self.meta["fileName"] = self.meta["name8"].lower()
 
         # keyboard layers: self.layers & self.dead_keys
-        rows = copy.deepcopy(GEOMETRY[self.meta["geometry"]].rows)
+        geometry = GEOMETRY[self.meta["geometry"]]
+        positions = geometry.keys
 
         # Angle Mod permutation
         if angle_mod:
-            last_row = rows[3]
-            if last_row.keys[0] == "lsgt":
-                # should bevome ['ab05', 'lsgt', 'ab01', 'ab02', 'ab03', 'ab04']
-                last_row.keys[:6] = [last_row.keys[5]] + last_row.keys[:5]
+            if geometry.angle_mod_keys:
+                positions = geometry.angle_mod_keys
             else:
                 click.echo(
                     "Warning: geometry does not support angle-mod; ignoring the --angle-mod argument"
@@ -190,19 +560,18 @@ class KeyboardLayout:
                 self.angle_mod = False
 
         if "full" in layout_data:
-            full = text_to_lines(layout_data["full"])
-            self._parse_template(full, rows, Layer.BASE)
-            self._parse_template(full, rows, Layer.ALTGR)
+            full = tokenize_template(text_to_lines(layout_data["full"]), positions)
+            self._parse_template(full, Layer.BASE)
+            self._parse_template(full, Layer.ALTGR)
             self.has_altgr = True
         else:
-            base = text_to_lines(layout_data["base"])
-            self._parse_template(base, rows, Layer.BASE)
-            self._parse_template(base, rows, Layer.ODK)
+            base = tokenize_template(text_to_lines(layout_data["base"]), positions)
+            self._parse_template(base, Layer.BASE)
+            self._parse_template(base, Layer.ODK)
             if "altgr" in layout_data:
                 self.has_altgr = True
-                self._parse_template(
-                    text_to_lines(layout_data["altgr"]), rows, Layer.ALTGR
-                )
+                altgr = text_to_lines(layout_data["altgr"])
+                self._parse_template(tokenize_template(altgr, positions), Layer.ALTGR)
 
         # space bar
         spc = SPACEBAR.copy()
@@ -220,26 +589,20 @@ class KeyboardLayout:
             self.layers[Layer.ALTGR]["spce"] = spc["altgr"]
             self.layers[Layer.ALTGR_SHIFT]["spce"] = spc["altgr_shift"]
 
-        self._parse_dead_keys(spc)
+        self._parse_dead_keys()
 
-    def _parse_dead_keys(self, spc: Dict[str, str]) -> None:
+    def _parse_dead_keys(self) -> None:
         """Build a deadkey dict."""
 
-        def layout_has_char(char: str) -> bool:
-            all_layers = [Layer.BASE, Layer.SHIFT]
-            if self.has_altgr:
-                all_layers += [Layer.ALTGR, Layer.ALTGR_SHIFT]
-
-            for layer_index in all_layers:
-                for id in self.layers[layer_index]:
-                    if self.layers[layer_index][id] == char:
-                        return True
-            return False
+        # characters that can be typed without any dead key
+        all_layers = {Layer.BASE, Layer.SHIFT}
+        if self.has_altgr:
+            all_layers |= {Layer.ALTGR, Layer.ALTGR_SHIFT}
+        layout_chars = self.layers.chars(all_layers)
 
-        all_spaces: List[str] = []
-        for space in ["\u0020", "\u00a0", "\u202f"]:
-            if layout_has_char(space):
-                all_spaces.append(space)
+        all_spaces = [
+            space for space in ["\u0020", "\u00a0", "\u202f"] if space in layout_chars
+        ]
 
         self.dead_keys = {}
         for dk in DEAD_KEYS:
@@ -262,307 +625,123 @@ class KeyboardLayout:
                                 self.layers[layer][key_name]
                             )
                 for space in all_spaces:
-                    deadkey[space] = spc["1dk"]
+                    deadkey[space] = self.layers[Layer.ODK]["spce"]
 
             else:
-                base = dk.base
-                alt = dk.alt
-                for i in range(len(base)):
-                    if layout_has_char(base[i]):
-                        deadkey[base[i]] = alt[i]
+                common = layout_chars.intersection(dk.base)
+                for base, alt in DEAD_KEY_PAIRS[id]:
+                    if base in common:
+                        deadkey[base] = alt
                 for space in all_spaces:
                     deadkey[space] = dk.alt_space
 
-    def _parse_template(
-        self, template: List[str], rows: List[RowDescr], layer_number: Layer
-    ) -> None:
-        """Extract a keyboard layer from a template."""
-
-        j = 0
-        col_offset = 0 if layer_number == Layer.BASE else 2
-        for row in rows:
-            i = row.offset + col_offset
-            keys = row.keys
-
-            base = list(template[2 + j * 3])
-            shift = list(template[1 + j * 3])
-
-            for key in keys:
-                base_key = ("*" if base[i - 1] == "*" else "") + base[i]
-                shift_key = ("*" if shift[i - 1] == "*" else "") + shift[i]
-
-                # Extract labels for the entire cell
-                base_label = self._extract_cell_label(base, i)
-                if base_label:
-                    self.legends[layer_number][key] = base_label
-                shift_label = self._extract_cell_label(shift, i)
-                if shift_label:
-                    self.legends[layer_number.next()][key] = shift_label
-
-                # in the BASE layer, if the base character is undefined, shift prevails
-                if base_key == " ":
-                    if layer_number == Layer.BASE:
-                        base_key = shift_key.lower()
-
-                # in other layers, if the shift character is undefined, base prevails
-                elif shift_key == " ":
-                    if layer_number == Layer.ALTGR:
-                        shift_key = upper_key(base_key)
-                    elif layer_number == Layer.ODK:
-                        shift_key = upper_key(base_key)
-                        # shift_key = upper_key(base_key, blank_if_obvious=False)
-
-                # Special keys (esc, f1..f12, ins, del, bspc) shouldn't produce text
-                # Instead, they should be stored by their key name
-                circled_fn = {
-                    "①": "f1",
-                    "②": "f2",
-                    "③": "f3",
-                    "④": "f4",
-                    "⑤": "f5",
-                    "⑥": "f6",
-                    "⑦": "f7",
-                    "⑧": "f8",
-                    "⑨": "f9",
-                    "⑩": "f10",
-                    "⑪": "f11",
-                    "⑫": "f12",
-                }
-
-                def extract_special_key(label: str) -> Optional[str]:
-                    """Extract special key name from label, or None if not a special key."""
-                    if not label:
-                        return None
-                    label_lower = label.lower().strip()
-
-                    if label_lower and label_lower[0] in circled_fn:
-                        return circled_fn[label_lower[0]]
-                    
-                    # Check explicit special keys at the start
-                    for special in ("esc", "ins", "del", "bspc"):
-                        if label_lower.startswith(special):
-                            # Check if it's the whole label or followed by non-letter
-                            if len(label_lower) == len(special) or not label_lower[len(special)].isalpha():
-                                return special
-                    
-                    # Check for function keys f1-f12 at the start
-                    if label_lower.startswith("f"):
-                        # Extract the numeric part
-                        i = 1
-                        while i < len(label_lower) and label_lower[i].isdigit():
-                            i += 1
-                        
-                        if i > 1:  # Found at least one digit after 'f'
-                            try:
-                                fn_num = int(label_lower[1:i])
-                                # Valid function keys are f1 through f12
-                                if 1 <= fn_num <= 12:
-                                    return label_lower[:i]  # Return the function key name (e.g., "f2", "f12")
-                            except ValueError:
-                                pass
-                    
-                    return None
-                
-                def split_label_for_layers(label: str, is_base_layer: bool) -> tuple[Optional[str], Optional[str]]:
-                    """Split a label into (base_value, odk_value) based on position.
-                    
-                    For BASE layer (is_base_layer=True), we use the left part.
-                    For ODK layer (is_base_layer=False), we use the right part.
-                    
-                    If label starts with a special key (e.g., "f12÷"), split it:
-                    - base_value: "f12" (the special key)
-                    - odk_value: "÷" (the remaining character)
-                    
-                    If label has spaces (e.g., "f2 ¤"), split on space:
-                    - base_value: "f2"
-                    - odk_value: "¤"
-                    """
-                    if not label:
-                        return (None, None)
-                    
-                    # Check if it starts with a special key
-                    special = extract_special_key(label)
-                    if special:
-                        # Split: special key + remainder
-                        remainder = label[len(special):].strip()
-                        return (special, remainder if remainder else None)
-                    
-                    # Otherwise split on space if present
-                    parts = label.strip().split(None, 1)  # Split on first whitespace
-                    if len(parts) == 2:
-                        return (parts[0], parts[1])
-                    elif len(parts) == 1:
-                        return (parts[0], None)
-                    
-                    return (None, None)
-
-                # For BASE layer, use left part of label; for ODK, use right part
-                is_base_layer = (layer_number == Layer.BASE)
-                base_split, odk_split = split_label_for_layers(base_label, is_base_layer)
-                shift_split, shift_odk_split = split_label_for_layers(shift_label, is_base_layer)
-                
-                # Determine which split to use based on the layer
+    def _parse_template(self, cells: TemplateCells, layer_number: Layer) -> None:
+        """Extract a keyboard layer from a tokenized template."""
+
+        is_base_layer = layer_number == Layer.BASE
+        for key, (base, shift) in cells.items():
+            if is_base_layer:
+                base_key = base.left
+                shift_key = shift.left
+            else:  # ODK or ALTGR layer
+                base_key = base.right
+                shift_key = shift.right
+
+            if base.label:
+                self.legends[layer_number][key] = base.label
+            if shift.label:
+                self.legends[layer_number.next()][key] = shift.label
+
+            # in the BASE layer, if the base character is undefined, shift prevails
+            if base_key == " ":
                 if is_base_layer:
-                    # Use the left (base) part
-                    if base_split and extract_special_key(base_split):
-                        base_key = base_split
-                    if shift_split and extract_special_key(shift_split):
-                        shift_key = shift_split
-                else:  # ODK or ALTGR layer
-                    # Use the right (odk) part if it exists
-                    if odk_split:
-                        base_key = odk_split
-                    if shift_odk_split:
-                        shift_key = shift_odk_split
-
-                if base_key.endswith("⇥"):
-                    base_key = base_key[:-1] + "\t"
-                if shift_key.endswith("⇥"):
-                    shift_key = shift_key[:-1] + "\t"
-
-                if base_key != " ":
-                    self.layers[layer_number][key] = base_key
-                if shift_key != " ":
-                    self.layers[layer_number.next()][key] = shift_key
-
-                for dk in DEAD_KEYS:
-                    if base_key == dk.char or shift_key == dk.char:
-                        self.dk_set.add(dk.char)
-
-                i += 6
-            j += 1
-
-    @staticmethod
-    def _is_cell_border(char: str) -> bool:
-        if not char:
-            return True
-        code_point = ord(char)
-        return 0x2500 <= code_point <= 0x257F
-
-    @classmethod
-    def _extract_cell_label(cls, line: List[str], index: int) -> str:
-        if index >= len(line):
-            return ""
-        left = index
-        while left > 0 and not cls._is_cell_border(line[left - 1]):
-            left -= 1
-        right = index
-        max_index = len(line) - 1
-        while right < max_index and not cls._is_cell_border(line[right + 1]):
-            right += 1
-        return "".join(line[left : right + 1]).strip()
-
-    @classmethod
-    def _extract_local_label(cls, line: List[str], index: int) -> str:
-        """Extract label immediately around the index position.
-        
-        This extracts a token (word) starting at or near the index position,
-        useful for detecting special keys at specific positions within a cell.
-        The key insight: if we're in the MIDDLE of a token (not at its start),
-        we look forward for the NEXT token instead.
-        
-        For example, in 'f2 ¤':
-        - at position of 'f' (start of token) -> extracts 'f2'
-        - at position of '2' (middle of token 'f2') -> extracts '¤' (next token)
-        - at position of ' ' (space) -> extracts '¤' (next token)
-        - at position of '¤' -> extracts '¤'
-        
-        In 'f12÷':
-        - at position of 'f' (start) -> extracts 'f12÷' (no space, gets whole thing... but we handle this differently)
-        
-        Actually, better approach: extract from current position forward only, not backward.
-        """
-        if index >= len(line):
-            return ""
-        
-        # Start from the current position
-        left = index
-        
-        # Skip any leading spaces or borders from current position
-        while left < len(line) and (line[left] in (' ', '\t') or cls._is_cell_border(line[left])):
-            left += 1
-        
-        if left >= len(line):
-            return ""
-        
-        # Now extract the token starting from left
-        right = left
-        max_index = len(line) - 1
-        while right < max_index and not cls._is_cell_border(line[right + 1]) and line[right + 1] not in (' ', '\t'):
-            right += 1
-        
-        return "".join(line[left : right + 1]).strip()
+                    base_key = shift_key.lower()
+
+            # in other layers, if the shift character is undefined, base prevails
+            elif shift_key == " ":
+                if layer_number in (Layer.ALTGR, Layer.ODK):
+                    shift_key = upper_key(base_key)
+
+            # Special keys (esc, f1..f12, ins, del, bspc) shouldn't produce text:
+            # the BASE layer uses the left part of the label (special key name),
+            # the ODK/ALTGR layers use the right part of the label, if any
+            if is_base_layer:
+                if base.special:
+                    base_key = base.special
+                if shift.special:
+                    shift_key = shift.special
+            else:
+                if base.extra:
+                    base_key = base.extra
+                if shift.extra:
+                    shift_key = shift.extra
+
+            if base_key.endswith("⇥"):
+                base_key = base_key[:-1] + "\t"
+            if shift_key.endswith("⇥"):
+                shift_key = shift_key[:-1] + "\t"
+
+            if base_key != " ":
+                self.layers[layer_number][key] = base_key
+            if shift_key != " ":
+                self.layers[layer_number.next()][key] = shift_key
+
+            if base_key in DK_INDEX:
+                self.dk_set.add(base_key)
+            if shift_key in DK_INDEX:
+                self.dk_set.add(shift_key)
 
     ###
     # Geometry: base, full, altgr
     #
 
     def _fill_template(
-        self, template: List[str], rows: List[RowDescr], layer_number: Layer
-    ) -> List[str]:
-        """Fill a template with a keyboard layer."""
-
-        if layer_number == Layer.BASE:
-            col_offset = 0
-            shift_prevails = True
-        else:  # AltGr or 1dk
-            col_offset = 2
-            shift_prevails = False
-
-        j = 0
-        for row in rows:
-            i = row.offset + col_offset
-            keys = row.keys
-
-            base = list(template[2 + j * 3])
-            shift = list(template[1 + j * 3])
-
-            for key in keys:
-                base_key = " "
-                if key in self.layers[layer_number]:
-                    base_key = self.layers[layer_number][key]
-
-                shift_key = " "
-                if key in self.layers[layer_number.next()]:
-                    shift_key = self.layers[layer_number.next()][key]
-
-                dead_base = len(base_key) == 2 and base_key[0] == "*"
-                dead_shift = len(shift_key) == 2 and shift_key[0] == "*"
-
-                if shift_prevails:
-                    shift[i] = shift_key[-1]
-                    if dead_shift:
-                        shift[i - 1] = "*"
-                    if upper_key(base_key) != shift_key:
-                        base[i] = base_key[-1]
-                        if dead_base:
-                            base[i - 1] = "*"
-                else:
-                    base[i] = base_key[-1]
-                    if dead_base:
-                        base[i - 1] = "*"
-                    if upper_key(base_key) != shift_key:
-                        shift[i] = shift_key[-1]
-                        if dead_shift:
-                            shift[i - 1] = "*"
+        self, template: List[List[str]], positions: KeyPositions, layer_number: Layer
+    ) -> None:
+        """Fill a template (as lists of characters) with a keyboard layer."""
 
-                i += 6
+        col_offset = LAYER_COLUMN_OFFSET[layer_number]
+        shift_prevails = layer_number == Layer.BASE  # AltGr or 1dk otherwise
 
-            template[2 + j * 3] = "".join(base)
-            template[1 + j * 3] = "".join(shift)
-            j += 1
+        base_layer = self.layers[layer_number]
+        shift_layer = self.layers[layer_number.next()]
+        for key, (line, col) in positions.items():
+            i = col + col_offset
+            base = template[line]
+            shift = template[line - 1]
 
-        return template
+            base_key = base_layer.get(key, " ")
+            shift_key = shift_layer.get(key, " ")
+
+            dead_base = len(base_key) == 2 and base_key[0] == "*"
+            dead_shift = len(shift_key) == 2 and shift_key[0] == "*"
+
+            if shift_prevails:
+                shift[i] = shift_key[-1]
+                if dead_shift:
+                    shift[i - 1] = "*"
+                if upper_key(base_key) != shift_key:
+                    base[i] = base_key[-1]
+                    if dead_base:
+                        base[i - 1] = "*"
+            else:
+                base[i] = base_key[-1]
+                if dead_base:
+                    base[i - 1] = "*"
+                if upper_key(base_key) != shift_key:
+                    shift[i] = shift_key[-1]
+                    if dead_shift:
+                        shift[i - 1] = "*"
 
     def _get_geometry(self, layers: Optional[List[Layer]] = None) -> List[str]:
         """`geometry` view of the requested layers."""
         layers = layers or [Layer.BASE]
 
-        rows = GEOMETRY[self.geometry].rows
-        template = GEOMETRY[self.geometry].template.split("\n")[:-1]
+        geometry = GEOMETRY[self.geometry]
+        template = [list(line) for line in geometry.template.split("\n")[:-1]]
         for i in layers:
-            template = self._fill_template(template, rows, i)
-        return template
+            self._fill_template(template, geometry.keys, i)
+        return ["".join(line) for line in template]
 
     @property
     def geometry(self) -> str:
@@ -591,3 +770,106 @@ class KeyboardLayout:
     def altgr(self) -> List[str]:
         """AltGr layer only."""
         return self._get_geometry([Layer.ALTGR])
+
+    @property
+    def resolved(self) -> ResolvedKeymap:
+        """Resolved keymap, shared by all generators.
+        Memoized until the layers are modified."""
+
+        revision = self.layers.revision
+        if self._resolved is None or self._resolved[0] != revision:
+            self._resolved = (revision, resolve_keymap(self))
+        return self._resolved[1]
+
+    ###
+    # Variants
+    #
+
+    def variant(
+        self, angle_mod: Optional[bool] = None, qwerty_shortcuts: Optional[bool] = None
+    ) -> "KeyboardLayout":
+        """Copy of the layout with other build flags, derived from the parsed
+        layers instead of parsing the layout descriptor again."""
+
+        if angle_mod is None:
+            angle_mod = self.angle_mod
+        geometry = GEOMETRY[self.meta["geometry"]]
+        if angle_mod and not geometry.angle_mod_keys:
+            click.echo(
+                "Warning: geometry does not support angle-mod; ignoring the --angle-mod argument"
+            )
+            angle_mod = False
+
+        layout = KeyboardLayout.__new__(KeyboardLayout)
+        layout.meta = self.meta.copy()
+        layout.dk_set = self.dk_set.copy()
+        layout.has_altgr = self.has_altgr
+        layout.has_1dk = self.has_1dk
+        layout.angle_mod = angle_mod
+        layout.stamp = self.stamp
+        layout.qwerty_shortcuts = self.qwerty_shortcuts
+        if qwerty_shortcuts is not None:
+            layout.qwerty_shortcuts = qwerty_shortcuts
+
+        if angle_mod == self.angle_mod:  # same keymap
+            layout.layers = self.layers.copy()
+            layout.legends = self.legends.copy()
+            layout.dead_keys = {dk: keys.copy() for dk, keys in self.dead_keys.items()}
+            layout._resolved = self._resolved  # memoized values are flag-aware
+            return layout
+
+        # Angle Mod permutation: move each key to the key that is drawn at the
+        # same position of the layout template in the other key position map
+        assert geometry.angle_mod_keys
+        old_keys, new_keys = geometry.keys, geometry.angle_mod_keys
+        if self.angle_mod:
+            old_keys, new_keys = new_keys, old_keys
+        key_at = {position: key_name for key_name, position in new_keys.items()}
+        moves = {key_name: key_at[position] for key_name, position in old_keys.items()}
+        layout.layers = self.layers.permuted(moves)
+        layout.legends = self.legends.permuted(moves)
+        layout._resolved = None
+        layout._parse_dead_keys()
+        return layout
+
+    ###
+    # Serialization
+    #
+
+    def snapshot(self) -> Dict:
+        """Serializable state of the parsed layout, see `from_snapshot`."""
+
+        return {
+            "meta": self.meta,
+            "layers": [dict(self.layers[layer]) for layer in Layer],
+            "legends": [dict(self.legends[layer]) for layer in Layer],
+            "dead_keys": self.dead_keys,
+            "dk_set": sorted(self.dk_set),
+            "has_altgr": self.has_altgr,
+            "has_1dk": self.has_1dk,
+            "qwerty_shortcuts": self.qwerty_shortcuts,
+            "angle_mod": self.angle_mod,
+        }
+
+    @classmethod
+    def from_snapshot(cls, state: Dict) -> "KeyboardLayout":
+        """Restore a parsed layout without parsing its descriptor again."""
+
+        layout = cls.__new__(cls)
+        layout.layers = KeyMap(indexed=True)
+        layout.legends = KeyMap()
+        for layer in Layer:
+            for key_name, char in state["layers"][layer].items():
+                layout.layers[layer][key_name] = char
+            for key_name, label in state["legends"][layer].items():
+                layout.legends[layer][key_name] = label
+        layout.dk_set = set(state["dk_set"])
+        layout.dead_keys = state["dead_keys"]
+        layout.meta = state["meta"]
+        layout.has_altgr = state["has_altgr"]
+        layout.has_1dk = state["has_1dk"]
+        layout.qwerty_shortcuts = state["qwerty_shortcuts"]
+        layout.angle_mod = state["angle_mod"]
+        layout._resolved = None
+        layout.stamp = None
+        return layout
@@ -0,0 +1,128 @@
+"""
+Build manifest: the inputs of the files in an output directory.
+
+Each layout descriptor is recorded with a hash of its inputs (the descriptor,
+the build flags and the kalamine sources) along with the files it has
+produced. Layouts that extend another descriptor also record the hash of their
+parent. An up-to-date descriptor can be skipped without even being parsed.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .sources import sources_digest
+
+MANIFEST_NAME = ".kalamine-manifest.json"
+MANIFEST_VERSION = 2
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class Manifest:
+    """Build manifest of an output directory."""
+
+    def __init__(self, output_dir: Path):
+        self._dir = output_dir
+        self._path = output_dir / MANIFEST_NAME
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._changed = False
+        try:
+            data = json.loads(self._path.read_bytes())
+            if data["version"] == MANIFEST_VERSION:
+                self._entries = data["entries"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def _relative(self, path: Path) -> str:
+        """Path relative to the output directory, so that the entries do not
+        depend on the working directory (`kalamine daemon` uses absolute
+        paths)."""
+
+        try:
+            return os.path.relpath(path, self._dir)
+        except ValueError:  # on another drive (Windows)
+            return str(path.absolute())
+
+    @staticmethod
+    def key(layout_path: Path, flags: Sequence[str] = ()) -> str:
+        """Hash of the inputs of a layout descriptor, for the given build
+        flags (the `extends` parent is checked separately)."""
+
+        digest = hashlib.sha256()
+        for item in [
+            str(MANIFEST_VERSION),
+            sources_digest(),
+            layout_path.stem,  # default layout name
+            *flags,
+        ]:
+            digest.update(item.encode("utf-8") + b"\0")
+        digest.update(layout_path.read_bytes())
+        return digest.hexdigest()
+
+    def is_up_to_date(self, layout_path: Path, flags: Sequence[str] = ()) -> bool:
+        """True if the outputs of a layout descriptor exist and have been
+        built from the same inputs."""
+
+        entry = self._entries.get(self._relative(layout_path))
+        try:
+            if not entry or entry["key"] != self.key(layout_path, flags):
+                return False
+            parent = entry["extends"]
+            if parent and _sha256((self._dir / parent[0]).read_bytes()) != parent[1]:
+                return False
+            return all((self._dir / output).exists() for output in entry["outputs"])
+        except (OSError, KeyError, TypeError, IndexError):
+            return False
+
+    def update(
+        self,
+        layout_path: Path,
+        flags: Sequence[str],
+        outputs: List[Path],
+        parent_path: Optional[Path] = None,
+    ) -> None:
+        """Record the outputs of a successful build."""
+
+        parent = None
+        if parent_path is not None:
+            parent = [self._relative(parent_path), _sha256(parent_path.read_bytes())]
+        self._entries[self._relative(layout_path)] = {
+            "key": self.key(layout_path, flags),
+            "extends": parent,
+            "outputs": [self._relative(output) for output in outputs],
+        }
+        self._changed = True
+
+    def remove(self, layout_path: Path) -> None:
+        """Forget a layout descriptor, e.g. after a failed build."""
+
+        if self._entries.pop(self._relative(layout_path), None) is not None:
+            self._changed = True
+
+    def save(self) -> None:
+        """Write the manifest, if it has changed."""
+
+        if not self._changed:
+            return
+        data = json.dumps(
+            {"version": MANIFEST_VERSION, "entries": self._entries},
+            ensure_ascii=False,
+            indent=2,
+            sort_keys=True,
+        )
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_name = f"{MANIFEST_NAME}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_path = self._path.with_name(tmp_name)
+        tmp_path.write_text(data + "\n", encoding="utf-8")
+        os.replace(tmp_path, self._path)
+        self._changed = False
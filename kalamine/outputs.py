@@ -0,0 +1,116 @@
+"""
+Output formats: file extension -> writer.
+
+Generators are only imported when a file of their format is written, so that
+building a single output does not load every generator (and their
+dependencies). Writers produce bytes into a binary file or buffer: driver
+generators write straight into it, with the encoding and newline policy that
+are set here.
+"""
+
+import io
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Callable, Dict, Iterator, Optional, TextIO
+
+if TYPE_CHECKING:
+    from .layout import KeyboardLayout
+
+Writer = Callable[["KeyboardLayout", BinaryIO], None]
+
+
+class OutputWarning(Exception):
+    """The output file could not be generated, but the build can go on."""
+
+
+@contextmanager
+def text_output(file: BinaryIO, encoding: str, newline: str) -> Iterator[TextIO]:
+    """Text layer over a binary output, which is left open afterwards."""
+
+    text = io.TextIOWrapper(file, encoding=encoding, newline=newline)
+    try:
+        yield text
+    finally:
+        text.flush()
+        text.detach()
+
+
+def write_ahk(layout: "KeyboardLayout", file: BinaryIO) -> None:
+    from .generators import ahk
+
+    with text_output(file, "utf-8", "\n") as text:
+        text.write("\ufeff")  # AHK scripts require a BOM
+        ahk.write_ahk(layout, text)
+
+
+def write_klc(layout: "KeyboardLayout", file: BinaryIO) -> None:
+    from .generators import klc
+
+    with text_output(file, "utf-16le", "\r\n") as text:
+        try:
+            klc.write_klc(layout, text)
+        except ValueError as err:  # e.g. an invalid locale: leave the file empty
+            raise OutputWarning(err) from err
+
+
+def write_keylayout(layout: "KeyboardLayout", file: BinaryIO) -> None:
+    from .generators import keylayout
+
+    with text_output(file, "utf-8", "\n") as text:
+        keylayout.write_keylayout(layout, text)
+
+
+def write_xkb_keymap(layout: "KeyboardLayout", file: BinaryIO) -> None:
+    from .generators import xkb
+
+    with text_output(file, "utf-8", "\n") as text:
+        xkb.write_xkb_keymap(layout, text)
+
+
+def write_xkb_symbols(layout: "KeyboardLayout", file: BinaryIO) -> None:
+    from .generators import xkb
+
+    with text_output(file, "utf-8", "\n") as text:
+        xkb.write_xkb_symbols(layout, text)
+
+
+def write_json(layout: "KeyboardLayout", file: BinaryIO) -> None:
+    from .generators import web
+
+    file.write(web.pretty_json(layout).encode("utf-8"))
+
+
+def write_svg(
+    layout: "KeyboardLayout", file: BinaryIO, geometry: Optional[str] = None
+) -> None:
+    from .generators import web
+
+    drawing = web.svg(layout, geometry)
+    drawing.write(file, encoding="utf-8", xml_declaration=True)
+
+
+# all output formats, in `build_all` order
+OUTPUT_FORMATS: Dict[str, Writer] = {
+    ".ahk": write_ahk,  # Windows driver, AutoHotKey
+    ".klc": write_klc,  # Windows driver, MSKLC
+    ".keylayout": write_keylayout,  # macOS driver
+    ".xkb_keymap": write_xkb_keymap,  # Linux driver, user-space
+    ".xkb_symbols": write_xkb_symbols,  # Linux driver, root
+    ".json": write_json,  # JSON data
+    ".svg": write_svg,  # SVG data
+}
+
+
+def save_output(layout: "KeyboardLayout", path: Path) -> None:
+    """Write an output file, whose format depends on its extension."""
+
+    with path.open("wb") as file:
+        OUTPUT_FORMATS[path.suffix](layout, file)
+
+
+def output_bytes(layout: "KeyboardLayout", ext: str) -> bytes:
+    """Contents of an output file, without writing it."""
+
+    buffer = io.BytesIO()
+    OUTPUT_FORMATS[ext](layout, buffer)
+    return buffer.getvalue()
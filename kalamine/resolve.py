@@ -0,0 +1,115 @@
+"""
+Resolved keymap: the layout as seen by the generators.
+
+Each physical key is resolved once per layout (characters, dead keys,
+terminators, code points, scan codes) instead of once per output format.
+"""
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .layout import KeyboardLayout
+
+from .utils import LAYER_KEYS, SCAN_CODES, Layer, hex_ord
+
+LayerValues = Tuple[str, ...]  # one item per layer
+
+
+@dataclass(frozen=True)
+class ResolvedKey:
+    """One physical key, with its values on each layer (empty if undefined).
+
+    - `chars`: characters or dead key identifiers, as defined in the layout
+    - `dead`: True if the layer holds a dead key
+    - `terms`: dead key terminator (output of dk+space), or the character itself
+    - `repeats`: output of the dead key when pressed twice, or the character
+    - `codes`: hex code point of the `terms` value, None for multi-char values
+    """
+
+    name: str
+    section: str
+    chars: LayerValues
+    dead: Tuple[bool, ...]
+    terms: LayerValues
+    repeats: LayerValues
+    codes: Tuple[Optional[str], ...]
+    scan_codes: Dict[str, Any]  # platform -> scan code
+
+
+@dataclass(frozen=True)
+class ResolvedKeymap:
+    """All keys of a layout, in `LAYER_KEYS` order, grouped by section.
+
+    `memo` holds values derived from the keymap by the generators (e.g. the
+    Windows virtual keys), so that they are computed only once per layout.
+    """
+
+    sections: Tuple[Tuple[str, Tuple[ResolvedKey, ...]], ...]
+    memo: Dict[Any, Any] = field(default_factory=dict, compare=False, repr=False)
+
+    def __iter__(self) -> Iterator[ResolvedKey]:
+        for _, keys in self.sections:
+            yield from keys
+
+
+def _key_sections() -> Dict[str, str]:
+    """Key name -> section title, from the `LAYER_KEYS` separators."""
+
+    sections = {}
+    title = ""
+    for key_name in LAYER_KEYS:
+        if key_name.startswith("-"):
+            title = key_name[1:]
+        else:
+            sections[key_name] = title
+    return sections
+
+
+KEY_SECTIONS = _key_sections()
+KEY_SCAN_CODES = {
+    key_name: {
+        platform: codes[key_name]
+        for platform, codes in SCAN_CODES.items()
+        if key_name in codes
+    }
+    for key_name in KEY_SECTIONS
+}
+
+
+def _code(char: str) -> Optional[str]:
+    return hex_ord(char) if len(char) == 1 else None
+
+
+def resolve_keymap(layout: "KeyboardLayout") -> ResolvedKeymap:
+    """Resolve all keys of a layout. Use `layout.resolved` instead, which
+    memoizes the result."""
+
+    dead_keys = layout.dead_keys
+    sections: Dict[str, list] = {}
+    for key_name, section in KEY_SECTIONS.items():
+        chars = tuple(layout.layers[layer].get(key_name, "") for layer in Layer)
+        dead = tuple(char in dead_keys for char in chars)
+        terms = tuple(
+            dead_keys[char][" "] if is_dead else char
+            for char, is_dead in zip(chars, dead)
+        )
+        repeats = tuple(
+            dead_keys[char][char] if is_dead else char
+            for char, is_dead in zip(chars, dead)
+        )
+        key = ResolvedKey(
+            name=key_name,
+            section=section,
+            chars=chars,
+            dead=dead,
+            terms=terms,
+            repeats=repeats,
+            codes=tuple(_code(term) for term in terms),
+            scan_codes=KEY_SCAN_CODES[key_name],
+        )
+        sections.setdefault(section, []).append(key)
+
+    return ResolvedKeymap(
+        tuple((title, tuple(keys)) for title, keys in sections.items())
+    )
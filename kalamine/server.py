@@ -1,216 +1,607 @@
+import gzip
+import hashlib
+import json
 import threading
 import webbrowser
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from functools import lru_cache
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from importlib import metadata
 from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
 from urllib.parse import parse_qs, urlparse
 from xml.etree import ElementTree as ET
 
 import click
-from livereload import Server  # type: ignore
 
+from .cache import parse_layout
 from .generators import ahk, keylayout, klc, web, xkb
-from .layout import KeyboardLayout, load_layout
+from .layout import KeyboardLayout
+from .watcher import FileWatcher
 
+# path -> generator, content type, charset
+ENDPOINTS: Dict[str, Tuple[Callable[[KeyboardLayout], str], str, str]] = {
+    "/json": (web.pretty_json, "application/json", "utf-8"),
+    "/keylayout": (keylayout.keylayout, "text/plain", "utf-8"),
+    "/ahk": (ahk.ahk, "text/plain", "utf-8"),
+    "/klc": (klc.klc, "text", "utf-16-le"),
+    "/rc": (klc.klc_rc, "text", "utf-8"),
+    "/c": (klc.klc_c, "text", "utf-8"),
+    "/xkb_keymap": (xkb.xkb_keymap, "text/plain", "utf-8"),
+    "/xkb_symbols": (xkb.xkb_symbols, "text/plain", "utf-8"),
+}
 
-def keyboard_server(file_path: Path, angle_mod: bool = False) -> None:
-    kb_layout = KeyboardLayout(load_layout(file_path), angle_mod)
+
+def svg_drawing(layout: KeyboardLayout, geometry: Optional[str] = None) -> str:
+    return ET.tostring(web.svg(layout, geometry).getroot(), encoding="unicode")
+
+
+class Response(NamedTuple):
+    """Rendered output: body, `Content-Type` header, and `ETag` header."""
+
+    body: bytes
+    content_type: str
+    etag: str
+
+    @classmethod
+    def from_bytes(cls, body: bytes, content_type: str) -> "Response":
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return cls(body, content_type, etag)
+
+    @classmethod
+    def render(cls, page: str, content: str, charset: str) -> "Response":
+        return cls.from_bytes(bytes(page, charset), f"{content}; charset={charset}")
+
+
+@lru_cache(maxsize=64)
+def _static_response(path: Path, mtime_ns: int, content_type: str) -> Response:
+    return Response.from_bytes(path.read_bytes(), content_type)
+
+
+def static_response(path: Path, content_type: str) -> Optional[Response]:
+    """Static file (script, corpus...), cached until it is modified."""
+
+    try:
+        return _static_response(path, path.stat().st_mtime_ns, content_type)
+    except OSError:  # missing file, directory, etc.
+        return None
+
+
+###
+# Compression
+#
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",  # .js and .mjs, unless /etc/mime.types says else
+    "application/json",
+    "image/svg+xml",
+)
+MIN_COMPRESSED_SIZE = 1024  # bytes: smaller responses are sent as is
+
+
+@lru_cache(maxsize=None)
+def supported_encodings() -> Tuple[str, ...]:
+    """Content codings that can be sent, preferred first. Brotli requires the
+    optional `brotli` package."""
+
+    try:
+        import brotli  # type: ignore  # noqa: F401
+    except ImportError:
+        return ("gzip",)
+    return ("br", "gzip")
+
+
+def accepted_encodings(header: str) -> Set[str]:
+    """Content codings of an `Accept-Encoding` header, except refused ones."""
+
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        try:
+            weight = float(params.strip()[2:]) if params.strip()[:2] == "q=" else 1
+        except ValueError:
+            continue
+        if coding.strip() and weight > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def negotiate_encoding(header: str) -> Optional[str]:
+    """Preferred content coding among those accepted by the client, if any."""
+
+    accepted = accepted_encodings(header)
+    for encoding in supported_encodings():
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+@lru_cache(maxsize=64)
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compressed body: each asset or output is compressed only once."""
+
+    if encoding == "br":
+        import brotli
+
+        return brotli.compress(body)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+class ResponseCache:
+    """Rendered outputs of a layout, for its current revision. Each output is
+    rendered at most once per revision, even when it is requested by several
+    threads at once."""
+
+    def __init__(self, layout: KeyboardLayout) -> None:
+        self._lock = threading.Lock()
+        self._layout = layout
+        self._revision = 0
+        self._responses: Dict[str, Response] = {}
+        self._rendering: Dict[str, threading.Lock] = {}  # one lock per output
+
+    @property
+    def layout(self) -> KeyboardLayout:
+        return self._layout
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    def update(self, layout: KeyboardLayout) -> None:
+        """Start a new revision, with a new layout."""
+
+        with self._lock:
+            self._layout = layout
+            self._revision += 1
+            self._responses = {}
+            self._rendering = {}
+
+    def get(self, key: str, render: Callable[[KeyboardLayout], Response]) -> Response:
+        """Cached response, or the one rendered by `render`."""
+
+        with self._lock:
+            if key in self._responses:
+                return self._responses[key]
+            layout = self._layout
+            revision = self._revision
+            key_lock = self._rendering.setdefault(key, threading.Lock())
+
+        with key_lock:  # concurrent requests wait for the first rendering
+            with self._lock:
+                if key in self._responses:
+                    return self._responses[key]
+            response = render(layout)
+            with self._lock:
+                if revision == self._revision:
+                    self._responses[key] = response
+            return response
+
+
+def output_key(path: str, geometry: Optional[str] = None) -> str:
+    """Response cache key of a generated output (`ENDPOINTS`, or `/svg`)."""
+    return f"/svg?geometry={geometry or ''}" if path == "/svg" else path
+
+
+def output_renderer(
+    path: str, geometry: Optional[str] = None
+) -> Callable[[KeyboardLayout], Response]:
+    """Renderer of a generated output (`ENDPOINTS`, or `/svg`)."""
+
+    if path == "/svg":
+        return lambda layout: Response.render(
+            svg_drawing(layout, geometry), "image/svg+xml", "utf-8"
+        )
+    generator, content, charset = ENDPOINTS[path]
+    return lambda layout: Response.render(generator(layout), content, charset)
+
+
+def layout_patch(old: KeyboardLayout, new: KeyboardLayout) -> Dict[str, Any]:
+    """Changes between two versions of a layout, for `x-keyboard`: the changed
+    entries of its key map, dead key tables and legends (None if removed).
+    `reload` is set if the page itself has to be reloaded (metadata)."""
+
+    old_json = web.raw_json(old)
+    new_json = web.raw_json(new)
+    patch: Dict[str, Any] = {"reload": old.meta != new.meta}
+    for name in ["keymap", "deadkeys", "legends"]:
+        before = old_json[name]
+        after = new_json[name]
+        patch[name] = {
+            key: after.get(key)
+            for key in sorted(before.keys() | after.keys())
+            if before.get(key) != after.get(key)
+        }
+    return patch
+
+
+class LiveLayout:
+    """Layout descriptor that is parsed again whenever it changes (or its
+    `extends` parent does), once per change. All requests are served from the
+    same parsed layout, whose outputs are rendered eagerly after each change:
+    page loads never wait for parsing. Each change is also published as a
+    patch, for the pages that display the layout."""
+
+    MAX_PATCHES = 16  # older revisions require reloading the whole layout
+
+    def __init__(
+        self, file_path: Path, angle_mod: bool = False, cache: Optional[bool] = None
+    ) -> None:
+        self._file_path = file_path
+        self._angle_mod = angle_mod
+        self._cache = cache
+        self._lock = threading.Lock()
+        layout = self._parse()
+        self._responses = ResponseCache(layout)
+        self._watcher = FileWatcher(self._files(layout))
+        self._changed = threading.Condition()
+        self._patches: Dict[int, Dict[str, Any]] = {}  # revision -> patch
+
+    @property
+    def responses(self) -> ResponseCache:
+        return self._responses
+
+    def _parse(self) -> KeyboardLayout:
+        return parse_layout(self._file_path, self._angle_mod, cache=self._cache)
+
+    def _files(self, layout: KeyboardLayout) -> List[Path]:
+        if "extends" not in layout.meta:
+            return [self._file_path]
+        return [self._file_path, self._file_path.parent / layout.meta["extends"]]
+
+    def refresh(self, debounce: float = 0.1) -> bool:
+        """Parse the layout again if its descriptor files have changed, and
+        render its outputs. Returns True if the layout has been updated."""
+
+        with self._lock:
+            changed = self._watcher.changes()
+            if not changed:
+                return False
+            self._watcher.settle(changed, debounce)
+            try:
+                layout = self._parse()
+            except SystemExit:  # `load_layout` has already reported the error
+                return False
+            except Exception as exc:  # noqa: BLE001 -- reported, the page is kept
+                click.echo(f"Error: {exc}", err=True)
+                return False
+            self._watcher.watch(self._files(layout))
+            patch = layout_patch(self._responses.layout, layout)
+            with self._changed:
+                self._responses.update(layout)
+                revision = self._responses.revision
+                self._patches[revision] = {"revision": revision, **patch}
+                self._patches.pop(revision - self.MAX_PATCHES, None)
+                self._changed.notify_all()
+
+        click.echo(f"... {self._file_path}: reloaded")
+        self.warm()
+        return True
+
+    def warm(self) -> None:
+        """Render all outputs of the current layout."""
+
+        for path in [*ENDPOINTS, "/svg"]:
+            try:
+                self._responses.get(output_key(path), output_renderer(path))
+            except Exception as exc:  # noqa: BLE001 -- the other outputs still work
+                click.echo(f"Error: {path[1:]}: {exc}", err=True)
+
+    def patches(
+        self, revision: int, timeout: Optional[float] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Patches from `revision` to the current one, waiting for the next
+        change if there is none (empty on timeout). None if the patches are
+        too old: the whole layout has to be reloaded."""
+
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self._responses.revision != revision, timeout
+            )
+            current = self._responses.revision
+            revisions = range(revision + 1, current + 1)
+            if any(rev not in self._patches for rev in revisions):
+                return None
+            return [self._patches[rev] for rev in revisions]
+
+    def watch(self, stop: threading.Event, interval: float = 0.2) -> None:
+        """Render the outputs, then refresh the layout until `stop` is set."""
+
+        self.warm()
+        while not stop.wait(interval):
+            self.refresh()
+
+
+WWW_DIR = Path(__file__).parent / "www"
+
+
+def main_page(layout: KeyboardLayout, angle_mod: bool = False) -> str:
+    """Layout preview page. All URLs are relative to the page URL."""
+
+    layout_ref = layout.meta["name"]
+    if "url" in layout.meta:
+        layout_ref = f"""<a href="{layout.meta["url"]}">{layout.meta["name"]}</a>"""
+
+    return f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <title>Kalamine</title>
+            <link rel="stylesheet" type="text/css" href="style.css">
+            <script type="module" src="mjs/x-keyboard.js"></script>
+            <script type="module" src="mjs/layout-analyzer.js"></script>
+            <script type="module" src="mjs/stats-canvas.js"></script>
+            <script type="module" src="mjs/stats-table.js"></script>
+            <script type="module" src="mjs/stats.js"></script>
+            <script type="text/javascript" src="demo.js"></script>
+            <script>angle_mod = {"true" if angle_mod else "false"}; </script>
+        </head>
+        <body>
+            <p style="float: right; text-align: right;">
+                <a href="https://github.com/OneDeadKey/kalamine">kalamine</a>
+                v{metadata.version("kalamine")}<br>\U0001f986
+            </p>
+            <dl>
+                <dt>Name</dt>
+                <dd>{layout_ref}</dd>
+                <dt>Locale</dt>
+                <dd>{layout.meta["locale"]}/{layout.meta["variant"]}</dd>
+                <dt>Description</dt>
+                <dd>{layout.meta["description"]}</dd>
+                <dt>Version</dt>
+                <dd>{layout.meta["version"]}</dd>
+            </dl>
+            <input spellcheck="false" placeholder="{layout.meta["name"]}">
+            <x-keyboard src="json"></x-keyboard>
+            <p style="text-align: center;">
+                <a href="json">json</a>
+                | <a href="keylayout">keylayout</a>
+                | <a href="klc">klc</a>
+                | <a href="rc">rc</a>
+                | <a href="c">c</a>
+                | <a href="xkb_keymap">xkb_keymap</a>
+                | <a href="xkb_symbols">xkb_symbols</a>
+                | <a href="svg">svg</a>
+            </p>
+            <div id="sticky-select">
+                <form>
+                    <label for="geometry">geometry</label>
+                    <select id="geometry" {"hidden" if angle_mod else ""}>
+                        <option value="iso">  ISO  </option>
+                        <option value="ansi"> ANSI </option>
+                        <option value="ol60"> ERGO </option>
+                        <option value="ol50"> 4×6  </option>
+                        <option value="ol40"> 3×6  </option>
+                    </select>
+                    <select id="corpus">
+                        <option selected>-</option>
+                        <option>en</option>
+                        <option>en+fr</option>
+                        <option>fr</option>
+                        <option value="fra_mixed-typical_2012_1M-sentences">fr (Leipzig)</option>
+                    </select>
+                    <label for="corpus">corpus</label>
+                </form>
+                <p id="imprecise-data" hidden>
+                    <strong>Warning:</strong> many characters in the selected corpus
+                    are not supported by this layout. Results cannot be trusted.
+                </p>
+            </div>
+            <div id="analyzer" hidden>
+                <section id="load">
+                    <h2>Finger Load</h2>
+                    <small></small>
+                    <stats-canvas></stats-canvas>
+                </section>
+                <section id="sfu">
+                    <h2>Same Finger/Key Usage</h2>
+                    <small>
+                        SFU: <span id="sfu-total"></span> /
+                        SKU: <span id="sku-total"></span>
+                    </small>
+                    <stats-canvas></stats-canvas>
+                </section>
+                <section id="bottlenecks">
+                    <h2>Bottlenecks</h2>
+                    <small>total:
+                        <span id="unsupported-all"></span> /
+                        <span id="sfu-all"></span> /
+                        <span id="extensions-all"></span> /
+                        <span id="scissors-all"></span>
+                    </small>
+                    <stats-table>
+                        <table id="unsupported"    title="unsupported"></table>
+                        <table id="sfu-bigrams"    title="SFU"></table>
+                        <table id="extended-rolls" title="LSB"></table>
+                        <table id="scissors"       title="scissors"></table>
+                    </stats-table>
+                </section>
+                <section id="bigrams">
+                    <h2>Bigrams</h2>
+                    <small>total:
+                        <span id="sku-all"></span> /
+                        <span id="inward-all"></span> /
+                        <span id="outward-all"></span>
+                    </small>
+                    <stats-table>
+                        <table id="sku-bigrams" title="SKU"></table>
+                        <table id="inward"      title="inward rolls"></table>
+                        <table id="outward"     title="outward rolls"></table>
+                    </stats-table>
+                </section>
+                <section id="trigrams">
+                    <h2>Trigrams</h2>
+                    <small>total:
+                        <span id="sks-all"></span> /
+                        <span id="sfs-all"></span> /
+                        <span id="redirect-all"></span> /
+                        <span id="bad-redirect-all"></span>
+                    </small>
+                    <stats-table>
+                        <table id="sks"          title="SKS"></table>
+                        <table id="sfs"          title="SFS"></table>
+                        <table id="redirect"     title="redirects"></table>
+                        <table id="bad-redirect" title="bad redirects"></table>
+                    </stats-table>
+                </section>
+            </div>
+        </body>
+        </html>
+    """
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """Whether an `If-None-Match` request header matches an ETag (weak
+    comparison, as required for this header)."""
+
+    def opaque_tag(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    tags = {opaque_tag(tag) for tag in if_none_match.split(",")}
+    return "*" in tags or opaque_tag(etag) in tags
+
+
+def http_response(
+    response: Response,
+    accept_encoding: str = "",
+    if_none_match: str = "",
+    cache: bool = True,
+) -> Tuple[int, List[Tuple[str, str]], bytes]:
+    """Status, headers and body of a response, compressed if the client accepts
+    it (`Accept-Encoding` request header). Cached responses have an ETag, and
+    are revalidated by the client (`If-None-Match` request header)."""
+
+    body = response.body
+    etag = response.etag
+    encoding = None
+    compressible = response.content_type.startswith(COMPRESSIBLE_TYPES)
+    if compressible and len(body) >= MIN_COMPRESSED_SIZE:
+        encoding = negotiate_encoding(accept_encoding)
+    if encoding:  # one ETag per representation
+        body = compress(body, encoding)
+        etag = f'{etag[:-1]}-{encoding}"'
+    vary = [("Vary", "Accept-Encoding")] if compressible else []
+
+    if cache and etag_matches(etag, if_none_match):
+        return 304, [("ETag", etag), *vary], b""
+
+    headers = [("Content-type", response.content_type)]
+    if cache:  # one is likely working live on it: always revalidate
+        headers += [("Cache-Control", "no-cache"), ("ETag", etag)]
+    else:
+        headers += [("Cache-Control", "no-cache, no-store, must-revalidate")]
+    headers += vary
+    if encoding:
+        headers += [("Content-Encoding", encoding)]
+    headers += [("Content-Length", str(len(body)))]
+    return 200, headers, body
+
+
+def event_message(event: str, data: Dict[str, Any]) -> bytes:
+    """Server-sent event."""
+
+    message = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return message.encode("utf-8")
+
+
+def keyboard_server(
+    file_path: Path, angle_mod: bool = False, cache: Optional[bool] = None
+) -> None:
+    live_layout = LiveLayout(file_path, angle_mod, cache)
+    responses = live_layout.responses
 
     host_name = "localhost"
     webserver_port = 1664
-    lr_server_port = 5500
-
-    def main_page(layout: KeyboardLayout, angle_mod: bool = False) -> str:
-        layout_ref = layout.meta["name"]
-        if "url" in layout.meta:
-            layout_ref = f"""<a href="{layout.meta["url"]}">{layout.meta["name"]}</a>"""
-
-        return f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="utf-8">
-                <title>Kalamine</title>
-                <link rel="stylesheet" type="text/css" href="style.css">
-                <script src="http://{host_name}:{lr_server_port}/livereload.js"></script>
-                <script type="module" src="mjs/x-keyboard.js"></script>
-                <script type="module" src="mjs/layout-analyzer.js"></script>
-                <script type="module" src="mjs/stats-canvas.js"></script>
-                <script type="module" src="mjs/stats-table.js"></script>
-                <script type="module" src="mjs/stats.js"></script>
-                <script type="text/javascript" src="demo.js"></script>
-                <script>angle_mod = {"true" if angle_mod else "false"}; </script>
-            </head>
-            <body>
-                <p style="float: right; text-align: right;">
-                    <a href="https://github.com/OneDeadKey/kalamine">kalamine</a>
-                    v{metadata.version("kalamine")}<br>\U0001f986
-                </p>
-                <dl>
-                    <dt>Name</dt>
-                    <dd>{layout_ref}</dd>
-                    <dt>Locale</dt>
-                    <dd>{layout.meta["locale"]}/{layout.meta["variant"]}</dd>
-                    <dt>Description</dt>
-                    <dd>{layout.meta["description"]}</dd>
-                    <dt>Version</dt>
-                    <dd>{layout.meta["version"]}</dd>
-                </dl>
-                <input spellcheck="false" placeholder="{layout.meta["name"]}">
-                <x-keyboard src="/json"></x-keyboard>
-                <p style="text-align: center;">
-                    <a href="/json">json</a>
-                    | <a href="/keylayout">keylayout</a>
-                    | <a href="/klc">klc</a>
-                    | <a href="/rc">rc</a>
-                    | <a href="/c">c</a>
-                    | <a href="/xkb_keymap">xkb_keymap</a>
-                    | <a href="/xkb_symbols">xkb_symbols</a>
-                    | <a href="/svg">svg</a>
-                </p>
-                <div id="sticky-select">
-                    <form>
-                        <label for="geometry">geometry</label>
-                        <select id="geometry" {"hidden" if angle_mod else ""}>
-                            <option value="iso">  ISO  </option>
-                            <option value="ansi"> ANSI </option>
-                            <option value="ol60"> ERGO </option>
-                            <option value="ol50"> 4×6  </option>
-                            <option value="ol40"> 3×6  </option>
-                        </select>
-                        <select id="corpus">
-                            <option selected>-</option>
-                            <option>en</option>
-                            <option>en+fr</option>
-                            <option>fr</option>
-                            <option value="fra_mixed-typical_2012_1M-sentences">fr (Leipzig)</option>
-                        </select>
-                        <label for="corpus">corpus</label>
-                    </form>
-                    <p id="imprecise-data" hidden>
-                        <strong>Warning:</strong> many characters in the selected corpus
-                        are not supported by this layout. Results cannot be trusted.
-                    </p>
-                </div>
-                <div id="analyzer" hidden>
-                    <section id="load">
-                        <h2>Finger Load</h2>
-                        <small></small>
-                        <stats-canvas></stats-canvas>
-                    </section>
-                    <section id="sfu">
-                        <h2>Same Finger/Key Usage</h2>
-                        <small>
-                            SFU: <span id="sfu-total"></span> /
-                            SKU: <span id="sku-total"></span>
-                        </small>
-                        <stats-canvas></stats-canvas>
-                    </section>
-                    <section id="bottlenecks">
-                        <h2>Bottlenecks</h2>
-                        <small>total:
-                            <span id="unsupported-all"></span> /
-                            <span id="sfu-all"></span> /
-                            <span id="extensions-all"></span> /
-                            <span id="scissors-all"></span>
-                        </small>
-                        <stats-table>
-                            <table id="unsupported"    title="unsupported"></table>
-                            <table id="sfu-bigrams"    title="SFU"></table>
-                            <table id="extended-rolls" title="LSB"></table>
-                            <table id="scissors"       title="scissors"></table>
-                        </stats-table>
-                    </section>
-                    <section id="bigrams">
-                        <h2>Bigrams</h2>
-                        <small>total:
-                            <span id="sku-all"></span> /
-                            <span id="inward-all"></span> /
-                            <span id="outward-all"></span>
-                        </small>
-                        <stats-table>
-                            <table id="sku-bigrams" title="SKU"></table>
-                            <table id="inward"      title="inward rolls"></table>
-                            <table id="outward"     title="outward rolls"></table>
-                        </stats-table>
-                    </section>
-                    <section id="trigrams">
-                        <h2>Trigrams</h2>
-                        <small>total:
-                            <span id="sks-all"></span> /
-                            <span id="sfs-all"></span> /
-                            <span id="redirect-all"></span> /
-                            <span id="bad-redirect-all"></span>
-                        </small>
-                        <stats-table>
-                            <table id="sks"          title="SKS"></table>
-                            <table id="sfs"          title="SFS"></table>
-                            <table id="redirect"     title="redirects"></table>
-                            <table id="bad-redirect" title="bad redirects"></table>
-                        </stats-table>
-                    </section>
-                </div>
-            </body>
-            </html>
-        """
+    keepalive = 15  # seconds between two comments on idle event streams
+    stop_watching = threading.Event()
 
     class LayoutHandler(SimpleHTTPRequestHandler):
         def __init__(self, *args, **kwargs) -> None:  # type: ignore
-            kwargs["directory"] = str(Path(__file__).parent / "www")
+            kwargs["directory"] = str(WWW_DIR)
             super().__init__(*args, **kwargs)
 
+        def send(self, response: Response, cache: bool = True) -> None:
+            status, headers, body = http_response(
+                response,
+                self.headers.get("Accept-Encoding", ""),
+                self.headers.get("If-None-Match", ""),
+                cache,
+            )
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_event(self, event: str, data: Dict[str, Any]) -> None:
+            self.wfile.write(event_message(event, data))
+            self.wfile.flush()
+
+        def send_events(self) -> None:
+            """Server-sent events: the current revision of the layout, then a
+            patch for each change."""
+
+            self.send_response(200)
+            self.send_header("Content-type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            revision = responses.revision
+            try:
+                self.send_event("layout", {"revision": revision})
+                while not stop_watching.is_set():
+                    patches = live_layout.patches(revision, keepalive)
+                    if patches is None:  # missed too many changes
+                        revision = responses.revision
+                        self.send_event("layout", {"revision": revision})
+                    elif not patches:
+                        self.wfile.write(b": keepalive\n\n")
+                        self.wfile.flush()
+                    for patch in patches or []:
+                        self.send_event("patch", patch)
+                        revision = patch["revision"]
+            except (BrokenPipeError, ConnectionResetError):  # page closed
+                pass
+
         def do_GET(self) -> None:
-            def send(
-                page: str, content: str = "text/plain", charset: str = "utf-8"
-            ) -> None:
-                self.send_response(200)
-                self.send_header("Content-type", f"{content}; charset={charset}")
-                # no cash as one is likely working live on it
-                self.send_header("Cache-Control", "no-cache, no-store, must-revalidate")
-                self.send_header("Pragma", "no-cache")
-                self.send_header("Expires", "0")
-                self.end_headers()
-                self.wfile.write(bytes(page, charset))
-                # self.wfile.write(page.encode(charset))
-
-            # XXX always reloads the layout on the root page, never in sub pages
-            nonlocal kb_layout
-            nonlocal angle_mod
             parsed = urlparse(self.path)
             path = parsed.path
             params = parse_qs(parsed.query)
             geometry_override = params.get("geometry", [None])[0]
 
-            if path == "/json":
-                send(web.pretty_json(kb_layout), content="application/json")
-            elif path == "/keylayout":
-                # send(keylayout.keylayout(kb_layout), content='application/xml')
-                send(keylayout.keylayout(kb_layout))
-            elif path == "/ahk":
-                send(ahk.ahk(kb_layout))
-            elif path == "/klc":
-                send(klc.klc(kb_layout), charset="utf-16-le", content="text")
-            elif path == "/rc":
-                send(klc.klc_rc(kb_layout), content="text")
-            elif path == "/c":
-                send(klc.klc_c(kb_layout), content="text")
-            elif path == "/xkb_keymap":
-                send(xkb.xkb_keymap(kb_layout))
-            elif path == "/xkb_symbols":
-                send(xkb.xkb_symbols(kb_layout))
-            elif path == "/svg":
-                utf8 = ET.tostring(
-                    web.svg(kb_layout, geometry_override).getroot(),
-                    encoding="unicode",
-                )
-                send(utf8, content="image/svg+xml")
+            if path in ENDPOINTS or path == "/svg":
+                key = output_key(path, geometry_override)
+                self.send(responses.get(key, output_renderer(path, geometry_override)))
+            elif path == "/events":
+                self.send_events()
             elif path == "/":
-                kb_layout = KeyboardLayout(load_layout(file_path), angle_mod)  # refresh
-                send(main_page(kb_layout, angle_mod), content="text/html")
-            else:
-                SimpleHTTPRequestHandler.do_GET(self)
+                page = responses.get(
+                    "/",
+                    lambda layout: Response.render(
+                        main_page(layout, angle_mod), "text/html", "utf-8"
+                    ),
+                )
+                self.send(page, cache=False)
+            else:  # static files
+                file_path = Path(self.translate_path(self.path))
+                static = None
+                if file_path.is_file():
+                    static = static_response(file_path, self.guess_type(str(file_path)))
+                if static:
+                    self.send(static)
+                else:
+                    SimpleHTTPRequestHandler.do_GET(self)
 
-    webserver = HTTPServer((host_name, webserver_port), LayoutHandler)
+    webserver = ThreadingHTTPServer((host_name, webserver_port), LayoutHandler)
     thread = threading.Thread(None, webserver.serve_forever)
 
     try:
@@ -219,15 +610,12 @@ def keyboard_server(file_path: Path, angle_mod: bool = False) -> None:
         print(f"Server started: {url}")
         print("Hit Ctrl-C to stop.")
         webbrowser.open(url)
-
-        # livereload
-        lr_server = Server()
-        lr_server.watch(str(file_path))
-        lr_server.serve(host=host_name, port=lr_server_port)
+        live_layout.watch(stop_watching)
 
     except KeyboardInterrupt:
         pass
 
+    stop_watching.set()
     webserver.shutdown()
     webserver.server_close()
     thread.join()
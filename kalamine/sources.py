@@ -0,0 +1,29 @@
+"""
+Fingerprint of the kalamine sources, so that the layout cache and the build
+manifests are invalidated when the parser or the generators change.
+"""
+
+import hashlib
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).parent
+
+# files that the parser and the generators depend on (not the `www` assets)
+SOURCES = ["*.py", "generators/*.py", "templates/*", "data/*"]
+
+
+@lru_cache(maxsize=None)
+def sources_digest() -> str:
+    """Hash of the kalamine version and of the `SOURCES` files (code,
+    templates, data), so that a development checkout does not reuse layouts
+    or outputs generated by an older version of itself."""
+
+    digest = hashlib.sha256(metadata.version("kalamine").encode("utf-8"))
+    paths = {path for pattern in SOURCES for path in PACKAGE_DIR.glob(pattern)}
+    for path in sorted(paths):
+        if path.is_file():
+            digest.update(str(path.relative_to(PACKAGE_DIR)).encode("utf-8") + b"\0")
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
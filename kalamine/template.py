@@ -1,51 +1,153 @@
-import datetime
+import io
 import pkgutil
 import re
-from typing import TYPE_CHECKING, List
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Union,
+)
 
-from .utils import lines_to_text, load_data
+from .utils import BuildStamp
 
 if TYPE_CHECKING:
     from .layout import KeyboardLayout
 
 
-SCAN_CODES = load_data("scan_codes")
+# template placeholders:
+#   KALAMINE::NAME    the whole line is replaced by a list of lines (indented)
+#   ${name=default}   replaced by a string value
+LINES_SLOT = re.compile(r"KALAMINE::(\w+)")
+TOKEN_SLOT = re.compile(r"\$\{(\w+)(=[^\}]*)?\}")
 
+Context = Mapping[str, Union[str, List[str]]]
 
-def substitute_lines(text: str, variable: str, lines: List[str]) -> str:
-    prefix = "KALAMINE::"
-    exp = re.compile(".*" + prefix + variable + ".*")
 
-    indent = ""
-    for line in text.split("\n"):
-        m = exp.match(line)
-        if m:
-            indent = m.group().split(prefix)[0]
-            break
+class Sink(Protocol):
+    """Where generators write their output: a text file, a StringIO..."""
 
-    return exp.sub(lines_to_text(lines, indent), text)
+    def write(self, text: str, /) -> int: ...
 
 
-def substitute_token(text: str, token: str, value: str) -> str:
-    exp = re.compile("\\$\\{" + token + "(=[^\\}]*){0,1}\\}")
-    return exp.sub(value, text)
+class LinesSlot(NamedTuple):
+    name: str
+    indent: str
+    text: str  # kept as is if there is no value for this slot
 
 
-def load_tpl(layout: "KeyboardLayout", ext: str, tpl: str = "base") -> str:
-    date = datetime.date.today().isoformat()
+class TokenSlot(NamedTuple):
+    name: str
+    text: str  # kept as is if there is no value for this slot
+
+
+Segment = Union[str, LinesSlot, TokenSlot]
+
+
+class Template:
+    """A template, parsed once into literal chunks and placeholders."""
+
+    def __init__(self, text: str) -> None:
+        segments: List[Segment] = []
+        indents: Dict[str, str] = {}
+        literal = ""
+        for i, line in enumerate(text.split("\n")):
+            if i:
+                literal += "\n"
+            match = LINES_SLOT.search(line)
+            if match:
+                name = match.group(1)
+                indent = indents.setdefault(name, line[: match.start()])
+                segments += [literal, LinesSlot(name, indent, line)]
+                literal = ""
+                continue
+            pos = 0
+            for match in TOKEN_SLOT.finditer(line):
+                literal += line[pos : match.start()]
+                segments += [literal, TokenSlot(match.group(1), match.group())]
+                literal = ""
+                pos = match.end()
+            literal += line[pos:]
+        segments.append(literal)
+
+        self.segments = tuple(segment for segment in segments if segment)
+        self.names = frozenset(
+            segment.name for segment in self.segments if not isinstance(segment, str)
+        )
+
+    def write(self, context: Context, file: Sink) -> None:
+        """Fill all placeholders in a single pass, writing chunk by chunk."""
+
+        for segment in self.segments:
+            if isinstance(segment, str):
+                file.write(segment)
+                continue
+            value = context.get(segment.name)
+            if isinstance(segment, LinesSlot) and isinstance(value, list):
+                for i, line in enumerate(value):
+                    if i:
+                        file.write("\n")
+                    if line:
+                        file.write(segment.indent + line)
+            elif isinstance(segment, TokenSlot) and isinstance(value, str):
+                file.write(value)
+            else:
+                file.write(segment.text)
+
+    def render(self, context: Context) -> str:
+        """Fill all placeholders in a single pass."""
+
+        buffer = io.StringIO()
+        self.write(context, buffer)
+        return buffer.getvalue()
+
+
+@lru_cache(maxsize=None)
+def get_template(filename: str) -> Template:
+    """Parsed `kalamine/templates/<filename>` (cached)."""
+
+    bin = pkgutil.get_data(__package__, f"templates/{filename}")
+    return Template(bin.decode("utf-8") if bin else "")
+
+
+def write_tpl(
+    file: Sink,
+    layout: "KeyboardLayout",
+    ext: str,
+    tpl: str = "base",
+    context: Optional[Context] = None,
+) -> None:
+    """Render the template of a given output format into a file-like object,
+    filling its placeholders with the layout geometry, the layout metadata and
+    the `context` values."""
+
     if tpl == "base":
         if layout.has_altgr or ext.startswith(".RC"):
             tpl = "full"
             if layout.has_1dk and ext.startswith(".xkb"):
                 tpl = "full_1dk"
-    bin = pkgutil.get_data(__package__, f"templates/{tpl}{ext}")
-    if bin is None:
-        return ""
-    out = bin.decode("utf-8")
-    out = substitute_lines(out, "GEOMETRY_base", layout.base)
-    out = substitute_lines(out, "GEOMETRY_full", layout.full)
-    out = substitute_lines(out, "GEOMETRY_altgr", layout.altgr)
-    out = substitute_token(out, "KALAMINE", f"Generated by kalamine on {date}")
-    for key, value in layout.meta.items():
-        out = substitute_token(out, key, value)
-    return out
+    template = get_template(f"{tpl}{ext}")
+
+    values: Dict[str, Union[str, List[str]]] = {}
+    for geometry in ["base", "full", "altgr"]:
+        if f"GEOMETRY_{geometry}" in template.names:
+            values[f"GEOMETRY_{geometry}"] = getattr(layout, geometry)
+    values["KALAMINE"] = (layout.stamp or BuildStamp.from_env()).mark
+    values.update(layout.meta)
+    values.update(context or {})
+    template.write(values, file)
+
+
+def render(
+    write: Callable[["KeyboardLayout", Sink], None], layout: "KeyboardLayout"
+) -> str:
+    """Output of a `write_*` generator function, as a string."""
+
+    buffer = io.StringIO()
+    write(layout, buffer)
+    return buffer.getvalue()
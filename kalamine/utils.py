@@ -1,9 +1,15 @@
+import datetime
 import pkgutil
 from dataclasses import dataclass
 from enum import IntEnum
-from typing import Dict, List, Optional
+from os import environ
+from pathlib import Path
+from typing import Dict, List, Mapping, NamedTuple, Optional
 
-import yaml
+try:
+    from . import data_tables
+except ImportError:  # not generated yet, see `kalamine.freeze`
+    data_tables = None  # type: ignore
 
 
 def hex_ord(char: str) -> str:
@@ -17,12 +23,7 @@ def lines_to_text(lines: List[str], indent: str = "") -> str:
     Example: lines_to_text(["one", "two", "three"], "  ") returns
     '  one\n  two\n  three'
     """
-    out = ""
-    for line in lines:
-        if len(line):
-            out += indent + line
-        out += "\n"
-    return out[:-1]
+    return "\n".join(indent + line if len(line) else "" for line in lines)
 
 
 def text_to_lines(text: str) -> List[str]:
@@ -30,13 +31,86 @@ def text_to_lines(text: str) -> List[str]:
     return text.split("\n")
 
 
-def load_data(filename: str) -> Dict:
+class BuildStamp(NamedTuple):
+    """Date settings of a build: reproducible builds are not stamped with the
+    build date, unless a SOURCE_DATE_EPOCH is given."""
+
+    reproducible: bool = False
+    epoch: Optional[int] = None
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str] = environ) -> "BuildStamp":
+        """Settings of the SOURCE_DATE_EPOCH and KALAMINE_REPRODUCIBLE
+        environment variables (`kalamine build --reproducible`)."""
+        epoch = env.get("SOURCE_DATE_EPOCH")
+        flag = env.get("KALAMINE_REPRODUCIBLE", "0")
+        return cls(
+            reproducible=bool(epoch) or flag.lower() not in ["", "0", "false", "no"],
+            epoch=int(epoch) if epoch else None,
+        )
+
+    @property
+    def date(self) -> Optional[datetime.date]:
+        """Date of the generated files: the epoch if set, today if the build is
+        not reproducible, or None."""
+        if self.epoch is not None:
+            timestamp = datetime.datetime.fromtimestamp(
+                self.epoch, datetime.timezone.utc
+            )
+            return timestamp.date()
+        return None if self.reproducible else datetime.date.today()
+
+    @property
+    def mark(self) -> str:
+        """Stamp of the generated files."""
+        date = self.date
+        if date is None:
+            return "Generated by kalamine"
+        return f"Generated by kalamine on {date.isoformat()}"
+
+
+def kalamine_mark() -> str:
+    """Stamp of the generated files, without a date in reproducible builds
+    (unless SOURCE_DATE_EPOCH is set)."""
+    return BuildStamp.from_env().mark
+
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+def load_yaml_data(filename: str) -> Dict:
+    """Parse a `data/*.yaml` file."""
+
+    import yaml
+
     descriptor = pkgutil.get_data(__package__, f"data/{filename}.yaml")
     if not descriptor:
         return {}
     return yaml.safe_load(descriptor.decode("utf-8"))
 
 
+def _is_frozen(filename: str) -> bool:
+    """True if the `data_tables` snapshot of a data file is up to date."""
+
+    if data_tables is None or filename not in data_tables.TABLES:
+        return False
+    try:
+        source = (DATA_DIR / f"{filename}.yaml").stat().st_mtime
+        frozen = Path(data_tables.__file__).stat().st_mtime
+    except OSError:
+        return True
+    return source <= frozen
+
+
+def load_data(filename: str) -> Dict:
+    """Load a `data/*.yaml` file, from its frozen copy if it is up to date.
+    Each call returns a new object, which the caller can modify."""
+
+    if _is_frozen(filename):
+        return data_tables.TABLES[filename]()
+    return load_yaml_data(filename)
+
+
 class Layer(IntEnum):
     """A layer designation."""
 
@@ -0,0 +1,201 @@
+"""
+Incremental builds of layout descriptors, as they are edited.
+
+Descriptors (and their `extends` parents) are polled for changes. A changed
+descriptor is parsed again, and compared to its previous state: if the parsed
+layout is the same (e.g. only a comment has changed), there is nothing to do.
+Otherwise, each output is rendered in memory and written only if its contents
+differ from the existing file, so that unchanged outputs keep their mtime.
+"""
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import click
+
+from .build import BuildJob, output_path
+from .manifest import Manifest
+from .outputs import OUTPUT_FORMATS, OutputWarning, output_bytes
+
+FileState = Optional[Tuple[int, int, str]]  # mtime, size, hash (None if missing)
+
+
+class FileWatcher:
+    """Polls files for changes. The file contents are hashed when their mtime
+    or size changes, so that saving a file without changing it is ignored."""
+
+    def __init__(self, paths: Iterable[Path] = ()) -> None:
+        self._states: Dict[Path, FileState] = {}
+        self.watch(paths)
+
+    def watch(self, paths: Iterable[Path]) -> None:
+        """Set the watched files, keeping the state of the already watched ones."""
+
+        self._states = {
+            path: self._states[path] if path in self._states else self._state(path)
+            for path in paths
+        }
+
+    @staticmethod
+    def _state(path: Path, previous: FileState = None) -> FileState:
+        try:
+            stat = path.stat()
+            if previous and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+                return previous
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        except OSError:  # missing file, or being replaced
+            return None
+        return stat.st_mtime_ns, stat.st_size, digest
+
+    def changes(self) -> Set[Path]:
+        """Files whose contents have changed since the previous call."""
+
+        changed = set()
+        for path, previous in self._states.items():
+            state = self._state(path, previous)
+            if (state and state[2]) != (previous and previous[2]):
+                changed.add(path)
+            self._states[path] = state
+        return changed
+
+    def wait(self, interval: float = 0.2, debounce: float = 0.1) -> Set[Path]:
+        """Wait for changes, until the files have not changed for `debounce`
+        seconds (editors often write a file in several steps)."""
+
+        changed: Set[Path] = set()
+        while not changed:
+            time.sleep(interval)
+            changed = self.changes()
+        return self.settle(changed, debounce)
+
+    def settle(self, changed: Set[Path], debounce: float = 0.1) -> Set[Path]:
+        """Wait until the files have not changed for `debounce` seconds, and
+        return all changes, including the `changed` files."""
+
+        while True:
+            time.sleep(debounce)
+            new_changes = self.changes()
+            if not new_changes:
+                return changed
+            changed |= new_changes
+
+
+class IncrementalBuild:
+    """Build state of a layout descriptor: its parsed layout, and its parent."""
+
+    def __init__(self, job: BuildJob) -> None:
+        if job.matrix:
+            raise ValueError("incremental builds do not support build matrices")
+        self._job = job
+        self._snapshot: Optional[Dict] = None
+        self._parent: Optional[Path] = None
+
+    @property
+    def job(self) -> BuildJob:
+        return self._job
+
+    @property
+    def files(self) -> List[Path]:
+        """Descriptor files: the layout, and its `extends` parent (if any)."""
+
+        if self._parent is None:
+            return [self._job.input_file]
+        return [self._job.input_file, self._parent]
+
+    def build(self) -> Optional[List[Path]]:
+        """Parse the layout again, and write the outputs that have changed.
+        Returns the outputs (written or not), or None on errors: they are
+        reported, so that a half-saved descriptor does not stop the watcher."""
+
+        try:
+            return self._build()
+        except SystemExit:  # `load_layout` has already reported the error
+            return None
+        except Exception as exc:  # noqa: BLE001 -- reported, the watcher goes on
+            click.echo(f"Error: {exc!r}", err=True)
+            return None
+
+    def _build(self) -> List[Path]:
+        from .cache import parse_layout
+
+        job = self._job
+        layout = parse_layout(
+            job.input_file, job.angle_mod, job.qwerty_shortcuts, job.cache
+        )
+        self._parent = None
+        if "extends" in layout.meta:
+            self._parent = job.input_file.parent / layout.meta["extends"]
+
+        if job.out == "all":
+            paths = [
+                job.output_dir / (layout.meta["fileName"] + ext)
+                for ext in OUTPUT_FORMATS
+            ]
+        else:
+            output_file = output_path(job.input_file, job.out)
+            assert output_file is not None, "unsupported output format"
+            paths = [output_file]
+
+        snapshot = layout.snapshot()
+        if snapshot == self._snapshot and all(path.exists() for path in paths):
+            click.echo(f"... {job.input_file}: no layout change")
+            return paths
+
+        written = 0
+        for path in paths:
+            try:
+                data = output_bytes(layout, path.suffix)
+            except OutputWarning as warning:
+                click.echo(str(warning))
+                data = b""
+            if path.exists() and path.read_bytes() == data:
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            click.echo(f"... {path}")
+            written += 1
+        if not written:
+            click.echo(f"... {job.input_file}: no output change")
+        self._snapshot = snapshot
+        return paths
+
+
+def watch_layouts(jobs: List[BuildJob], interval: float = 0.2) -> None:
+    """Build layout descriptors, then rebuild them whenever they change (or
+    their `extends` parent does), until interrupted."""
+
+    builds = [IncrementalBuild(job) for job in jobs]
+    watcher = FileWatcher(job.input_file for job in jobs)
+
+    def rebuild(changed_builds: List[IncrementalBuild]) -> None:
+        manifests: Dict[Path, Manifest] = {}
+        for build in changed_builds:
+            job = build.job
+            paths = build.build()
+            if not job.manifest_dir:
+                continue
+            manifest = manifests.setdefault(
+                job.manifest_dir, Manifest(job.manifest_dir)
+            )
+            if paths is None:
+                manifest.remove(job.input_file)
+            else:
+                parent = build.files[1] if len(build.files) > 1 else None
+                manifest.update(job.input_file, job.flags, paths, parent)
+        for manifest in manifests.values():
+            try:
+                manifest.save()
+            except OSError as exc:  # read-only output directory, etc.
+                click.echo(f"Warning: {exc}", err=True)
+        watcher.watch({path for build in builds for path in build.files})
+
+    rebuild(builds)
+    click.echo(f"Watching {len(builds)} layout(s). Hit Ctrl-C to stop.")
+    try:
+        while True:
+            changed = watcher.wait(interval)
+            rebuild([build for build in builds if changed & set(build.files)])
+    except KeyboardInterrupt:
+        pass
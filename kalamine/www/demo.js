@@ -4,14 +4,14 @@ window.addEventListener('DOMContentLoaded', () => {
   const keyboard = document.querySelector('x-keyboard');
   const input    = document.querySelector('input');
   const geometry = document.querySelector('#geometry');
-  const svgLink  = document.querySelector('a[href="/svg"]');
+  const svgLink  = document.querySelector('a[href="svg"]');
 
   const updateSvgHref = (geom) => {
     if (!svgLink || !geometry) {
       return;
     }
     const value = geom || geometry.value;
-    svgLink.href = value ? `/svg?geometry=${encodeURIComponent(value)}` : '/svg';
+    svgLink.href = value ? `svg?geometry=${encodeURIComponent(value)}` : 'svg';
   };
 
   if (!keyboard.layout) {
@@ -19,7 +19,7 @@ window.addEventListener('DOMContentLoaded', () => {
     return; // the web component has not been loaded
   }
 
-  fetch(keyboard.getAttribute('src'))
+  const loadLayout = () => fetch(keyboard.getAttribute('src'))
     .then(response => response.json())
     .then(data => {
       const shape = angle_mod ? "iso" : data.geometry.replace('ergo', 'ol60').toLowerCase();
@@ -32,6 +32,33 @@ window.addEventListener('DOMContentLoaded', () => {
       geometry.value = shape;
       updateSvgHref(shape);
     });
+  loadLayout();
+
+  /**
+   * Live updates: the server pushes the changes of the layout descriptor,
+   * which are applied in place (the text input and the stats are kept).
+   */
+
+  let revision;
+  const events = new EventSource('events');
+  events.addEventListener('layout', (event) => { // on every (re)connection
+    const current = JSON.parse(event.data).revision;
+    if (revision !== undefined && revision !== current) {
+      loadLayout();
+    }
+    revision = current;
+  });
+  events.addEventListener('patch', (event) => {
+    const patch = JSON.parse(event.data);
+    if (patch.reload) {
+      window.location.reload();
+    } else if (patch.revision === revision + 1) {
+      keyboard.patchKeyboardLayout(patch);
+    } else { // missed a patch
+      loadLayout();
+    }
+    revision = patch.revision;
+  });
 
   geometry.onchange = (event) => {
     keyboard.geometry = event.target.value;
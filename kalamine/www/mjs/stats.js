@@ -82,6 +82,13 @@ window.addEventListener('DOMContentLoaded', () => {
     showNGrams(report.ngrams);
   };
 
+  // the layout can be updated live by the server
+  keyboard.addEventListener('layoutchange', () => {
+    if (!document.getElementById('analyzer').hidden) {
+      showReport();
+    }
+  });
+
   document
     .getElementById('corpus')
     .addEventListener('change', event => {
@@ -1209,6 +1209,7 @@ class Keyboard extends HTMLElement {
     Array.from(this.root.querySelectorAll('.key')).forEach(key =>
       drawKey(key, value.keyMap, value.keyLegends),
     );
+    this.dispatchEvent(new CustomEvent('layoutchange'));
   }
 
   get fingerAssignments() {
@@ -1226,6 +1227,43 @@ class Keyboard extends HTMLElement {
     this.layout = newKeyboardLayout(keyMap, deadKeys, geometry, legends);
   }
 
+  /**
+   * Apply a partial update of the layout: `keymap`, `deadkeys` and `legends`
+   * hold the changed entries only, `null` meaning a removed entry. Only the
+   * changed keys are drawn again.
+   */
+  patchKeyboardLayout({ keymap = {}, deadkeys = {}, legends = {} }) {
+    const patch = (dict, changes) => {
+      const result = { ...dict };
+      Object.entries(changes).forEach(([id, value]) => {
+        if (value === null) {
+          delete result[id];
+        } else {
+          result[id] = value;
+        }
+      });
+      return result;
+    };
+    const { keyMap, deadKeys, keyLegends, geometry } = this.layout;
+    const layout = newKeyboardLayout(
+      patch(keyMap, keymap),
+      patch(deadKeys, deadkeys),
+      geometry,
+      patch(keyLegends, legends),
+    );
+    layout.platform = this.platform;
+    this._state.layout = layout;
+    new Set([...Object.keys(keymap), ...Object.keys(legends)]).forEach(id => {
+      const key = this.root.getElementById(id);
+      if (key) {
+        key.querySelectorAll('.key').forEach(element =>
+          drawKey(element, layout.keyMap, layout.keyLegends),
+        );
+      }
+    });
+    this.dispatchEvent(new CustomEvent('layoutchange'));
+  }
+
   get keys() { // XXX return IDs only and rely on setCustom{Colors,Opacity}?
     return Array
       .from(this.root.querySelectorAll('[id]'))
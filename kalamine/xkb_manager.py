@@ -3,7 +3,6 @@ Helper to list, add and remove keyboard layouts from XKB config.
 This MUST remain dependency-free in order to be usable as a standalone installer.
 """
 
-import datetime
 import re
 import sys
 import traceback
@@ -15,6 +14,7 @@ from xml.etree import ElementTree as ET
 
 from .generators import xkb
 from .layout import KeyboardLayout
+from .utils import kalamine_mark
 
 
 def xdg_config_home() -> Path:
@@ -36,13 +36,15 @@ XKB_ROOT = Path(environ.get("XKB_CONFIG_ROOT") or "/usr/share/X11/xkb/")
 
 WAYLAND = wayland_running()
 
-KALAMINE_MARK = f"Generated by kalamine on {datetime.date.today().isoformat()}"
-XKB_RULES_HEADER = f"""\
+
+def xkb_rules_header() -> str:
+    return f"""\
 <?xml version="1.0" encoding="UTF-8"?>
 <!DOCTYPE xkbConfigRegistry SYSTEM "xkb.dtd">
-<!-- {KALAMINE_MARK} -->
+<!-- {kalamine_mark()} -->
 """
 
+
 LayoutName = str
 LocaleName = str
 KbdVariant = Dict[LayoutName, Optional[KeyboardLayout]]
@@ -139,7 +141,7 @@ class XKBManager:
                 rules.write_text(
                     dedent(
                         f"""\
-                        // {KALAMINE_MARK}
+                        // {kalamine_mark()}
                         // Include the system '{ruleset}' file
                         ! include %S/{ruleset}
                         """
@@ -149,7 +151,7 @@ class XKBManager:
             xmlpath = XKB_HOME / "rules" / f"{ruleset}.xml"
             if not xmlpath.exists():
                 xmlpath.write_text(
-                    XKB_RULES_HEADER
+                    xkb_rules_header()
                     + dedent(
                         """\
                         <xkbConfigRegistry version="1.1">
@@ -301,7 +303,7 @@ def update_symbols(xkb_root: Path, kbd_index: KbdIndex) -> None:
         path = xkb_root / "symbols" / locale
         if not path.exists():
             with path.open("w") as file:
-                file.write("// {KALAMINE_MARK}")
+                file.write(f"// {kalamine_mark()}")
                 file.close()
 
         try:
@@ -400,7 +402,7 @@ def update_rules(xkb_root: Path, kbd_index: KbdIndex) -> None:
                 ET.indent(tree)
 
             with filepath.open("w") as file:
-                file.write(XKB_RULES_HEADER)
+                file.write(xkb_rules_header())
                 file.write(ET.tostring(tree.getroot(), encoding="unicode"))
                 file.close()
 
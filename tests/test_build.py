@@ -0,0 +1,283 @@
+import datetime
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Tuple
+
+import pytest
+
+from kalamine import build as build_module
+from kalamine import utils
+from kalamine.build import (
+    MATRIX,
+    BuildJob,
+    build_all,
+    build_archive,
+    build_layouts,
+    build_matrix,
+)
+from kalamine.manifest import MANIFEST_NAME
+from kalamine.outputs import OUTPUT_FORMATS
+
+from .util import get_layout_dict
+
+LAYOUTS = Path(__file__).parent.parent / "layouts"
+
+
+@pytest.mark.parametrize(
+    "threads, processes", [(4, False), (4, True)], ids=["threads", "fork"]
+)
+def test_concurrent_build_all(tmp_path, capsys, threads, processes):
+    from kalamine.layout import KeyboardLayout
+
+    layout = KeyboardLayout(get_layout_dict("intl"))
+    build_all(layout, tmp_path / "sequential")
+    sequential = capsys.readouterr().out
+    build_all(layout, tmp_path / "concurrent", threads, processes)
+    concurrent = capsys.readouterr().out
+
+    # same files, logged in the same order
+    assert concurrent == sequential.replace("/sequential/", "/concurrent/")
+    for path in (tmp_path / "sequential").iterdir():
+        assert (tmp_path / "concurrent" / path.name).read_bytes() == path.read_bytes()
+
+
+@pytest.mark.parametrize("names", [["intl"], ["intl", "prog"]], ids=["fork", "pool"])
+def test_build_layouts_threads(tmp_path, capsys, monkeypatch, names):
+    monkeypatch.chdir(tmp_path)
+    jobs = [BuildJob(LAYOUTS / f"{name}.toml") for name in names]
+    assert build_layouts(jobs) == []
+    sequential = capsys.readouterr().out
+    outputs = {path: path.read_bytes() for path in Path("dist").iterdir()}
+
+    # spare processes: the outputs of each layout are written concurrently
+    assert build_layouts(jobs, processes=4, force=True) == []
+    assert capsys.readouterr().out == sequential
+    for path, data in outputs.items():
+        assert path.read_bytes() == data
+
+    # logged in `OUTPUT_FORMATS` order
+    written = [line for line in sequential.splitlines() if line.startswith("...")]
+    assert [Path(line).suffix for line in written] == list(OUTPUT_FORMATS) * len(names)
+
+    # no worker process from another thread than the main one (`kalamine daemon`)
+    pools = []
+
+    def build_jobs(jobs, processes, threads=1):
+        pools.append((processes, threads))
+        return _build_jobs(jobs, processes, threads)
+
+    _build_jobs = build_module._build_jobs
+    monkeypatch.setattr(build_module, "_build_jobs", build_jobs)
+    with ThreadPoolExecutor(1) as executor:
+        assert executor.submit(build_layouts, jobs, 4, True).result() == []
+    assert capsys.readouterr().out == sequential
+    assert pools == [(1, 4)]
+
+
+def test_incremental_build(tmp_path, capsys, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    parent = tmp_path / "parent.toml"
+    child = tmp_path / "child.toml"
+    parent.write_bytes((LAYOUTS / "ansi.toml").read_bytes())
+    child.write_text('extends = "parent.toml"\nname = "child"\n')
+    jobs = [BuildJob(child, "all"), BuildJob(child, "svg")]
+
+    def built(force: bool = False) -> str:
+        assert build_layouts(jobs, force=force) == []
+        return capsys.readouterr().out
+
+    assert "up to date" not in built()
+    assert built().count("up to date") == 1  # single-file outputs are not tracked
+    assert not (tmp_path / MANIFEST_NAME).exists()
+    assert "up to date" not in built(force=True)
+
+    # the descriptor, its parent or one of its outputs has changed
+    child.write_text('extends = "parent.toml"\nname = "child2"\n')
+    assert built().count("up to date") == 0
+    parent.write_bytes(parent.read_bytes().replace(b"ANSI", b"ISO"))
+    assert built().count("up to date") == 0
+    assert built().count("up to date") == 1
+    (tmp_path / "dist" / "q-ansi.svg").unlink()
+    assert built().count("up to date") == 0
+
+
+class FakeDate(datetime.date):
+    """`datetime.date`, with a `today` that can be moved forward."""
+
+    days = 0
+
+    @classmethod
+    def today(cls) -> datetime.date:
+        return datetime.date(2024, 1, 31) + datetime.timedelta(days=cls.days)
+
+
+def build_on_two_days(monkeypatch, tmp_path) -> Tuple[Path, Path]:
+    from kalamine.layout import KeyboardLayout, load_layout
+
+    fake_datetime = SimpleNamespace(**{**vars(datetime), "date": FakeDate})
+    monkeypatch.setattr(utils, "datetime", fake_datetime)
+    for day in [0, 1]:
+        FakeDate.days = day
+        for descriptor in sorted(LAYOUTS.glob("*.toml")):
+            layout = KeyboardLayout(load_layout(descriptor))
+            build_all(layout, tmp_path / str(day))
+    return tmp_path / "0", tmp_path / "1"
+
+
+def test_reproducible_build(tmp_path, capsys, monkeypatch):
+    monkeypatch.setenv("KALAMINE_REPRODUCIBLE", "1")
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    day0, day1 = build_on_two_days(monkeypatch, tmp_path)
+    assert len(list(day0.iterdir())) == 7 * len(list(LAYOUTS.glob("*.toml")))
+    for path in day0.iterdir():
+        assert (day1 / path.name).read_bytes() == path.read_bytes(), path.name
+
+
+def test_build_date(tmp_path, capsys, monkeypatch):
+    monkeypatch.delenv("KALAMINE_REPRODUCIBLE", raising=False)
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    day0, day1 = build_on_two_days(monkeypatch, tmp_path)
+    text = (day1 / "q-intl.xkb_symbols").read_text()
+    assert "Generated by kalamine on 2024-02-01" in text
+    assert (day0 / "q-intl.xkb_symbols").read_text() != text
+
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    assert utils.kalamine_mark() == "Generated by kalamine on 2023-11-14"
+
+
+def test_build_stamp():
+    stamp = utils.BuildStamp.from_env({"SOURCE_DATE_EPOCH": "1700000000"})
+    assert stamp == utils.BuildStamp(reproducible=True, epoch=1700000000)
+    assert stamp.date == datetime.date(2023, 11, 14)
+    assert utils.BuildStamp.from_env({"KALAMINE_REPRODUCIBLE": "1"}).date is None
+    assert utils.BuildStamp(reproducible=True).mark == "Generated by kalamine"
+    assert not utils.BuildStamp.from_env({"KALAMINE_REPRODUCIBLE": "no"}).reproducible
+    assert utils.BuildStamp.from_env({}).date == datetime.date.today()
+
+
+def test_build_matrix(tmp_path, capsys):
+    from kalamine.layout import KeyboardLayout
+
+    descriptor = get_layout_dict("intl")
+    layout = KeyboardLayout(descriptor)
+    files = build_matrix(layout, tmp_path / "matrix", svg_geometries=["jis"])
+    assert len(files) == len(MATRIX) * 8
+    assert (tmp_path / "matrix" / "angle_mod+qwerty_shortcuts").is_dir()
+
+    # same outputs as a build from scratch with the variant flags
+    for variant in MATRIX:
+        reference = KeyboardLayout(descriptor, *variant)
+        build_all(reference, tmp_path / variant.name)
+        for path in (tmp_path / variant.name).iterdir():
+            built = tmp_path / "matrix" / variant.name / path.name
+            assert built.read_bytes() == path.read_bytes()
+
+    svg = (tmp_path / "matrix" / "default" / "q-intl.jis.svg").read_text()
+    assert 'class="iso intlYen intlRo jis' in svg
+
+
+def test_build_artifacts(tmp_path, capsys):
+    from kalamine import build_artifacts
+    from kalamine.layout import KeyboardLayout
+
+    descriptor = get_layout_dict("intl")
+    build_all(KeyboardLayout(descriptor, angle_mod=True), tmp_path)
+    artifacts = build_artifacts(descriptor, flags=["angle_mod"])
+    assert list(artifacts) == list(OUTPUT_FORMATS)
+    for ext, data in artifacts.items():
+        assert data == (tmp_path / f"q-intl{ext}").read_bytes()
+    assert artifacts[".klc"] == b""  # invalid locale
+    assert artifacts[".ahk"].startswith(b"\xef\xbb\xbf")  # BOM
+
+    assert list(build_artifacts(LAYOUTS / "prog.toml", ["klc", ".svg"])) == [
+        ".klc",
+        ".svg",
+    ]
+    with pytest.raises(ValueError):
+        build_artifacts(descriptor, [".exe"])
+    with pytest.raises(ValueError):
+        build_artifacts(descriptor, flags=["qwerty"])
+
+
+def test_build_artifacts_descriptors(tmp_path, capsys):
+    from kalamine import build_artifacts
+
+    # descriptor text, or minimal data: same defaults as a descriptor file
+    text = (LAYOUTS / "intl.toml").read_text(encoding="utf-8")
+    assert build_artifacts(text) == build_artifacts(LAYOUTS / "intl.toml")
+    minimal = build_artifacts({"base": get_layout_dict("intl")["base"]}, [".json"])
+    assert b'"name": "custom"' in minimal[".json"]
+
+    # invalid descriptors raise ValueError, and do not exit
+    broken = tmp_path / "broken.toml"
+    broken.write_text("[[invalid toml", encoding="utf-8")
+    for descriptor in [broken, broken.read_text(), {"base": "abc"}]:
+        with pytest.raises(ValueError):
+            build_artifacts(descriptor)
+    with pytest.raises(ValueError):  # no file access from descriptor texts
+        build_artifacts('extends = "/etc/passwd"')
+    assert capsys.readouterr().err == ""
+
+
+def test_build_artifacts_threads(capsys):
+    from kalamine import build_artifacts
+
+    names = ["ansi", "ergol", "intl", "prog"] * 4
+    sequential = [build_artifacts(LAYOUTS / f"{name}.toml") for name in names]
+    with ThreadPoolExecutor(8) as pool:
+        concurrent = list(
+            pool.map(build_artifacts, [LAYOUTS / f"{n}.toml" for n in names])
+        )
+    assert concurrent == sequential
+
+
+def archive_contents(path: Path) -> Dict[str, bytes]:
+    """Entry name -> data, following the links of tar archives."""
+
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as archive:
+            return {name: archive.read(name) for name in archive.namelist()}
+    with tarfile.open(path) as archive:
+        return {
+            member.name: archive.extractfile(member).read()  # type: ignore
+            for member in archive.getmembers()
+        }
+
+
+@pytest.mark.parametrize("suffix", [".zip", ".tar.gz"])
+def test_build_archive(tmp_path, capsys, monkeypatch, suffix):
+    from kalamine import build_artifacts
+
+    monkeypatch.setenv("KALAMINE_REPRODUCIBLE", "1")
+    jobs = [BuildJob(LAYOUTS / "intl.toml", matrix=True)]
+    for name in ["first", "second"]:
+        assert build_archive(jobs, tmp_path / f"{name}{suffix}") == []
+    first = (tmp_path / f"first{suffix}").read_bytes()
+    assert (tmp_path / f"second{suffix}").read_bytes() == first  # reproducible
+
+    contents = archive_contents(tmp_path / f"first{suffix}")
+    assert len(contents) == 7 * len(MATRIX)
+    artifacts = build_artifacts(LAYOUTS / "intl.toml", flags=["angle_mod"])
+    for ext, data in artifacts.items():
+        assert contents[f"angle_mod/q-intl{ext}"] == data
+
+    if suffix == ".tar.gz":  # outputs that do not depend on a flag are linked
+        with tarfile.open(tmp_path / f"first{suffix}") as archive:
+            link = archive.getmember("qwerty_shortcuts/q-intl.svg")
+            assert link.islnk() and link.linkname == "default/q-intl.svg"
+
+    # an interrupted build leaves no partial archive
+    def interrupted(*args):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr("kalamine.build.try_build_layout", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        build_archive(jobs, tmp_path / f"first{suffix}")
+    assert (tmp_path / f"first{suffix}").read_bytes() == first
+    assert {path.name for path in tmp_path.iterdir()} == {
+        f"first{suffix}",
+        f"second{suffix}",
+    }
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+from kalamine.cache import LayoutCache
+from kalamine.generators import xkb
+from kalamine.layout import KeyboardLayout, load_layout
+
+LAYOUTS = Path(__file__).parent.parent / "layouts"
+
+
+def test_roundtrip(tmp_path):
+    cache = LayoutCache(tmp_path)
+    layout_path = LAYOUTS / "intl.toml"
+    assert cache.get(layout_path) is None
+
+    layout = cache.layout(layout_path, angle_mod=True)
+    cached = cache.get(layout_path, angle_mod=True)
+    assert cached is not None
+    assert cache.get(layout_path) is None  # different build flags
+
+    assert cached.layers == layout.layers
+    assert cached.legends == layout.legends
+    assert cached.dead_keys == layout.dead_keys
+    assert cached.layers.find("*¨") == layout.layers.find("*¨")
+    assert cached.meta == layout.meta
+    assert cached.has_1dk and not cached.has_altgr and cached.angle_mod
+    assert xkb.xkb_symbols(cached) == xkb.xkb_symbols(layout)
+
+
+def test_invalidation(tmp_path):
+    cache = LayoutCache(tmp_path / "cache")
+    parent = tmp_path / "parent.toml"
+    child = tmp_path / "child.toml"
+    parent.write_bytes((LAYOUTS / "ansi.toml").read_bytes())
+    child.write_text('extends = "parent.toml"\nname = "child"\n')
+
+    cache.layout(child)
+    assert cache.get(child) is not None
+
+    child.write_text('extends = "parent.toml"\nname = "child2"\n')
+    assert cache.get(child) is None
+    assert cache.layout(child).meta["name"] == "child2"
+
+    parent.write_bytes(parent.read_bytes().replace(b"ANSI", b"ISO"))
+    assert cache.get(child) is None
+    assert cache.layout(child).meta["geometry"] == "ISO"
+
+
+def test_eviction(tmp_path):
+    cache = LayoutCache(tmp_path, max_size=1)  # keep the last entry only
+    for name in ["ansi", "intl", "prog"]:
+        cache.layout(LAYOUTS / f"{name}.toml")
+    assert len(list(tmp_path.iterdir())) == 1
+    assert cache.get(LAYOUTS / "prog.toml") is not None
+
+    fresh = KeyboardLayout(load_layout(LAYOUTS / "prog.toml"))
+    assert cache.get(LAYOUTS / "prog.toml").dead_keys == fresh.dead_keys
+
+
+def test_sources_invalidation(tmp_path, monkeypatch):
+    from kalamine import cache as cache_module
+
+    cache = LayoutCache(tmp_path)
+    cache.layout(LAYOUTS / "intl.toml")
+    assert cache.get(LAYOUTS / "intl.toml") is not None
+
+    # e.g. a parser fix in a development checkout
+    monkeypatch.setattr(cache_module, "sources_digest", lambda: "patched")
+    assert cache.get(LAYOUTS / "intl.toml") is None
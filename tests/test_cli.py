@@ -0,0 +1,93 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+# modules that `kalamine build` and `kalamine version` should not import
+HEAVY_MODULES = [
+    "http.server",
+    "kalamine.directory_server",
+    "kalamine.generators.ahk",
+    "kalamine.generators.keylayout",
+    "kalamine.generators.klc",
+    "kalamine.generators.web",
+    "kalamine.server",
+    "webbrowser",
+    "xml.etree.ElementTree",
+    "yaml",
+]
+
+LAYOUTS = Path(__file__).parent.parent / "layouts"
+
+# seconds, for `import kalamine.cli` alone: it took about 0.4s when it imported
+# all generators and templates
+IMPORT_TIME_BUDGET = 0.2
+
+
+def imported_modules(*args: str) -> list:
+    """Modules imported by a kalamine command, in a fresh interpreter."""
+
+    script = "\n".join(
+        [
+            "import sys",
+            "from kalamine.cli import cli",
+            f"sys.argv = ['kalamine', *{list(args)!r}]",
+            "try:",
+            "    cli()",
+            "except SystemExit:",
+            "    pass",
+            "print(*sys.modules, file=sys.stderr)",
+        ]
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    return result.stderr.split()
+
+
+def test_lazy_imports(tmp_path):
+    assert not set(HEAVY_MODULES) & set(imported_modules("version"))
+
+    output = tmp_path / "intl.xkb_symbols"
+    args = ["build", "--no-daemon", "--out", str(output), str(LAYOUTS / "intl.toml")]
+    modules = set(imported_modules(*args))
+    assert output.exists()
+    assert "kalamine.generators.xkb" in modules
+    assert not set(HEAVY_MODULES) & modules
+
+
+def test_import_time():
+    # best of 3 runs, to smooth out the noise of a busy machine
+    script = "import time; t = time.perf_counter(); import kalamine.cli; "
+    script += "print(time.perf_counter() - t)"
+    timings = [
+        float(
+            subprocess.run(
+                [sys.executable, "-c", script], capture_output=True, text=True
+            ).stdout
+        )
+        for _ in range(3)
+    ]
+    assert min(timings) < IMPORT_TIME_BUDGET
+
+
+def test_parallel_build(tmp_path, monkeypatch):
+    layouts = Path(__file__).parent.parent / "layouts"
+    names = ["ansi", "intl", "broken", "prog"]
+    for name in names:
+        if name != "broken":
+            shutil.copy(layouts / f"{name}.toml", tmp_path)
+    (tmp_path / "broken.toml").write_text("[[invalid toml", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+
+    args = ["build", "--no-cache", "--jobs", "2", *[f"{name}.toml" for name in names]]
+    result = subprocess.run(
+        [sys.executable, "-m", "kalamine.cli", *args], capture_output=True, text=True
+    )
+
+    # errors are reported per descriptor, the other layouts are still built
+    assert result.returncode == 1
+    assert "broken.toml" in result.stderr
+    built = [line[4:] for line in result.stdout.splitlines() if line.startswith("...")]
+    assert [Path(path).stem for path in built[::7]] == ["q-ansi", "q-intl", "q-prog"]
+    assert all(Path(path).exists() for path in built)
@@ -0,0 +1,123 @@
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from kalamine.build import BuildJob, build_artifacts
+from kalamine.daemon import BuildDaemon, DaemonError, remote_artifacts, request
+from kalamine.outputs import OUTPUT_FORMATS
+
+from .util import get_layout_dict
+
+LAYOUTS = Path(__file__).parent.parent / "layouts"
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Unix sockets")
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    server = BuildDaemon(tmp_path / "kalamine.sock")
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server.path
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_daemon_build(tmp_path, daemon):
+    layouts = tmp_path / "layouts"
+    layouts.mkdir()
+    (layouts / "intl.toml").write_bytes((LAYOUTS / "intl.toml").read_bytes())
+    (layouts / "broken.toml").write_text("[[invalid toml", encoding="utf-8")
+
+    def build(*args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, "-m", "kalamine.cli", "build", *args],
+            capture_output=True,
+            text=True,
+            cwd=layouts,
+            env={**os.environ, "KALAMINE_DAEMON": str(daemon)},
+        )
+
+    # same messages and outputs as a local build, in the client directory
+    remote = build("--reproducible", "intl.toml", "broken.toml")
+    remote_outputs = {path.name: path.read_bytes() for path in layouts.glob("dist/q*")}
+    local = build("--reproducible", "--force", "--no-daemon", "intl.toml")
+    assert remote.returncode == 1
+    assert "broken.toml" in remote.stderr
+    assert remote.stdout == local.stdout
+    assert len(remote_outputs) == len(OUTPUT_FORMATS)
+    for name, data in remote_outputs.items():
+        assert (layouts / "dist" / name).read_bytes() == data
+
+    # the build manifest is shared with local builds
+    assert "up to date" in build("--reproducible", "intl.toml").stdout
+
+
+def test_concurrent_builds(tmp_path, daemon):
+    def build(name: str, env: Dict[str, str]) -> Dict:
+        client_dir = tmp_path / name
+        client_dir.mkdir()
+        (client_dir / "intl.toml").write_bytes((LAYOUTS / "intl.toml").read_bytes())
+        job = {
+            **BuildJob(Path())._asdict(),
+            "input_file": "intl.toml",
+            "dist_dir": "dist",
+        }
+        message = {"command": "build", "cwd": str(client_dir), "env": env}
+        message.update(jobs=[job], processes=1, force=False, archive=None)
+        return request(message, daemon)
+
+    cwd = os.getcwd()
+    envs = {
+        "reproducible": {"KALAMINE_REPRODUCIBLE": "1"},
+        "epoch": {"SOURCE_DATE_EPOCH": "1700000000"},
+    }
+    with ThreadPoolExecutor(2) as pool:
+        responses = dict(zip(envs, pool.map(build, envs, envs.values())))
+
+    # each build in its client directory, with its own settings and messages
+    assert os.getcwd() == cwd
+    for name, response in responses.items():
+        assert response["failed"] == []
+        assert response["stdout"].splitlines()[0] == "... dist/q-intl.ahk"
+    marks = {
+        name: (tmp_path / name / "dist" / "q-intl.xkb_symbols").read_text()
+        for name in envs
+    }
+    assert "Generated by kalamine\n" in marks["reproducible"]
+    assert "Generated by kalamine on 2023-11-14" in marks["epoch"]
+
+
+def test_daemon_artifacts(daemon):
+    text = (LAYOUTS / "prog.toml").read_text(encoding="utf-8")
+    for descriptor in [LAYOUTS / "intl.toml", get_layout_dict("ansi"), text]:
+        artifacts = remote_artifacts(descriptor, [".json", ".xkb_symbols"], [], daemon)
+        assert artifacts == build_artifacts(descriptor, [".json", ".xkb_symbols"])
+
+    with pytest.raises(DaemonError):
+        request({"command": "artifacts", "path": "nope.toml"}, daemon)
+    with pytest.raises(DaemonError):
+        request({"command": "build", "version": "0.0"}, daemon)
+    with pytest.raises(DaemonError):  # started before the sources were edited
+        request({"command": "build", "sources": "0" * 64}, daemon)
+    assert request({"command": "ping"}, daemon)["pid"] == os.getpid()
+    with pytest.raises(DaemonError):  # only one daemon per socket
+        BuildDaemon(daemon)
+
+
+def test_no_daemon(tmp_path):
+    assert request({"command": "ping"}, tmp_path / "kalamine.sock") is None
+
+
+def test_foreign_daemon(daemon, monkeypatch):
+    # the socket of another user could be a trap: do not send it any request
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(daemon).st_uid + 1)
+    with pytest.raises(DaemonError, match="another user"):
+        request({"command": "ping"}, daemon)
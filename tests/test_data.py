@@ -0,0 +1,22 @@
+import os
+
+from kalamine import data_tables, utils
+from kalamine.freeze import frozen_tables
+from kalamine.utils import load_data, load_yaml_data
+
+
+def test_frozen_tables():
+    assert (utils.DATA_DIR.parent / "data_tables.py").read_text() == frozen_tables()
+    for name in data_tables.TABLES:
+        assert load_data(name) == load_yaml_data(name)
+    assert load_data("layout") is not load_data("layout")  # fresh copies
+
+
+def test_newer_sources(tmp_path, monkeypatch):
+    (tmp_path / "scan_codes.yaml").write_text("")
+    monkeypatch.setattr(utils, "DATA_DIR", tmp_path)
+    assert not utils._is_frozen("scan_codes")  # newer than data_tables.py
+
+    frozen = os.stat(data_tables.__file__).st_mtime
+    os.utime(tmp_path / "scan_codes.yaml", (frozen - 1, frozen - 1))
+    assert utils._is_frozen("scan_codes")
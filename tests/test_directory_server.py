@@ -0,0 +1,165 @@
+import asyncio
+import http.client
+import socket
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from kalamine.directory_server import MAX_HEADERS, MAX_LINE, DirectoryServer, LRUCache
+
+LAYOUTS = Path(__file__).parent.parent / "layouts"
+
+
+@pytest.fixture
+def directory(tmp_path):
+    for name in ["intl", "ansi"]:
+        (tmp_path / f"{name}.toml").write_bytes((LAYOUTS / f"{name}.toml").read_bytes())
+    (tmp_path / "notes.txt").write_text("not a layout")
+    return tmp_path
+
+
+@pytest.fixture
+def server(directory):
+    dir_server = DirectoryServer(directory, max_layouts=1, interval=0.05)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    start = dir_server.start("localhost", 0)
+    tcp_server = asyncio.run_coroutine_threadsafe(start, loop).result()
+    dir_server.port = tcp_server.sockets[0].getsockname()[1]
+    yield dir_server
+    asyncio.run_coroutine_threadsafe(dir_server.stop(tcp_server), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def get(server, path, **headers):
+    connection = http.client.HTTPConnection("localhost", server.port, timeout=10)
+    connection.request("GET", path, headers=headers)
+    response = connection.getresponse()
+    return response, response.read()
+
+
+def raw_request(server, data):
+    """Status line of the response, and whether the server closed afterwards."""
+    with socket.create_connection(("localhost", server.port), timeout=10) as sock:
+        sock.sendall(data)
+        response = b""
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            response += chunk
+    return response.split(b"\r\n", 1)[0]
+
+
+def test_lru_cache():
+    cache: LRUCache[str, int] = LRUCache(2, lambda key: key == "a")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("c", 3)  # "a" is pinned
+    assert list(cache) == ["a", "c"]
+    assert cache.get("b") is None
+    cache.put("d", 4)
+    assert list(cache) == ["a", "d"]
+
+
+def test_directory_server(server, directory):
+    response, body = get(server, "/")
+    assert response.status == 200
+    assert b'href="/ansi/"' in body and b'href="/intl/"' in body
+    assert b"notes" not in body
+    assert server.parsed_layouts == []  # parsed lazily
+
+    response, _ = get(server, "/intl")
+    assert response.status == 301
+    assert response.getheader("Location") == "/intl/"
+    response, body = get(server, "/intl/json")
+    assert response.status == 200
+    assert b'"name": "qwerty-intl"' in body
+    response, _ = get(
+        server, "/intl/json", **{"If-None-Match": response.getheader("ETag")}
+    )
+    assert response.status == 304
+    response, _ = get(server, "/intl/style.css")
+    assert response.status == 200
+    assert get(server, "/qwerty/json")[0].status == 404
+    assert get(server, "/intl/../../etc/passwd")[0].status == 404
+
+    # only the most recently used layouts are kept in memory
+    assert get(server, "/ansi/keylayout")[0].status == 200
+    assert server.parsed_layouts == ["ansi"]
+
+
+def test_directory_server_events(server, directory):
+    connection = http.client.HTTPConnection("localhost", server.port, timeout=10)
+    connection.request("GET", "/intl/events")
+    events = connection.getresponse()
+    assert events.getheader("Content-Type") == "text/event-stream"
+    assert events.readline() == b"event: layout\n"
+    assert events.readline() == b'data: {"revision": 0}\n'
+    assert events.readline() == b"\n"
+
+    # subscribed layouts stay in memory, and get patched as they change
+    assert get(server, "/ansi/json")[0].status == 200
+    assert server.parsed_layouts == ["intl", "ansi"]
+    path = directory / "intl.toml"
+    path.write_text(path.read_text().replace("│ +   ┃", "│ ±   ┃"))
+    assert events.readline() == b"event: patch\n"
+    assert b'"keymap": {"Equal": ["=", "\xc2\xb1"]}' in events.readline()
+    response, body = get(server, "/intl/json")
+    assert "±".encode() in body
+    connection.close()
+
+
+def test_directory_server_watch_errors(server, directory, capsys):
+    connection = http.client.HTTPConnection("localhost", server.port, timeout=10)
+    connection.request("GET", "/intl/events")
+    events = connection.getresponse()
+    assert events.readline() == b"event: layout\n"
+    assert events.readline() == b'data: {"revision": 0}\n'
+
+    # e.g. a directory renamed for a moment: reported, and watched again
+    list_descriptors = server.list_descriptors
+    polls = []
+
+    def flaky_list_descriptors():
+        polls.append(time.monotonic())
+        if len(polls) == 1:
+            raise OSError("directory renamed")
+        return list_descriptors()
+
+    server.list_descriptors = flaky_list_descriptors
+    while len(polls) < 2:
+        time.sleep(0.01)
+    assert "directory renamed" in capsys.readouterr().err
+    path = directory / "intl.toml"
+    path.write_text(path.read_text().replace("│ +   ┃", "│ ±   ┃"))
+    assert events.readline() == b"\n"
+    assert events.readline() == b"event: patch\n"
+    connection.close()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"GARBAGE\r\n\r\n",
+        b"GET / SMTP/1.0\r\n\r\n",
+        b"GET / HTTP/1.1\r\nno colon\r\n\r\n",
+        b"GET / HTTP/1.1\r\n" + b"X-A: b\r\n" * (MAX_HEADERS + 1) + b"\r\n",
+        b"GET /" + b"a" * MAX_LINE + b" HTTP/1.1\r\n\r\n",
+    ],
+    ids=["line", "version", "header", "headers", "long"],
+)
+def test_directory_server_bad_requests(server, data):
+    # the connection is closed after the error, though keep-alive is the default
+    assert raw_request(server, data) == b"HTTP/1.1 400 Bad Request"
+
+
+def test_directory_server_unread_body(server):
+    body = b"GET / HTTP/1.1\r\n\r\n"  # must not be served as a request
+    data = b"POST / HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body)
+    assert raw_request(server, data + body) == b"HTTP/1.1 405 Method Not Allowed"
@@ -1,4 +1,5 @@
 from kalamine import KeyboardLayout
+from kalamine.layout import GEOMETRY, special_key, split_label
 
 from .util import get_layout_dict
 
@@ -180,3 +181,64 @@ def test_tab():
     layout = KeyboardLayout(layout_data)
     assert layout.layers[0]["ad01"] == "\t"
     assert layout.layers[1]["ad02"] == "	"  # Tab character too
+
+
+def test_split_label():
+    assert split_label("f12÷") == ("f12", "÷")
+    assert split_label("f2 ¤") == ("f2", "¤")
+    assert split_label("② ¤") == ("f2", "¤")
+    assert split_label("esc") == ("esc", None)
+    assert split_label("$ €") == ("$", "€")
+    assert split_label("Q") == ("Q", None)
+    assert split_label("") == (None, None)
+    assert special_key("bspc") == "bspc"
+    assert special_key("f13") is None
+    assert special_key("delta") is None
+
+
+def test_geometry_positions():
+    iso = GEOMETRY["ISO"]
+    assert iso.keys["tlde"] == (2, 2)
+    assert iso.keys["ae01"] == (2, 8)
+    assert iso.keys["lsgt"] == (11, 9)
+    assert iso.angle_mod_keys["ab05"] == iso.keys["lsgt"]
+    assert iso.angle_mod_keys["lsgt"] == iso.keys["ab01"]
+    assert iso.angle_mod_keys["ab06"] == iso.keys["ab06"]
+    assert GEOMETRY["ANSI"].angle_mod_keys is None
+
+
+def test_char_index():
+    layout = load_layout("intl")
+    assert layout.layers.find("q") == {(0, "ad01")}
+    assert (1, "ad01") in layout.layers.find("Q")
+    assert (0, "tlde") in layout.layers.find("*`")
+    assert (0, "spce") in layout.layers.find(" ")
+    assert layout.layers.find("¤") == set()
+    for layer, keys in layout.layers.items():
+        for key_name, char in keys.items():
+            assert (layer, key_name) in layout.layers.find(char)
+            assert char in layout.layers.chars({layer})
+
+    layout.layers[0]["ad01"] = "¤"  # e.g. help.dummy_layout
+    assert layout.layers.find("q") == set()
+    assert layout.layers.find("¤") == {(0, "ad01")}
+    assert "q" not in layout.layers.chars({0})
+
+
+def test_resolved_keymap():
+    layout = load_layout("intl")
+    resolved = layout.resolved
+    assert layout.resolved is resolved  # memoized
+
+    keys = {key.name: key for key in resolved}
+    assert [title for title, _ in resolved.sections][0] == " Digits"
+    assert keys["ad01"].chars[:2] == ("q", "Q")
+    assert keys["ad01"].codes[0] == "0071"
+    assert keys["ad01"].scan_codes["klc"] == "10"
+    assert keys["tlde"].dead[:2] == (True, True)
+    assert keys["tlde"].terms[0] == layout.dead_keys["*`"][" "]
+    assert keys["ab01"].chars[4] == ""  # no AltGr layer
+
+    layout.layers[0]["ad01"] = "¤"  # e.g. help.dummy_layout
+    assert layout.resolved is not resolved
+    assert {key.name: key for key in layout.resolved}["ad01"].chars[0] == "¤"
@@ -1,7 +1,14 @@
 from textwrap import dedent
 
 from kalamine import KeyboardLayout
-from kalamine.generators.klc import klc_deadkeys, klc_dk_index, klc_keymap
+from kalamine.generators.klc import (
+    VirtualKey,
+    VkReason,
+    assign_vks,
+    klc_deadkeys,
+    klc_dk_index,
+    klc_keymap,
+)
 
 from .util import get_layout_dict
 
@@ -520,3 +527,17 @@ def test_prog_deadkeys():
         //}}}
         """
     )
+
+
+def test_virtual_keys():
+    layout = KeyboardLayout(get_layout_dict("intl"))
+    vks = assign_vks(layout)
+    assert assign_vks(layout) is vks  # computed once per layout
+    assert vks["10"] == VirtualKey("Q", VkReason.SYMBOL)
+    assert vks["56"] == VirtualKey("OEM_102", VkReason.ISO_KEY)
+    assert all(vk.reason != VkReason.QWERTY for vk in vks.values())
+
+    layout.qwerty_shortcuts = True
+    qwerty_vks = assign_vks(layout)
+    assert qwerty_vks is not vks
+    assert all(vk.reason == VkReason.QWERTY for vk in qwerty_vks.values())
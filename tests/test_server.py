@@ -0,0 +1,148 @@
+import gzip
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from kalamine import server
+from kalamine.layout import KeyboardLayout
+from kalamine.server import (
+    ENDPOINTS,
+    LiveLayout,
+    Response,
+    ResponseCache,
+    accepted_encodings,
+    compress,
+    etag_matches,
+    http_response,
+    negotiate_encoding,
+    output_renderer,
+    static_response,
+)
+
+from .util import get_layout_dict
+
+LAYOUTS = Path(__file__).parent.parent / "layouts"
+
+
+def test_response_cache():
+    layout = KeyboardLayout(get_layout_dict("intl"))
+    responses = ResponseCache(layout)
+    rendered = []
+    lock = threading.Lock()
+
+    def render(layout: KeyboardLayout) -> Response:
+        time.sleep(0.05)  # let the other requests wait for this one
+        with lock:
+            rendered.append(layout)
+        generator, content, charset = ENDPOINTS["/xkb_symbols"]
+        return Response.render(generator(layout), content, charset)
+
+    # rendered once, for concurrent requests
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda _: responses.get("xkb", render), range(4)))
+    assert len(rendered) == 1
+    assert len({response.etag for response in results}) == 1
+    assert responses.get("xkb", render) is results[0]
+
+    # rendered again for a new revision, with the same ETag if unchanged
+    variant = layout.variant(qwerty_shortcuts=True)
+    responses.update(variant)
+    assert responses.revision == 1
+    assert responses.get("xkb", render).etag == results[0].etag
+    assert rendered == [layout, variant]
+
+
+def test_live_layout(tmp_path):
+    parent = tmp_path / "parent.toml"
+    child = tmp_path / "child.toml"
+    parent.write_bytes((LAYOUTS / "intl.toml").read_bytes())
+    child.write_text('extends = "parent.toml"\nname = "child"\n')
+    live_layout = LiveLayout(child)
+    responses = live_layout.responses
+    live_layout.warm()
+    symbols = responses.get("/xkb_symbols", output_renderer("/xkb_symbols"))
+
+    # parsed again once per change, of the descriptor or of its parent
+    assert not live_layout.refresh(debounce=0)
+    child.write_text(child.read_text())  # saved without changes
+    assert not live_layout.refresh(debounce=0)
+    parent.write_text(parent.read_text().replace('"1.0.0"', '"2.0.10"'))
+    assert live_layout.refresh(debounce=0)
+    assert not live_layout.refresh(debounce=0)
+    assert responses.revision == 1
+
+    # outputs are rendered eagerly
+    new_symbols = responses.get("/xkb_symbols", lambda _: pytest.fail("rendered"))
+    assert new_symbols.etag != symbols.etag
+    assert b"2.0.10" in new_symbols.body
+
+
+def test_content_encoding(monkeypatch):
+    assert accepted_encodings("gzip, deflate, br;q=0") == {"gzip", "deflate"}
+    assert accepted_encodings("") == set()
+    monkeypatch.setattr(server, "supported_encodings", lambda: ("br", "gzip"))
+    assert negotiate_encoding("gzip, br") == "br"
+    assert negotiate_encoding("gzip;q=0.5, br;q=0") == "gzip"
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("identity") is None
+
+    corpus = Path(server.__file__).parent / "www" / "corpus" / "en.json"
+    response = static_response(corpus, "application/json")
+    assert response is static_response(corpus, "application/json")  # cached
+    assert gzip.decompress(compress(response.body, "gzip")) == corpus.read_bytes()
+
+    assert "application/javascript".startswith(server.COMPRESSIBLE_TYPES)
+
+
+def test_etag_matches():
+    etag = '"abc-gzip"'
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag, f'"other", {etag}')
+    assert etag_matches(etag, f"W/{etag}")
+    assert etag_matches(etag, "*")
+    assert not etag_matches(etag, '"other"')
+    assert not etag_matches(etag, '"abc"')
+    assert not etag_matches(etag, "")
+
+
+def test_http_response():
+    body = b"console.log('kalamine');\n" * 64
+    response = Response.from_bytes(body, "application/javascript")
+    status, headers, data = http_response(response, "gzip")
+    assert status == 200
+    assert ("Content-Encoding", "gzip") in headers
+    assert gzip.decompress(data) == body
+
+    etag = dict(headers)["ETag"]
+    assert http_response(response, "gzip", f'"other", {etag}')[0] == 304
+    assert http_response(response, "gzip", "*")[0] == 304
+    assert http_response(response, "gzip", etag, cache=False)[0] == 200
+
+
+def test_layout_patch(tmp_path):
+    path = tmp_path / "intl.toml"
+    path.write_bytes((LAYOUTS / "intl.toml").read_bytes())
+    live_layout = LiveLayout(path)
+    assert live_layout.patches(0, timeout=0) == []
+
+    # keymap change: only the changed entries are sent
+    descriptor = path.read_text().replace("│ +   ┃", "│ ±   ┃")
+    path.write_text(descriptor.replace("│   é │", "│   è │"))  # 1dk layer
+    assert live_layout.refresh(debounce=0)
+    [patch] = live_layout.patches(0, timeout=0)
+    assert patch["revision"] == 1
+    assert not patch["reload"]
+    assert patch["keymap"] == {"Equal": ["=", "±"]}
+    assert patch["deadkeys"]["**"]["e"] == "è"  # whole dead key tables
+
+    # metadata change: the page has to be reloaded
+    path.write_text(path.read_text().replace('"1.0.0"', '"1.0.10"'))
+    assert live_layout.refresh(debounce=0)
+    assert live_layout.patches(1, timeout=0)[0]["reload"]
+    assert len(live_layout.patches(0, timeout=0)) == 2
+
+    # too old: the whole layout has to be reloaded
+    assert live_layout.patches(-LiveLayout.MAX_PATCHES, timeout=0) is None
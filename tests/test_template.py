@@ -0,0 +1,58 @@
+from kalamine.template import LinesSlot, Template, TokenSlot
+
+TEMPLATE = """\
+// ${KALAMINE}
+name = "${name}"
+encoding = "${encoding=utf-8}"
+    KALAMINE::LAYOUT
+  // KALAMINE::MISSING
+end"""
+
+
+def test_parse():
+    template = Template(TEMPLATE)
+    assert template.names == {"KALAMINE", "name", "encoding", "LAYOUT", "MISSING"}
+    assert template.segments[:3] == (
+        "// ",
+        TokenSlot("KALAMINE", "${KALAMINE}"),
+        '\nname = "',
+    )
+    assert LinesSlot("LAYOUT", "    ", "    KALAMINE::LAYOUT") in template.segments
+
+
+def test_render():
+    template = Template(TEMPLATE)
+    context = {
+        "KALAMINE": "generated",
+        "name": "${KALAMINE} \\x",  # values are not parsed again
+        "LAYOUT": ["a", "", "b"],
+    }
+    assert template.render(context).split("\n") == [
+        "// generated",
+        'name = "${KALAMINE} \\x"',
+        'encoding = "${encoding=utf-8}"',  # no value: kept as is
+        "    a",
+        "",
+        "    b",
+        "  // KALAMINE::MISSING",
+        "end",
+    ]
+    assert template.render({}) == TEMPLATE
+
+
+class ChunkSink:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, text):
+        self.chunks.append(text)
+        return len(text)
+
+
+def test_write():
+    template = Template(TEMPLATE)
+    context = {"name": "intl", "LAYOUT": ["a", "", "b"]}
+    sink = ChunkSink()
+    template.write(context, sink)
+    assert len(sink.chunks) > 1  # streamed, chunk by chunk
+    assert "".join(sink.chunks) == template.render(context)
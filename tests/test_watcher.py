@@ -0,0 +1,66 @@
+from pathlib import Path
+from typing import List
+
+from kalamine.build import BuildJob
+from kalamine.watcher import FileWatcher, IncrementalBuild
+
+LAYOUTS = Path(__file__).parent.parent / "layouts"
+
+
+def test_file_watcher(tmp_path):
+    path = tmp_path / "layout.toml"
+    path.write_text("a")
+    watcher = FileWatcher([path])
+    assert watcher.changes() == set()
+
+    path.write_text("a")  # saved without changes
+    assert watcher.changes() == set()
+    path.write_text("bb")
+    assert watcher.changes() == {path}
+    path.unlink()
+    assert watcher.changes() == {path}
+
+
+def test_incremental_build(tmp_path, capsys, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    parent = tmp_path / "parent.toml"
+    child = tmp_path / "child.toml"
+    parent.write_bytes((LAYOUTS / "ansi.toml").read_bytes())
+    child.write_text('extends = "parent.toml"\nname = "child"\nname8 = "child"\n')
+
+    build = IncrementalBuild(BuildJob(child))
+    assert build.files == [child]
+
+    def rebuilt() -> List[str]:
+        assert build.build() is not None
+        out = capsys.readouterr().out
+        return [line[4:] for line in out.splitlines() if line.startswith("...")]
+
+    assert len(rebuilt()) == 7
+    assert build.files == [child, parent]
+
+    # same layout: nothing is rendered
+    with child.open("a") as file:
+        file.write("# comment\n")
+    assert rebuilt() == [f"{child}: no layout change"]
+
+    # metadata change: only the outputs that contain it are written
+    with child.open("a") as file:
+        file.write('version = "2.0.0"\n')
+    assert rebuilt() == [
+        "dist/child.keylayout",
+        "dist/child.xkb_keymap",
+        "dist/child.xkb_symbols",
+    ]
+
+    # a deleted output is written again
+    (tmp_path / "dist" / "child.svg").unlink()
+    assert rebuilt() == ["dist/child.svg"]
+
+    # invalid layout: reported, and built again once fixed
+    text = child.read_text()
+    child.write_text(text + 'geometry = "FOO"\n')
+    assert build.build() is None
+    assert "Error: KeyError('FOO')" in capsys.readouterr().err
+    child.write_text(text)
+    assert rebuilt() == [f"{child}: no layout change"]